@@ -1,11 +1,28 @@
 # Register your models here.
+import csv
+
 from django.contrib import admin
+from django.db.models import OuterRef, Subquery
+from django.http import HttpResponse
 from .models import Committee
 
 
 from committees.services.roi_service import calculate_total_return
+from committees.services.projection_service import flat_roi, from_paise, project_queryset
 from .models import *
 
+
+class CommitteeLedgerEntryInline(admin.TabularInline):
+    model = CommitteeLedgerEntry
+    extra = 0
+    can_delete = False
+    fields = ("created_at", "entry_type", "amount", "reference_id", "note")
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(UserCommittee)
 class UserCommitteeAdmin(admin.ModelAdmin):
     list_display = (
@@ -44,12 +61,65 @@ class UserCommitteeAdmin(admin.ModelAdmin):
         data = calculate_total_return(obj)
         return f"₹{data['roi']} (Total: ₹{data['total_return']})"
 
-    list_display = ("user", "committee", "roi_info")
+    list_display = (
+        "user",
+        "committee",
+        "total_invested",
+        "total_withdrawn",
+        "roi_earned",
+        "roi_info",
+        "punctuality_score",
+    )
+    list_select_related = ("user", "committee", "punctuality")
+    readonly_fields = ("total_invested", "total_withdrawn", "roi_earned")
+    inlines = [CommitteeLedgerEntryInline]
+    actions = ["export_maturity_projection"]
 
     def roi_info(self, obj):
         data = calculate_total_return(obj)
         return f"₹{data['roi']} (Total: ₹{data['total_return']})"
 
+    def punctuality_score(self, obj):
+        score = getattr(obj, "punctuality", None)
+        if score is None:
+            return "—"
+        return f"{score.score} ({score.late_count} late, {score.overdue_count} overdue)"
+    punctuality_score.short_description = "Punctuality"
+
+    def export_maturity_projection(self, request, queryset):
+        ids, projection = project_queryset(queryset)
+
+        response = HttpResponse(content_type="text/csv")
+        response["Content-Disposition"] = 'attachment; filename="maturity_projection.csv"'
+
+        writer = csv.writer(response)
+        writer.writerow([
+            "user_committee_id",
+            "remaining_installments",
+            "projected_contributions",
+            "projected_invested",
+            "projected_roi",
+            "maturity_value",
+        ])
+        columns = [
+            from_paise(projection[key])
+            for key in (
+                "projected_contributions",
+                "projected_invested",
+                "projected_roi",
+                "maturity_value",
+            )
+        ]
+        for i, uc_id in enumerate(ids):
+            writer.writerow([
+                uc_id,
+                int(projection["remaining_periods"][i]),
+                *[column[i] for column in columns],
+            ])
+
+        return response
+    export_maturity_projection.short_description = "Export maturity projection (CSV)"
+
 
 
 from django.contrib import admin
@@ -60,7 +130,45 @@ from decimal import Decimal
 @admin.register(Committee)
 class CommitteeAdmin(admin.ModelAdmin):
 
-   
+    list_display = (
+        "name",
+        "is_active",
+        "snapshot_aum",
+        "snapshot_members",
+        "snapshot_fill_rate",
+        "snapshot_date",
+    )
+
+    # 📸 Latest nightly snapshot, joined in the changelist query
+    def get_queryset(self, request):
+        latest = CommitteeDailySnapshot.objects.filter(
+            committee=OuterRef("pk")
+        ).order_by("-date")
+
+        return super().get_queryset(request).annotate(**{
+            f"latest_{field}": Subquery(latest.values(field)[:1])
+            for field in ("date", "aum", "active_members", "total_slots", "filled_slots")
+        })
+
+    def snapshot_aum(self, obj):
+        if obj.latest_date is None:
+            return "—"
+        return f"₹{obj.latest_aum}"
+    snapshot_aum.short_description = "AUM"
+
+    def snapshot_members(self, obj):
+        return obj.latest_active_members if obj.latest_date else "—"
+    snapshot_members.short_description = "Active Members"
+
+    def snapshot_fill_rate(self, obj):
+        if not obj.latest_total_slots:
+            return "—"
+        return f"{round(obj.latest_filled_slots * 100 / obj.latest_total_slots, 2)}%"
+    snapshot_fill_rate.short_description = "Fill Rate"
+
+    def snapshot_date(self, obj):
+        return obj.latest_date or "—"
+    snapshot_date.short_description = "As Of"
    
     readonly_fields = (
         "yearly_total_invested",
@@ -114,12 +222,18 @@ class CommitteeAdmin(admin.ModelAdmin):
         }),
     )
 
+    def _yearly_projection(self, obj):
+        years = Decimal(obj.duration_months) / Decimal(12)
+        total = obj.yearly_amount * years
+        [(roi, total_return)] = flat_roi([total], [obj.roi_percent])
+        return total_return - roi, roi, total_return
+
     # 🔹 Total Invested
     def yearly_total_invested(self, obj):
         if not obj.pk or not obj.yearly_amount:
             return "—"
-        years = Decimal(obj.duration_months) / Decimal(12)
-        return f"₹ {obj.yearly_amount * years}"
+        total, _, _ = self._yearly_projection(obj)
+        return f"₹ {total}"
 
     yearly_total_invested.short_description = "Total Invested (Yearly)"
 
@@ -127,8 +241,7 @@ class CommitteeAdmin(admin.ModelAdmin):
     def yearly_roi_amount(self, obj):
         if not obj.pk or not obj.yearly_amount:
             return "—"
-        years = Decimal(obj.duration_months) / Decimal(12)
-        roi = (obj.yearly_amount * years) * (obj.roi_percent / Decimal(100))
+        _, roi, _ = self._yearly_projection(obj)
         return f"₹ {roi}"
 
     yearly_roi_amount.short_description = "ROI Amount (Annual)"
@@ -137,10 +250,8 @@ class CommitteeAdmin(admin.ModelAdmin):
     def yearly_total_return(self, obj):
         if not obj.pk or not obj.yearly_amount:
             return "—"
-        years = Decimal(obj.duration_months) / Decimal(12)
-        total = obj.yearly_amount * years
-        roi = total * (obj.roi_percent / Decimal(100))
-        return f"₹ {total + roi}"
+        _, _, total_return = self._yearly_projection(obj)
+        return f"₹ {total_return}"
 
     yearly_total_return.short_description = "Total Return After Duration"
 
@@ -148,6 +259,92 @@ class CommitteeAdmin(admin.ModelAdmin):
 
 
 
+@admin.register(CommitteeDailySnapshot)
+class CommitteeDailySnapshotAdmin(admin.ModelAdmin):
+    list_display = (
+        "committee",
+        "date",
+        "aum",
+        "active_members",
+        "joins",
+        "exits",
+        "dues_collected",
+        "dues_overdue",
+        "filled_slots",
+        "total_slots",
+    )
+    list_filter = ("committee",)
+    list_select_related = ("committee",)
+    date_hierarchy = "date"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class AuctionBidInline(admin.TabularInline):
+    model = AuctionBid
+    extra = 0
+    can_delete = False
+    fields = ("created_at", "user_committee", "amount")
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(CommitteeAuction)
+class CommitteeAuctionAdmin(admin.ModelAdmin):
+    list_display = (
+        "committee",
+        "cycle",
+        "status",
+        "pot_amount",
+        "best_bid_amount",
+        "closes_at",
+        "winner",
+        "dividend_per_member",
+    )
+    list_filter = ("status", "committee")
+    list_select_related = ("committee", "winner__user")
+    readonly_fields = (
+        "status",
+        "best_bid_amount",
+        "best_bidder",
+        "best_bid_at",
+        "winner",
+        "dividend_per_member",
+        "settled_at",
+    )
+    inlines = [AuctionBidInline]
+
+
+@admin.register(PunctualityScore)
+class PunctualityScoreAdmin(admin.ModelAdmin):
+    list_display = (
+        "user",
+        "user_committee",
+        "score",
+        "on_time_count",
+        "late_count",
+        "overdue_count",
+        "average_days_late",
+        "last_event_at",
+    )
+    list_filter = (("user_committee", admin.EmptyFieldListFilter),)
+    list_select_related = ("user", "user_committee__user", "user_committee__committee")
+    search_fields = ("user__username",)
+    ordering = ("score",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(UserCommitteePlan)
 class UserCommitteePlanAdmin(admin.ModelAdmin):
     list_display = (
@@ -155,11 +352,13 @@ class UserCommitteePlanAdmin(admin.ModelAdmin):
         "plan",
         "next_payment_due",
         "last_payment_at",
+        "auto_debit",
         "is_active",
     )
 
     list_filter = (
         "plan__plan_type",
+        "auto_debit",
         "is_active",
     )
 
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery
+from committees.models import UserCommittee, UserCommitteePlan
+
+
+class Command(BaseCommand):
+    help = "Fill UserCommitteePlan.user for plans created before the due inbox index"
+
+    def handle(self, *args, **kwargs):
+        updated = UserCommitteePlan.objects.filter(user__isnull=True).update(
+            user_id=Subquery(
+                UserCommittee.objects.filter(
+                    id=OuterRef("user_committee_id")
+                ).values("user_id")[:1]
+            )
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Backfilled user on {updated} plans")
+        )
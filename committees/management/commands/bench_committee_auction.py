@@ -0,0 +1,146 @@
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Sum
+from django.test import Client
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from committees.models import AuctionBid, Committee, CommitteeAuction, UserCommittee
+from committees.services.auction_service import close_auction
+from wallet.models import Wallet, WalletTransaction
+
+
+class Command(BaseCommand):
+    help = "Load test: many members bidding on one committee auction in its final seconds"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--members", type=int, default=50)
+        parser.add_argument("--bids-per-member", type=int, default=5)
+        parser.add_argument("--window", type=float, default=3.0, help="Seconds of bidding")
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the benchmark committee and users afterwards",
+        )
+
+    def handle(self, *args, **options):
+        members = options["members"]
+        window = options["window"]
+        tag = uuid.uuid4().hex[:8]
+
+        committee = Committee.objects.create(
+            name=f"auction-bench-{tag}",
+            monthly_amount=Decimal("1000.00"),
+            total_slots=members,
+            filled_slots=members,
+        )
+        users = User.objects.bulk_create([
+            User(username=f"auction-bench-{tag}-{i}") for i in range(members)
+        ])
+        Wallet.objects.bulk_create(
+            [Wallet(user=u) for u in users], ignore_conflicts=True
+        )
+        # one period of contributions already in the pool funds the pot
+        UserCommittee.objects.bulk_create([
+            UserCommittee(user=u, committee=committee, total_invested=committee.monthly_amount)
+            for u in users
+        ])
+        tokens = [str(RefreshToken.for_user(u).access_token) for u in users]
+
+        auction = CommitteeAuction.objects.create(
+            committee=committee,
+            min_increment=Decimal("10.00"),
+            closes_at=timezone.now() + timedelta(seconds=window + 1),
+        )
+        url = f"/api/auctions/{auction.id}/bid/"
+        start = threading.Barrier(members)
+        latencies = []
+
+        def bidder(token):
+            client = Client()
+            statuses = []
+            try:
+                start.wait()
+                for _ in range(options["bids_per_member"]):
+                    best = (
+                        CommitteeAuction.objects
+                        .values_list("best_bid_amount", flat=True)
+                        .get(id=auction.id)
+                    ) or Decimal("0")
+                    amount = min(
+                        best + Decimal(random.choice([10, 10, 20, 50])),
+                        auction.max_bid(),
+                    )
+                    began = time.perf_counter()
+                    response = client.post(
+                        url,
+                        {"amount": str(amount)},
+                        content_type="application/json",
+                        HTTP_AUTHORIZATION=f"Bearer {token}",
+                    )
+                    latencies.append(time.perf_counter() - began)
+                    statuses.append(response.status_code)
+                    time.sleep(random.uniform(0, window / options["bids_per_member"]))
+                return statuses
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=members) as pool:
+            statuses = [s for result in pool.map(bidder, tokens) for s in result]
+        elapsed = time.perf_counter() - started
+
+        # let the auction close, then settle it (only this one: other
+        # due auctions in the database are left to the close job)
+        time.sleep(max(0, (auction.closes_at - timezone.now()).total_seconds()))
+        settled = close_auction(auction.id)
+
+        auction.refresh_from_db()
+        bids = list(AuctionBid.objects.filter(auction=auction).order_by("id"))
+        latencies.sort()
+
+        self.stdout.write(
+            f"{len(statuses)} bids from {members} members in {elapsed:.2f}s, "
+            f"p50={latencies[len(latencies) // 2] * 1000:.0f}ms "
+            f"p99={latencies[int(len(latencies) * 0.99)] * 1000:.0f}ms"
+        )
+        self.stdout.write(
+            f"accepted={statuses.count(200)} outbid/rejected={statuses.count(400)} "
+            f"best={auction.best_bid_amount} winner={auction.winner_id} "
+            f"dividend={auction.dividend_per_member}"
+        )
+
+        paid_out = WalletTransaction.objects.filter(
+            reference_id__startswith=f"committee_auction_{auction.id}_"
+        ).aggregate(total=Sum("amount"))["total"]
+
+        consistent = (
+            settled is True
+            and len(bids) == statuses.count(200)
+            # every accepted bid beat the one before it
+            and all(
+                b.amount >= a.amount + auction.min_increment
+                for a, b in zip(bids, bids[1:])
+            )
+            and bids[-1].amount == auction.best_bid_amount
+            and bids[-1].user_committee_id == auction.winner_id
+            and paid_out == auction.pot_amount
+        )
+
+        if not options["keep"]:
+            User.objects.filter(id__in=[u.id for u in users]).delete()
+            committee.delete()
+
+        if consistent:
+            self.stdout.write(self.style.SUCCESS("Auction accounting consistent"))
+        else:
+            self.stdout.write(self.style.ERROR("Auction accounting MISMATCH"))
@@ -0,0 +1,88 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from committees.models import Committee, UserCommittee
+from wallet.models import Wallet
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrent joins on a single committee"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--members", type=int, default=200)
+        parser.add_argument("--slots", type=int, default=150)
+        parser.add_argument("--workers", type=int, default=16)
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the benchmark committee and users afterwards",
+        )
+
+    def handle(self, *args, **options):
+        members = options["members"]
+        slots = options["slots"]
+        tag = uuid.uuid4().hex[:8]
+
+        committee = Committee.objects.create(
+            name=f"bench-{tag}",
+            monthly_amount=Decimal("100.00"),
+            total_slots=slots,
+        )
+
+        users = User.objects.bulk_create([
+            User(username=f"bench-{tag}-{i}") for i in range(members)
+        ])
+        Wallet.objects.bulk_create(
+            [Wallet(user=u, balance=Decimal("1000.00")) for u in users],
+            ignore_conflicts=True,
+        )
+        tokens = [str(RefreshToken.for_user(u).access_token) for u in users]
+
+        url = f"/api/committees/{committee.id}/join/"
+
+        def join(token):
+            try:
+                response = Client().post(
+                    url, HTTP_AUTHORIZATION=f"Bearer {token}"
+                )
+                return response.status_code
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            statuses = list(pool.map(join, tokens))
+        elapsed = time.perf_counter() - started
+
+        committee.refresh_from_db()
+        joined = UserCommittee.objects.filter(committee=committee).count()
+        ok = statuses.count(200)
+
+        self.stdout.write(
+            f"{members} joins / {options['workers']} workers in {elapsed:.2f}s "
+            f"({members / elapsed:.0f} req/s)"
+        )
+        self.stdout.write(
+            f"accepted={ok} rejected={members - ok} "
+            f"memberships={joined} filled_slots={committee.filled_slots}"
+            f"/{committee.total_slots}"
+        )
+
+        consistent = ok == joined == committee.filled_slots == min(members, slots)
+
+        if not options["keep"]:
+            User.objects.filter(id__in=[u.id for u in users]).delete()
+            committee.delete()
+
+        if consistent:
+            self.stdout.write(self.style.SUCCESS("Slot accounting consistent"))
+        else:
+            self.stdout.write(self.style.ERROR("Slot accounting MISMATCH"))
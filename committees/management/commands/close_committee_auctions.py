@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from committees.services.auction_service import close_due_auctions
+
+class Command(BaseCommand):
+    help = "Close committee auctions past their closing time and pay out pot and dividends"
+
+    def handle(self, *args, **options):
+        settled, unsold = close_due_auctions()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Auctions settled: {settled}, closed without bids: {unsold}"
+            )
+        )
@@ -1,20 +1,14 @@
 from django.core.management.base import BaseCommand
-from committees.models import UserCommittee
-from committees.services.roi_service import credit_roi_if_eligible
+from committees.services.roi_service import ROI_CHUNK_SIZE, credit_eligible_roi
 
 class Command(BaseCommand):
     help = "Credit ROI to eligible committee users"
 
-    def handle(self, *args, **kwargs):
-        qs = UserCommittee.objects.select_related(
-            "user", "committee", "user__wallet"
-        )
-
-        credited = 0
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=ROI_CHUNK_SIZE)
 
-        for uc in qs:
-            if credit_roi_if_eligible(uc):
-                credited += 1
+    def handle(self, *args, **options):
+        credited = credit_eligible_roi(chunk_size=options["chunk_size"])
 
         self.stdout.write(
             self.style.SUCCESS(
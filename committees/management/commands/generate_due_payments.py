@@ -1,24 +1,17 @@
 from django.core.management.base import BaseCommand
-from django.utils.timezone import now
-from datetime import timedelta
-from wallet.models import PaymentTransaction
-from committees.models import UserCommitteePlan
+from committees.services.due_service import DUE_CHUNK_SIZE, generate_due_invoices
 
 class Command(BaseCommand):
-    def handle(self, *args, **kwargs):
-        plans = UserCommitteePlan.objects.filter(
-            is_active=True,
-            next_payment_due__lte=now()
-        )
+    help = "Generate one pending invoice per elapsed period for due committee plans"
 
-        for up in plans:
-            PaymentTransaction.objects.create(
-                user=up.user_committee.user,
-                user_committee=up.user_committee,
-                transaction_type="investment",
-                amount=up.plan.payment_amount,
-                status="pending"
-            )
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=DUE_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        plans, invoices = generate_due_invoices(chunk_size=options["chunk_size"])
 
-            up.next_payment_due = now() + timedelta(days=up.plan.interval_days)
-            up.save()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {invoices} invoices for {plans} plans"
+            )
+        )
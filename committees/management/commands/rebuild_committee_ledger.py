@@ -0,0 +1,190 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery, Sum
+
+from committees.models import CommitteeLedgerEntry, UserCommittee, UserCommitteePlan
+from committees.services.ledger_service import TOTALS_DELTA
+from committees.services.timeseries_service import invalidate_timeseries
+from wallet.models import PaymentTransaction, WalletTransaction
+
+TOTAL_FIELDS = ("total_invested", "total_withdrawn", "roi_earned")
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill the committee sub-ledger from existing wallet transactions "
+        "and recompute per-membership running totals"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+
+        unlinked = (
+            WalletTransaction.objects
+            .filter(status="success", committee_entry__isnull=True)
+            .filter(
+                Q(tx_type="committee_investment")
+                | Q(tx_type="withdraw", amount__gt=0)
+                | Q(tx_type="earned", reference_id__startswith="committee_roi_")
+            )
+            .order_by("created_at", "id")
+        )
+
+        tx_ids = list(unlinked.values_list("id", flat=True))
+
+        created = 0
+        for start in range(0, len(tx_ids), chunk_size):
+            batch = list(
+                WalletTransaction.objects
+                .filter(id__in=tx_ids[start:start + chunk_size])
+                .select_related("wallet")
+            )
+            with transaction.atomic():
+                created += self.link_batch(batch)
+
+        updated = self.recompute_totals(chunk_size)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Ledger entries created: {created}, memberships updated: {updated}"
+            )
+        )
+
+    def link_batch(self, batch):
+        refs = [tx.reference_id or "" for tx in batch]
+
+        payments = {
+            str(p.id): p.user_committee_id
+            for p in PaymentTransaction.objects.filter(
+                id__in=[int(r) for r in refs if r.isdigit()],
+                user_committee__isnull=False,
+            ).only("id", "user_committee_id")
+        }
+        plans = dict(
+            UserCommitteePlan.objects.filter(
+                id__in=[
+                    int(r.split("_")[2]) for r in refs
+                    if r.startswith("committee_due_") and r.split("_")[2].isdigit()
+                ]
+            ).values_list("id", "user_committee_id")
+        )
+        # (user, committee) -> [(joined_at, id), ...] oldest first; a
+        # user who left and rejoined has one entry per membership
+        memberships = defaultdict(list)
+        for uc_id, user_id, committee_id, joined_at in (
+            UserCommittee.objects
+            .filter(user_id__in={tx.wallet.user_id for tx in batch})
+            .order_by("joined_at", "id")
+            .values_list("id", "user_id", "committee_id", "joined_at")
+        ):
+            memberships[(user_id, committee_id)].append((joined_at, uc_id))
+
+        entries = []
+        for tx, ref in zip(batch, refs):
+            uc_id = None
+            entry_type = "investment"
+
+            if tx.tx_type == "earned":
+                entry_type = "roi"
+                uc_id = int(ref.rsplit("_", 1)[1])
+            elif ref.startswith("committee_join_"):
+                parts = ref.split("_")
+                if len(parts) == 4:
+                    # committee_join_<committee id>_<membership id>
+                    uc_id = int(parts[3])
+                else:
+                    # older committee_join_<committee id>: the membership
+                    # the user held when the debit was posted
+                    uc_id = self.membership_at(
+                        memberships[(tx.wallet.user_id, int(parts[2]))], tx.created_at
+                    )
+            elif ref.startswith("committee_due_"):
+                # committee_due_<plan id>[_<period>]
+                uc_id = plans.get(int(ref.split("_")[2]))
+            else:
+                uc_id = payments.get(ref)
+                if tx.tx_type == "withdraw":
+                    entry_type = "withdrawal"
+
+            if uc_id is None:
+                continue
+
+            entries.append(CommitteeLedgerEntry(
+                user_committee_id=uc_id,
+                entry_type=entry_type,
+                amount=abs(tx.amount),
+                wallet_transaction=tx,
+                reference_id=ref or None,
+                note="Backfilled from wallet history",
+            ))
+
+        # memberships deleted since the posting are skipped
+        existing = set(
+            UserCommittee.objects.filter(
+                id__in={e.user_committee_id for e in entries}
+            ).values_list("id", flat=True)
+        )
+        entries = [e for e in entries if e.user_committee_id in existing]
+
+        created = CommitteeLedgerEntry.objects.bulk_create(entries)
+
+        # created_at mirrors the original posting so time series line up
+        CommitteeLedgerEntry.objects.filter(
+            id__in=[e.id for e in created]
+        ).update(
+            created_at=Subquery(
+                WalletTransaction.objects.filter(
+                    id=OuterRef("wallet_transaction_id")
+                ).values("created_at")[:1]
+            )
+        )
+        invalidate_timeseries(existing)
+
+        return len(created)
+
+    @staticmethod
+    def membership_at(joined, at):
+        """Id of the latest membership joined at or before `at`."""
+        uc_id = None
+        for joined_at, candidate in joined:
+            if joined_at > at:
+                break
+            uc_id = candidate
+        return uc_id
+
+    def recompute_totals(self, chunk_size):
+        zero = Decimal("0")
+        updated = 0
+
+        ids = list(UserCommittee.objects.order_by("id").values_list("id", flat=True))
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            sums = {}
+            for row in (
+                CommitteeLedgerEntry.objects
+                .filter(user_committee_id__in=chunk)
+                .values("user_committee_id", "entry_type")
+                .annotate(total=Sum("amount"))
+            ):
+                sums[(row["user_committee_id"], row["entry_type"])] = row["total"]
+
+            memberships = list(UserCommittee.objects.filter(id__in=chunk))
+            for uc in memberships:
+                totals = {field: zero for field in TOTAL_FIELDS}
+                for entry_type, deltas in TOTALS_DELTA.items():
+                    amount = sums.get((uc.id, entry_type), zero)
+                    for field, sign in deltas.items():
+                        totals[field] += amount * sign
+                for field, value in totals.items():
+                    setattr(uc, field, value)
+
+            UserCommittee.objects.bulk_update(memberships, list(TOTAL_FIELDS))
+            updated += len(memberships)
+
+        return updated
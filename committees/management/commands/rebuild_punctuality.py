@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from committees.models import PunctualityScore, UserCommittee
+from committees.services.punctuality_service import rebuild_scores
+
+
+class Command(BaseCommand):
+    help = "Recompute punctuality scores from installment history, a chunk of users at a time"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+
+        # members with history, plus anyone who still has a score row
+        user_ids = sorted(
+            set(UserCommittee.objects.values_list("user_id", flat=True))
+            | set(PunctualityScore.objects.values_list("user_id", flat=True))
+        )
+        rows = 0
+
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            # rows are rewritten in place under lock, so live settlements
+            # running meanwhile wait for the chunk instead of being lost
+            with transaction.atomic():
+                rows += rebuild_scores(chunk)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Punctuality rebuilt for {len(user_ids)} users ({rows} rows)")
+        )
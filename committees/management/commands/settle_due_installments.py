@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from committees.services.autodebit_service import AUTO_DEBIT_CHUNK_SIZE, settle_due_installments
+from committees.services.due_service import generate_due_invoices
+
+class Command(BaseCommand):
+    help = "Invoice elapsed periods, then auto-debit due installments of opted-in plans"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=AUTO_DEBIT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        _, invoices = generate_due_invoices(chunk_size=options["chunk_size"])
+        settled, short, reminders = settle_due_installments(
+            chunk_size=options["chunk_size"]
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Invoiced {invoices}, settled {settled}, "
+                f"short {short} ({reminders} reminders sent)"
+            )
+        )
@@ -0,0 +1,55 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from committees.services.snapshot_service import history_start, take_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Write one end-of-day snapshot per committee (nightly: yesterday), "
+        "or backfill past days from the ledger with --backfill"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", type=date.fromisoformat)
+        parser.add_argument("--backfill", action="store_true")
+        parser.add_argument("--since", type=date.fromisoformat)
+        parser.add_argument("--chunk-days", type=int, default=30)
+
+    def handle(self, *args, **options):
+        yesterday = timezone.localdate() - timedelta(days=1)
+
+        if not options["backfill"]:
+            day = options["date"] or yesterday
+            written = take_snapshots(day, live_slots=day == yesterday)
+            self.stdout.write(
+                self.style.SUCCESS(f"Snapshots written for {day}: {written}")
+            )
+            return
+
+        day = options["since"] or history_start()
+        if day is None:
+            self.stdout.write("No committees to snapshot")
+            return
+
+        # the day just ended is left to the nightly run, which has live slots
+        last = options["date"] or yesterday - timedelta(days=1)
+        days = written = 0
+
+        while day <= last:
+            with transaction.atomic():
+                for _ in range(options["chunk_days"]):
+                    if day > last:
+                        break
+                    written += take_snapshots(day)
+                    days += 1
+                    day += timedelta(days=1)
+
+            self.stdout.write(f"Backfilled up to {day - timedelta(days=1)}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Backfilled {days} days, {written} snapshots")
+        )
@@ -1,6 +1,10 @@
+from decimal import Decimal
+
 from django.db import models
 from datetime import timedelta
 from django.contrib.auth.models import User
+from django.core.validators import MinValueValidator
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 
@@ -59,6 +63,38 @@ class Committee(models.Model):
         return self.name
 
 
+class UserCommitteeQuerySet(models.QuerySet):
+    """
+    Keeps left_at in step with is_active for bulk writes too, the same
+    way UserCommittee.save() does for single rows.
+    """
+
+    def update(self, **kwargs):
+        if kwargs.get("is_active") is True:
+            kwargs.setdefault("left_at", None)
+        elif kwargs.get("is_active") is False:
+            # rows that had already left keep their original date
+            kwargs.setdefault(
+                "left_at",
+                Coalesce(
+                    models.F("left_at"),
+                    models.Value(timezone.now(), output_field=models.DateTimeField()),
+                ),
+            )
+        return super().update(**kwargs)
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        if "is_active" in fields:
+            at = timezone.now()
+            for obj in objs:
+                if obj.is_active:
+                    obj.left_at = None
+                elif not obj.left_at:
+                    obj.left_at = at
+            fields = [*fields, "left_at"] if "left_at" not in fields else fields
+        return super().bulk_update(objs, fields, batch_size=batch_size)
+
+
 class UserCommittee(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     committee = models.ForeignKey(Committee, on_delete=models.CASCADE)
@@ -77,8 +113,33 @@ class UserCommittee(models.Model):
         default=0
     )
 
+    # Running totals maintained by committees.services.ledger_service
+    total_withdrawn = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0
+    )
+
     roi_unlock_date = models.DateTimeField(null=True, blank=True)
 
+    # set once ROI has been processed (also when it rounded to 0)
+    roi_credited_at = models.DateTimeField(null=True, blank=True)
+
+    # set when the membership is deactivated, feeds daily exit counts
+    left_at = models.DateTimeField(null=True, blank=True)
+
+    objects = UserCommitteeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # ROI crediting only ever scans memberships not yet processed
+            models.Index(
+                fields=["roi_unlock_date"],
+                condition=models.Q(roi_credited_at__isnull=True, roi_earned=0),
+                name="uc_roi_pending_unlock_idx",
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.joined_at:
             self.joined_at = timezone.now()
@@ -86,12 +147,311 @@ class UserCommittee(models.Model):
         if not self.roi_unlock_date:
             self.roi_unlock_date = self.joined_at + timedelta(days=365)
 
+        if self.is_active:
+            self.left_at = None
+        elif not self.left_at:
+            self.left_at = timezone.now()
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "is_active" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "left_at"}
+
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.user.username} - {self.committee.name}"
 
-        
+
+class CommitteeLedgerEntry(models.Model):
+    """
+    Per-membership sub-ledger. One row per wallet posting that moves
+    money in or out of a UserCommittee; the running totals on
+    UserCommittee are updated in the same transaction.
+    """
+    ENTRY_TYPE_CHOICES = (
+        ("investment", "Investment"),
+        ("withdrawal", "Withdrawal"),
+        ("roi", "ROI"),
+        ("payout", "Auction Payout"),
+        ("dividend", "Auction Dividend"),
+    )
+
+    user_committee = models.ForeignKey(
+        UserCommittee,
+        on_delete=models.CASCADE,
+        related_name="ledger_entries"
+    )
+    entry_type = models.CharField(max_length=20, choices=ENTRY_TYPE_CHOICES)
+
+    # always positive, direction comes from entry_type
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+
+    wallet_transaction = models.OneToOneField(
+        "wallet.WalletTransaction",
+        on_delete=models.SET_NULL,
+        related_name="committee_entry",
+        null=True,
+        blank=True
+    )
+    reference_id = models.CharField(max_length=100, null=True, blank=True)
+    note = models.CharField(max_length=255, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name_plural = "Committee ledger entries"
+        indexes = [
+            models.Index(
+                fields=["user_committee", "created_at"],
+                name="cle_uc_created_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_committee_id} | {self.entry_type} | {self.amount}"
+
+
+
+class CommitteeDailySnapshot(models.Model):
+    """
+    End-of-day figures for one committee, written by the
+    snapshot_committees command so history never has to be
+    re-aggregated from memberships.
+    """
+    committee = models.ForeignKey(
+        Committee,
+        on_delete=models.CASCADE,
+        related_name="daily_snapshots"
+    )
+    date = models.DateField()
+
+    # pooled principal: ledger investments minus withdrawals
+    aum = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    active_members = models.PositiveIntegerField(default=0)
+    joins = models.PositiveIntegerField(default=0)
+    exits = models.PositiveIntegerField(default=0)
+
+    dues_collected = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    dues_overdue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    total_slots = models.IntegerField(default=0)
+    filled_slots = models.IntegerField(default=0)
+
+    captured_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["committee", "date"],
+                name="unique_committee_daily_snapshot"
+            )
+        ]
+
+    def fill_rate(self):
+        if not self.total_slots:
+            return 0
+        return round(self.filled_slots * 100 / self.total_slots, 2)
+
+    def __str__(self):
+        return f"{self.committee_id} | {self.date} | {self.aum}"
+
+
+class CommitteeAuction(models.Model):
+    """
+    One chit cycle: members bid the discount they give up on the pot,
+    the highest discount takes the pot and the discount is shared out
+    to the other members as dividend.
+    """
+    STATUS_CHOICES = (
+        ("open", "Open"),
+        ("settled", "Settled"),
+        ("unsold", "Unsold"),
+    )
+
+    committee = models.ForeignKey(
+        Committee,
+        on_delete=models.CASCADE,
+        related_name="auctions"
+    )
+    cycle = models.PositiveIntegerField(blank=True)
+
+    # defaults to monthly_amount x active members when left empty
+    pot_amount = models.DecimalField(max_digits=14, decimal_places=2, blank=True)
+
+    # bids are a discount on the pot, capped at this share of it
+    max_discount_percent = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        default=40
+    )
+    min_increment = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=1
+    )
+
+    opens_at = models.DateTimeField(default=timezone.now)
+    closes_at = models.DateTimeField()
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="open")
+
+    # 🏆 Best bid so far, moved by one conditional UPDATE per bid
+    best_bid_amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        blank=True
+    )
+    best_bidder = models.ForeignKey(
+        UserCommittee,
+        on_delete=models.SET_NULL,
+        related_name="leading_auctions",
+        null=True,
+        blank=True
+    )
+    best_bid_at = models.DateTimeField(null=True, blank=True)
+
+    winner = models.ForeignKey(
+        UserCommittee,
+        on_delete=models.SET_NULL,
+        related_name="won_auctions",
+        null=True,
+        blank=True
+    )
+    dividend_per_member = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        null=True,
+        blank=True
+    )
+    settled_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-cycle"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["committee", "cycle"],
+                name="unique_committee_auction_cycle"
+            )
+        ]
+        indexes = [
+            # close job: WHERE status = 'open' AND closes_at <= now()
+            models.Index(
+                fields=["closes_at"],
+                condition=models.Q(status="open"),
+                name="auction_open_closes_idx",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self.cycle:
+            last = (
+                CommitteeAuction.objects
+                .filter(committee_id=self.committee_id)
+                .aggregate(last=models.Max("cycle"))["last"]
+            )
+            self.cycle = (last or 0) + 1
+
+        if self.pot_amount is None:
+            members = UserCommittee.objects.filter(
+                committee_id=self.committee_id,
+                is_active=True
+            ).count()
+            self.pot_amount = (self.committee.monthly_amount or 0) * members
+
+        super().save(*args, **kwargs)
+
+    def max_bid(self):
+        return (self.pot_amount * self.max_discount_percent / 100).quantize(Decimal("0.01"))
+
+    def __str__(self):
+        return f"{self.committee.name} - cycle {self.cycle}"
+
+
+class AuctionBid(models.Model):
+    """
+    Append-only: every accepted bid is a new row, never updated. A bid
+    is only accepted when it takes the lead, so the latest row is
+    always the auction's best bid.
+    """
+    auction = models.ForeignKey(
+        CommitteeAuction,
+        on_delete=models.CASCADE,
+        related_name="bids"
+    )
+    user_committee = models.ForeignKey(
+        UserCommittee,
+        on_delete=models.CASCADE,
+        related_name="auction_bids"
+    )
+
+    # discount offered on the pot
+    amount = models.DecimalField(max_digits=14, decimal_places=2)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["auction", "-amount"], name="auction_bid_amount_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.auction_id} | {self.user_committee_id} | {self.amount}"
+
+
+class PunctualityScore(models.Model):
+    """
+    Installment payment discipline, maintained incrementally by
+    committees.services.punctuality_service on every settlement or
+    overdue event. One row per user (user_committee empty) and one per
+    membership, so readers never scan payment history.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="punctuality_scores"
+    )
+    user_committee = models.OneToOneField(
+        UserCommittee,
+        on_delete=models.CASCADE,
+        related_name="punctuality",
+        null=True,
+        blank=True
+    )
+
+    on_time_count = models.PositiveIntegerField(default=0)
+    late_count = models.PositiveIntegerField(default=0)
+    overdue_count = models.PositiveIntegerField(default=0)
+    total_days_late = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    # exponentially decayed: 1 = always on time, 0 = always overdue
+    score = models.DecimalField(max_digits=6, decimal_places=4, default=1)
+
+    last_event_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user"],
+                condition=models.Q(user_committee__isnull=True),
+                name="unique_user_punctuality"
+            )
+        ]
+
+    def average_days_late(self):
+        if not self.late_count:
+            return Decimal("0")
+        return (self.total_days_late / self.late_count).quantize(Decimal("0.01"))
+
+    def __str__(self):
+        scope = self.user_committee_id or "all"
+        return f"{self.user_id} | {scope} | {self.score}"
 
 
 class Investment(models.Model):
@@ -139,12 +499,21 @@ class PaymentPlan(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2)
 
     # interval in days (1 = daily, 30 = monthly, 365 = yearly)
-    interval_days = models.PositiveIntegerField()
+    interval_days = models.PositiveIntegerField(validators=[MinValueValidator(1)])
 
     is_active = models.BooleanField(default=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            # 0 would keep a plan due forever, the scheduler never advances it
+            models.CheckConstraint(
+                condition=models.Q(interval_days__gt=0),
+                name="payment_plan_interval_days_positive",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.name} - ₹{self.amount}"
 
@@ -186,6 +555,16 @@ class UserCommitteePlan(models.Model):
 
     plan = models.ForeignKey(PaymentPlan, on_delete=models.PROTECT)
 
+    # denormalized from user_committee.user for the due inbox index
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="committee_plans",
+        null=True,
+        blank=True,
+        editable=False
+    )
+
     subscribed_at = models.DateTimeField(auto_now_add=True)
     next_due_at = models.DateTimeField(default=now)
     is_active = models.BooleanField(default=True)
@@ -195,7 +574,26 @@ class UserCommitteePlan(models.Model):
 
     is_active = models.BooleanField(default=True)
 
+    # opt-in: due invoices are settled from the wallet by settle_due_installments
+    auto_debit = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["is_active", "next_payment_due"],
+                name="ucp_active_next_due_idx",
+            ),
+            # due inbox: WHERE user_id = ? AND is_active AND next_payment_due <= now()
+            models.Index(
+                fields=["user", "next_payment_due"],
+                condition=models.Q(is_active=True),
+                name="ucp_user_due_active_idx",
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.next_payment_due:
             self.next_payment_due = now() + timedelta(days=self.plan.interval_days)
+        if not self.user_id:
+            self.user_id = self.user_committee.user_id
         super().save(*args, **kwargs)
@@ -0,0 +1,300 @@
+from decimal import Decimal, ROUND_DOWN
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Q, Value, When
+from django.utils import timezone
+
+from committees.models import (
+    AuctionBid,
+    CommitteeAuction,
+    CommitteeLedgerEntry,
+    UserCommittee,
+)
+from wallet.models import Wallet, WalletTransaction
+
+PAISE = Decimal("0.01")
+
+
+# =========================================================
+# BID INGESTION (APPEND-ONLY + ATOMIC BEST BID)
+# =========================================================
+
+def place_bid(*, auction_id, user, amount, at=None):
+    """
+    Records a bid if it beats the current best by at least the
+    auction's min_increment.
+
+    The lead is taken by a single conditional UPDATE on the auction
+    row, so concurrent bids serialize on that row and exactly one of
+    two equal bids wins; only then is the bid row appended.
+    Raises CommitteeAuction.DoesNotExist or ValueError.
+    """
+    at = at or timezone.now()
+    amount = Decimal(amount).quantize(PAISE)
+
+    auction = CommitteeAuction.objects.get(id=auction_id)
+
+    if auction.status != "open" or not auction.opens_at <= at < auction.closes_at:
+        raise ValueError("Auction is not open")
+
+    membership = UserCommittee.objects.filter(
+        user=user,
+        committee_id=auction.committee_id,
+        is_active=True,
+    ).first()
+
+    if membership is None:
+        raise ValueError("Not a member of this committee")
+
+    # a member takes the pot once per committee
+    if CommitteeAuction.objects.filter(
+        committee_id=auction.committee_id,
+        winner=membership,
+    ).exists():
+        raise ValueError("Members who already took the pot cannot bid")
+
+    if amount <= 0 or amount > auction.max_bid():
+        raise ValueError(f"Bid must be between 0 and {auction.max_bid()}")
+
+    with transaction.atomic():
+        took_lead = CommitteeAuction.objects.filter(
+            Q(best_bid_amount__isnull=True)
+            | Q(best_bid_amount__lte=amount - F("min_increment")),
+            id=auction.id,
+            status="open",
+            closes_at__gt=at,
+        ).update(
+            best_bid_amount=amount,
+            best_bidder=membership,
+            best_bid_at=at,
+        )
+
+        if not took_lead:
+            auction.refresh_from_db(fields=["status", "best_bid_amount", "min_increment"])
+            if auction.status != "open":
+                raise ValueError("Auction is not open")
+            raise ValueError(
+                f"Outbid: next bid must be at least "
+                f"{auction.best_bid_amount + auction.min_increment}"
+            )
+
+        return AuctionBid.objects.create(
+            auction=auction,
+            user_committee=membership,
+            amount=amount,
+        )
+
+
+# =========================================================
+# CLOSE + SETTLE (BULK WALLET POSTINGS)
+# =========================================================
+
+def split_dividend(discount, members):
+    """
+    Equal share per member, rounded down to paise.
+    Returns (share, remainder) with share * members + remainder == discount.
+    """
+    if not members:
+        return Decimal("0"), discount
+    share = (discount / members).quantize(PAISE, rounding=ROUND_DOWN)
+    return share, discount - share * members
+
+
+def _lock_participants(auction):
+    """
+    Wallets of the active members and the leader, then every membership
+    of the committee, locked in that order (wallet before membership,
+    like pay-now and auto-debit). Members without a wallet get one, so
+    nobody is skipped.
+
+    Returns (rows, pool): rows of {"id", "wallet_id"} for the payout and
+    dividend postings, and the committee pool. Every investment,
+    withdrawal, payout and dividend moves total_invested, so the pool -
+    money paid in and not yet handed back - is its sum.
+    """
+    participants = UserCommittee.objects.filter(
+        Q(is_active=True) | Q(id=auction.best_bidder_id),
+        committee_id=auction.committee_id,
+    )
+
+    for user_id in participants.filter(user__wallet__isnull=True).values_list("user_id", flat=True):
+        Wallet.objects.get_or_create(user_id=user_id)
+
+    # of=self: the join must not lock auth_user or membership rows
+    # ahead of the ordered membership lock below
+    list(
+        Wallet.objects.select_for_update(of=("self",))
+        .filter(user__usercommittee__in=participants)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+
+    pool = sum(
+        UserCommittee.objects.select_for_update()
+        .filter(committee_id=auction.committee_id)
+        .order_by("id")
+        .values_list("total_invested", flat=True),
+        Decimal("0"),
+    )
+
+    rows = list(
+        participants
+        .annotate(wallet_id=F("user__wallet__id"))
+        .values("id", "wallet_id")
+    )
+    return rows, pool
+
+
+def _settle_auction(auction, at):
+    """
+    Pays the pot minus the winning discount to the winner and shares
+    the discount among the other active members: one INSERT for
+    wallet transactions, one for ledger entries, one wallet UPDATE and
+    one membership UPDATE.
+
+    The pot is funded from the committee pool. When the pool is short of
+    pot_amount only the pool is paid out, with the winning discount
+    scaled down in proportion; an empty pool leaves the auction unsold.
+    Payouts and dividends are taken off the recipients' total_invested,
+    so nobody can withdraw the same money again as principal.
+    """
+    winner_id = auction.best_bidder_id
+
+    rows, pool = _lock_participants(auction) if winner_id else ([], Decimal("0"))
+    funded = min(auction.pot_amount, max(pool, Decimal("0")))
+
+    if winner_id is None or funded <= 0:
+        auction.status = "unsold"
+        auction.settled_at = at
+        auction.save(update_fields=["status", "settled_at"])
+        return False
+
+    others = [row for row in rows if row["id"] != winner_id]
+    winner_wallet = next(row["wallet_id"] for row in rows if row["id"] == winner_id)
+
+    discount = (auction.best_bid_amount * funded / auction.pot_amount).quantize(PAISE, rounding=ROUND_DOWN)
+    share, remainder = split_dividend(discount, len(others))
+
+    # rounding leftovers stay with the winner so the pot is paid out exactly
+    payout = funded - discount + remainder
+
+    postings = [(winner_id, winner_wallet, "committee_payout", "payout", payout)]
+    if share > 0:
+        postings += [
+            (row["id"], row["wallet_id"], "earned", "dividend", share)
+            for row in others
+        ]
+
+    transactions = []
+    entries = []
+    balance_delta = {}
+    earned_delta = {}
+    invested_delta = {}
+
+    for uc_id, wallet_id, tx_type, entry_type, amount in postings:
+        reference_id = f"committee_auction_{auction.id}_{uc_id}"
+        wallet_tx = WalletTransaction(
+            wallet_id=wallet_id,
+            amount=amount,
+            tx_type=tx_type,
+            source="system",
+            status="success",
+            reference_id=reference_id,
+            note=f"Auction {entry_type} for {auction}",
+        )
+        transactions.append(wallet_tx)
+        entries.append(CommitteeLedgerEntry(
+            user_committee_id=uc_id,
+            entry_type=entry_type,
+            amount=amount,
+            wallet_transaction=wallet_tx,
+            reference_id=reference_id,
+            note=f"Auction {entry_type}",
+        ))
+        balance_delta[wallet_id] = balance_delta.get(wallet_id, Decimal("0")) + amount
+        if tx_type == "earned":
+            earned_delta[wallet_id] = earned_delta.get(wallet_id, Decimal("0")) + amount
+        invested_delta[uc_id] = -amount
+
+    WalletTransaction.objects.bulk_create(transactions)
+    CommitteeLedgerEntry.objects.bulk_create(entries)
+
+    money = DecimalField(max_digits=15, decimal_places=2)
+    Wallet.objects.filter(id__in=balance_delta).update(
+        balance=F("balance") + Case(
+            *[When(id=k, then=Value(v)) for k, v in balance_delta.items()],
+            output_field=money,
+        ),
+        total_earned=F("total_earned") + Case(
+            *[When(id=k, then=Value(v)) for k, v in earned_delta.items()],
+            default=Value(Decimal("0")),
+            output_field=money,
+        ),
+        updated_at=at,
+    )
+    UserCommittee.objects.filter(id__in=invested_delta).update(
+        total_invested=F("total_invested") + Case(
+            *[When(id=k, then=Value(v)) for k, v in invested_delta.items()],
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+    )
+
+    auction.status = "settled"
+    auction.winner_id = winner_id
+    auction.dividend_per_member = share
+    auction.settled_at = at
+    auction.save(update_fields=["status", "winner", "dividend_per_member", "settled_at"])
+    return True
+
+
+def close_auction(auction_id, at=None):
+    """
+    Closes and settles one auction if it is open and past closes_at.
+    Returns True (settled), False (unsold) or None (not due, or
+    already closed by another worker).
+    """
+    at = at or timezone.now()
+
+    with transaction.atomic():
+        auction = (
+            CommitteeAuction.objects
+            .select_for_update(skip_locked=True, of=("self",))
+            .select_related("committee")
+            .filter(id=auction_id, status="open", closes_at__lte=at)
+            .first()
+        )
+        if auction is None:
+            return None
+        return _settle_auction(auction, at)
+
+
+def close_due_auctions(at=None):
+    """
+    Closes and settles every open auction past closes_at, one auction
+    per transaction. Auctions locked by another worker are skipped.
+
+    Returns (settled, unsold).
+    """
+    at = at or timezone.now()
+    settled = unsold = 0
+
+    while True:
+        with transaction.atomic():
+            auction = (
+                CommitteeAuction.objects
+                .select_for_update(skip_locked=True, of=("self",))
+                .select_related("committee")
+                .filter(status="open", closes_at__lte=at)
+                .order_by("closes_at", "id")
+                .first()
+            )
+
+            if auction is None:
+                break
+
+            if _settle_auction(auction, at):
+                settled += 1
+            else:
+                unsold += 1
+
+    return settled, unsold
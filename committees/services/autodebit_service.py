@@ -0,0 +1,233 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Value, When
+from django.utils import timezone
+
+from committees.models import CommitteeLedgerEntry, UserCommittee, UserCommitteePlan
+from committees.services.due_service import due_reference
+from committees.services.punctuality_service import PunctualityEvent, days_late, record_events
+from notifications.models import DueNotification
+from wallet.models import PaymentTransaction, Wallet, WalletTransaction
+from wallet.services import spendable_balance
+
+AUTO_DEBIT_CHUNK_SIZE = 500
+
+# minutes between reminders for members who could not be debited
+REMINDER_REPEAT_MINUTES = 60
+
+
+# =========================================================
+# AUTO-DEBIT SETTLEMENT (BATCHED, SKIP LOCKED)
+# =========================================================
+
+def _delta_case(deltas, max_digits):
+    return Case(
+        *[When(id=key, then=Value(amount)) for key, amount in deltas.items()],
+        output_field=DecimalField(max_digits=max_digits, decimal_places=2),
+    )
+
+
+def _settle_chunk(invoices, at):
+    """
+    Settles one chunk of claimed invoices. Wallets are locked in id
+    order and debited with one INSERT for wallet transactions, one for
+    ledger entries and one UPDATE per touched table.
+
+    Returns (settled, short_invoices).
+    """
+    wallets = {
+        w.user_id: w
+        for w in Wallet.objects.select_for_update()
+        .filter(user_id__in={inv.user_id for inv in invoices})
+        .order_by("id")
+    }
+    keys = {
+        inv.id: due_reference(inv.user_committee_plan_id, inv.due_at)
+        for inv in invoices
+    }
+
+    # 🔒 Idempotency — periods already paid (pay_due or an earlier run)
+    already_posted = set(
+        WalletTransaction.objects.filter(
+            tx_type="committee_investment",
+            status="success",
+            reference_id__in=keys.values(),
+        ).values_list("reference_id", flat=True)
+    )
+
+    available = {w.id: spendable_balance(w) for w in wallets.values()}
+    transactions = []
+    entries = []
+    wallet_debits = defaultdict(Decimal)
+    invested = defaultdict(Decimal)
+    settled = []
+    short = []
+    events = []
+
+    # oldest period first, so a thin wallet pays what is owed longest
+    for inv in sorted(invoices, key=lambda inv: (inv.due_at, inv.id)):
+        wallet = wallets.get(inv.user_id)
+
+        if keys[inv.id] in already_posted:
+            settled.append(inv)
+            continue
+
+        if wallet is None or available[wallet.id] < inv.amount:
+            short.append(inv)
+            continue
+
+        available[wallet.id] -= inv.amount
+        wallet_tx = WalletTransaction(
+            wallet=wallet,
+            amount=-inv.amount,
+            tx_type="committee_investment",
+            source="system",
+            status="success",
+            reference_id=keys[inv.id],
+            note="Committee auto-debit",
+        )
+        transactions.append(wallet_tx)
+        entries.append(CommitteeLedgerEntry(
+            user_committee_id=inv.user_committee_id,
+            entry_type="investment",
+            amount=inv.amount,
+            wallet_transaction=wallet_tx,
+            reference_id=keys[inv.id],
+            note="Committee auto-debit",
+        ))
+        wallet_debits[wallet.id] += inv.amount
+        invested[inv.user_committee_id] += inv.amount
+
+        inv.wallet = wallet
+        inv.wallet_effect = "debit"
+        settled.append(inv)
+        events.append(PunctualityEvent(
+            inv.user_id,
+            inv.user_committee_id,
+            days_late(inv.due_at, at),
+            at,
+            replaces_overdue=inv.status == "overdue",
+        ))
+
+    WalletTransaction.objects.bulk_create(transactions)
+    CommitteeLedgerEntry.objects.bulk_create(entries)
+
+    if wallet_debits:
+        Wallet.objects.filter(id__in=wallet_debits).update(
+            balance=F("balance") - _delta_case(wallet_debits, 15),
+            updated_at=at,
+        )
+        UserCommittee.objects.filter(id__in=invested).update(
+            total_invested=F("total_invested") + _delta_case(invested, 12),
+        )
+
+    for inv in settled:
+        inv.status = "approved"
+        inv.processed_at = at
+        inv.wallet_synced = True
+
+    # bulk_update skips post_save, so the wallet signal never re-debits
+    PaymentTransaction.objects.bulk_update(
+        settled,
+        ["status", "processed_at", "wallet_synced", "wallet", "wallet_effect"],
+    )
+    UserCommitteePlan.objects.filter(
+        id__in={inv.user_committee_plan_id for inv in settled}
+    ).update(last_payment_at=at)
+
+    record_events(events)
+
+    return len(settled), short
+
+
+def _route_to_reminders(short, at):
+    """
+    Marks newly short invoices overdue and opens one due reminder per
+    membership that does not already have an active one.
+    Returns the number of reminders created.
+    """
+    newly_overdue = [inv for inv in short if inv.status == "pending"]
+    if not newly_overdue:
+        return 0
+
+    PaymentTransaction.objects.filter(
+        id__in=[inv.id for inv in newly_overdue]
+    ).update(status="overdue")
+
+    record_events(
+        PunctualityEvent(inv.user_id, inv.user_committee_id, None, at)
+        for inv in newly_overdue
+    )
+
+    reminded = set(
+        DueNotification.objects.filter(
+            user_committee_id__in={inv.user_committee_id for inv in newly_overdue},
+            is_active=True,
+        ).values_list("user_committee_id", flat=True)
+    )
+
+    reminders = {}
+    for inv in newly_overdue:
+        if inv.user_committee_id in reminded or inv.user_committee_id in reminders:
+            continue
+        plan = inv.user_committee_plan
+        reminders[inv.user_committee_id] = DueNotification(
+            user_id=inv.user_id,
+            committee_id=inv.user_committee.committee_id,
+            plan_id=plan.plan_id,
+            user_committee_id=inv.user_committee_id,
+            amount=inv.amount,
+            repeat_after_minutes=REMINDER_REPEAT_MINUTES,
+            last_notified_at=at,
+        )
+
+    DueNotification.objects.bulk_create(reminders.values())
+    return len(reminders)
+
+
+def settle_due_installments(*, chunk_size=AUTO_DEBIT_CHUNK_SIZE, at=None):
+    """
+    Debits every due invoice of auto-debit plans from the member's
+    wallet. Workers claim invoices with FOR UPDATE SKIP LOCKED, so
+    several can run side by side; each chunk commits on its own.
+    Members who cannot cover an installment are sent a due reminder
+    and retried on the next run.
+
+    Returns (settled, short, reminders).
+    """
+    at = at or timezone.now()
+    last_id = 0
+    settled_total = short_total = reminders_total = 0
+
+    while True:
+        with transaction.atomic():
+            invoices = list(
+                PaymentTransaction.objects
+                .select_for_update(skip_locked=True, of=("self",))
+                .select_related("user_committee_plan", "user_committee")
+                .filter(
+                    transaction_type="investment",
+                    status__in=["pending", "overdue"],
+                    due_at__lte=at,
+                    amount__gt=0,
+                    user_committee_plan__auto_debit=True,
+                    user_committee_plan__is_active=True,
+                    id__gt=last_id,
+                )
+                .order_by("id")[:chunk_size]
+            )
+
+            if not invoices:
+                break
+
+            settled, short = _settle_chunk(invoices, at)
+            reminders_total += _route_to_reminders(short, at)
+
+            settled_total += settled
+            short_total += len(short)
+
+        last_id = invoices[-1].id
+
+    return settled_total, short_total, reminders_total
@@ -0,0 +1,173 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from committees.models import UserCommitteePlan
+from wallet.models import PaymentTransaction
+
+DUE_CHUNK_SIZE = 500
+
+
+# =========================================================
+# DUE SCHEDULER (CATCH-UP AWARE)
+# =========================================================
+
+def due_reference(plan_id, due_at):
+    """
+    Wallet idempotency key for one installment period of a plan.
+    """
+    return f"committee_due_{plan_id}_{timezone.localtime(due_at):%Y%m%d}"
+
+
+def elapsed_due_dates(next_payment_due, interval_days, at):
+    """
+    Every due date from next_payment_due up to `at`, one per period.
+    Returns (due_dates, next_due_after_them).
+    """
+    if not interval_days or interval_days <= 0:
+        raise ValueError("interval_days must be greater than 0")
+
+    step = timedelta(days=interval_days)
+    due = next_payment_due
+    dates = []
+
+    while due <= at:
+        dates.append(due)
+        due += step
+
+    return dates, due
+
+
+def generate_due_invoices(*, chunk_size=DUE_CHUNK_SIZE, at=None):
+    """
+    Creates one pending investment invoice per elapsed period for
+    every active plan that is due, then moves next_payment_due past
+    `at` on the original schedule (missed periods are not skipped).
+
+    Invoices are keyed on (user_committee_plan, due_at), so a re-run
+    after a crash never duplicates a period.
+
+    Returns (plans_processed, invoices_created).
+    """
+    at = at or timezone.now()
+    last_id = 0
+    plans_processed = 0
+    invoices_created = 0
+
+    while True:
+        with transaction.atomic():
+            plans = list(
+                UserCommitteePlan.objects
+                .select_for_update(skip_locked=True, of=("self",))
+                .select_related("plan", "user_committee")
+                .filter(
+                    is_active=True,
+                    next_payment_due__lte=at,
+                    plan__interval_days__gt=0,
+                    id__gt=last_id,
+                )
+                .order_by("id")[:chunk_size]
+            )
+
+            if not plans:
+                break
+
+            invoices = []
+            advanced = []
+
+            for up in plans:
+                due_dates, next_due = elapsed_due_dates(
+                    up.next_payment_due, up.plan.interval_days, at
+                )
+
+                for due_at in due_dates:
+                    invoices.append(PaymentTransaction(
+                        user_id=up.user_committee.user_id,
+                        user_committee_id=up.user_committee_id,
+                        user_committee_plan=up,
+                        transaction_type="investment",
+                        amount=up.plan.amount,
+                        due_at=due_at,
+                        status="pending",
+                        is_recurring=True,
+                    ))
+
+                if due_dates:
+                    up.next_payment_due = next_due
+                    advanced.append(up)
+
+            # bulk_create(ignore_conflicts=True) hands back skipped rows
+            # too, so count what exists; the plans are locked, nobody
+            # else is inserting their invoices meanwhile
+            existing = PaymentTransaction.objects.filter(
+                user_committee_plan__in=advanced,
+                transaction_type="investment",
+            )
+            before = existing.count()
+            PaymentTransaction.objects.bulk_create(invoices, ignore_conflicts=True)
+            UserCommitteePlan.objects.bulk_update(advanced, ["next_payment_due"])
+
+            plans_processed += len(advanced)
+            invoices_created += existing.count() - before
+
+        last_id = plans[-1].id
+
+    return plans_processed, invoices_created
+
+
+# =========================================================
+# DUE INBOX (PARTIAL INDEX ON user, next_payment_due)
+# =========================================================
+#
+# Once the scheduler has run, next_payment_due already points at the
+# next period; what is still owed lives on as pending / overdue
+# invoices. A plan is due while either is true.
+
+OPEN_INVOICE_STATUSES = ("pending", "overdue")
+
+
+def open_invoices(**filters):
+    """
+    Unpaid installment invoices, oldest first.
+    """
+    return PaymentTransaction.objects.filter(
+        transaction_type="investment",
+        status__in=OPEN_INVOICE_STATUSES,
+        **filters,
+    ).order_by("due_at")
+
+
+def due_plans(user, at=None):
+    """
+    Active plans of `user` whose installment is due or still unpaid.
+    """
+    return UserCommitteePlan.objects.filter(
+        Q(next_payment_due__lte=at or timezone.now())
+        | Q(Exists(open_invoices(user_committee_plan=OuterRef("pk")))),
+        user=user,
+        is_active=True,
+    )
+
+
+def due_inbox(user, at=None):
+    """
+    Due plans with plan and committee joined in the same query;
+    `due_at` is the oldest unpaid period.
+    """
+    oldest_open = open_invoices(user_committee_plan=OuterRef("pk")).values("due_at")[:1]
+    return (
+        due_plans(user, at)
+        .select_related("plan", "user_committee__committee")
+        .annotate(due_at=Coalesce(Subquery(oldest_open), F("next_payment_due")))
+        .order_by("due_at")
+    )
+
+
+def has_due(user, at=None):
+    """
+    EXISTS probe, cheap enough to poll from every screen.
+    """
+    return due_plans(user, at).exists()
@@ -0,0 +1,69 @@
+from django.db import transaction
+from django.db.models import F
+
+from committees.models import CommitteeLedgerEntry, UserCommittee
+
+
+# =========================================================
+# PER-MEMBERSHIP SUB-LEDGER
+# =========================================================
+
+# entry_type → {running total field: sign}
+TOTALS_DELTA = {
+    "investment": {"total_invested": 1},
+    "withdrawal": {"total_invested": -1, "total_withdrawn": 1},
+    "roi": {"roi_earned": 1},
+    # auction money leaves the committee pool: it is paid out of the
+    # members' contributions, so it is no longer withdrawable principal
+    "payout": {"total_invested": -1},
+    "dividend": {"total_invested": -1},
+}
+
+
+def totals_update(entry_type, amount):
+    """
+    UPDATE kwargs that move the running totals for one entry.
+    """
+    return {
+        field: F(field) + (amount * sign)
+        for field, sign in TOTALS_DELTA[entry_type].items()
+    }
+
+
+@transaction.atomic
+def post_committee_entry(
+    *,
+    user_committee: UserCommittee,
+    entry_type: str,   # investment | withdrawal | roi
+    amount,
+    wallet_transaction=None,
+    reference_id: str | None = None,
+    note: str = "",
+):
+    """
+    Records a membership ledger entry and moves the running totals.
+
+    Call it with the WalletTransaction returned by credit_wallet() /
+    debit_wallet(), inside the same transaction. A None wallet
+    transaction means the posting was an idempotent replay, so
+    nothing is recorded.
+    """
+    if wallet_transaction is None:
+        return None
+
+    entry = CommitteeLedgerEntry.objects.create(
+        user_committee=user_committee,
+        entry_type=entry_type,
+        amount=amount,
+        wallet_transaction=wallet_transaction,
+        reference_id=reference_id,
+        note=note,
+    )
+
+    fields = list(TOTALS_DELTA[entry_type])
+    UserCommittee.objects.filter(pk=user_committee.pk).update(
+        **totals_update(entry_type, amount)
+    )
+    user_committee.refresh_from_db(fields=fields)
+
+    return entry
@@ -0,0 +1,39 @@
+from django.db.models import Exists, F, OuterRef, Prefetch
+
+from committees.models import UserCommittee
+from committees.services.due_service import open_invoices as open_plan_invoices
+from wallet.models import PaymentTransaction
+
+
+# =========================================================
+# PORTFOLIO (ONE ANNOTATED QUERYSET, CONSTANT QUERY COUNT)
+# =========================================================
+
+def portfolio_queryset(user):
+    """
+    Every membership of `user` with committee, active plan and open
+    invoices loaded up front: one query for the memberships plus one
+    for the prefetched invoices, however many committees there are.
+    """
+    open_invoices = PaymentTransaction.objects.filter(
+        transaction_type="investment",
+        status__in=["pending", "overdue"],
+    ).order_by("due_at", "created_at")
+
+    return (
+        UserCommittee.objects
+        .filter(user=user)
+        .select_related("committee", "active_plan__plan")
+        .annotate(
+            next_payment_due=F("active_plan__next_payment_due"),
+            # unpaid periods the scheduler has already moved past, as in
+            # due_service.due_plans
+            has_open_invoice=Exists(
+                open_plan_invoices(user_committee_plan=OuterRef("active_plan"))
+            ),
+        )
+        .prefetch_related(
+            Prefetch("payments", queryset=open_invoices, to_attr="open_invoices")
+        )
+        .order_by("-joined_at")
+    )
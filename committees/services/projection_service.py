@@ -0,0 +1,221 @@
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+from django.db.models import BigIntegerField, F, Value
+from django.db.models.functions import Cast, Coalesce
+
+# =========================================================
+# VECTORIZED ROI / MATURITY PROJECTION
+# =========================================================
+#
+# Money is carried as int64 paise and roi_percent as int64 hundredths
+# of a percent (basis points), so the vectorized pass is exact.
+# Decimals only exist at the edges: to_paise() on the way in,
+# from_paise() on the way out. Rounding is ROUND_HALF_UP, the same
+# as the Postgres cast used when ROI is actually credited.
+
+SECONDS_PER_DAY = 86400
+
+# 12 months == 365 days, matching roi_unlock_date
+SECONDS_PER_MONTH_X12 = 365 * SECONDS_PER_DAY
+
+
+def to_paise(values):
+    return np.fromiter(
+        (
+            int(Decimal(v or 0).scaleb(2).to_integral_value(ROUND_HALF_UP))
+            for v in values
+        ),
+        dtype=np.int64,
+    )
+
+
+def to_basis_points(percents):
+    # same representation, different unit
+    return to_paise(percents)
+
+
+def to_epoch(datetimes):
+    """
+    Aware datetimes → int64 epoch seconds, None → 0.
+    """
+    return np.fromiter(
+        (int(dt.timestamp()) if dt else 0 for dt in datetimes),
+        dtype=np.int64,
+    )
+
+
+def from_paise(array):
+    return [Decimal(int(v)).scaleb(-2) for v in array]
+
+
+def round_half_up_div(numerator, denominator):
+    """
+    Integer division rounded half away from zero, element-wise.
+    """
+    sign = np.where(numerator < 0, -1, 1)
+    return sign * ((np.abs(numerator) + denominator // 2) // denominator)
+
+
+def roi_on(principal_paise, roi_bp):
+    """
+    Flat ROI: principal * roi_percent / 100, in paise.
+    """
+    return round_half_up_div(principal_paise * roi_bp, 10000)
+
+
+def project_arrays(
+    *,
+    invested,        # paise
+    installment,     # paise per period, 0 when there is no active plan
+    interval_days,   # 0 when there is no active plan
+    next_due,        # epoch seconds, 0 when there is no active plan
+    joined_at,       # epoch seconds
+    duration_months,
+    roi_bp,
+):
+    """
+    Projects every membership to maturity in one pass.
+
+    Future contributions are the installments whose due dates fall
+    between next_due and maturity (both inclusive); ROI is flat on
+    the projected principal. Returns a dict of int64 arrays.
+    """
+    maturity = joined_at + duration_months * SECONDS_PER_MONTH_X12 // 12
+
+    interval = interval_days.astype(np.int64) * SECONDS_PER_DAY
+    on_plan = (interval > 0) & (next_due > 0) & (next_due <= maturity)
+
+    periods = np.where(
+        on_plan,
+        (maturity - next_due) // np.where(interval > 0, interval, 1) + 1,
+        0,
+    )
+    contributions = periods * installment
+    principal = invested + contributions
+    roi = roi_on(principal, roi_bp)
+
+    return {
+        "maturity_at": maturity,
+        "remaining_periods": periods,
+        "projected_contributions": contributions,
+        "projected_invested": principal,
+        "projected_roi": roi,
+        "maturity_value": principal + roi,
+    }
+
+
+def flat_roi(amounts, roi_percents):
+    """
+    Decimal in, Decimal out: [(roi, amount + roi), ...] for each pair.
+    """
+    principal = to_paise(amounts)
+    roi = roi_on(principal, to_basis_points(roi_percents))
+    return list(zip(from_paise(roi), from_paise(principal + roi)))
+
+
+# =========================================================
+# MEMBERSHIP ADAPTERS
+# =========================================================
+
+def project_user_committees(user_committees):
+    """
+    Projects already-loaded UserCommittee objects (committee and
+    active_plan__plan select_related). Returns one dict of Decimals /
+    datetimes per membership, in input order.
+    """
+    user_committees = list(user_committees)
+    plans = [_active_plan(uc) for uc in user_committees]
+
+    result = project_arrays(
+        invested=to_paise(uc.total_invested for uc in user_committees),
+        installment=to_paise(p.plan.amount if p else 0 for p in plans),
+        interval_days=np.fromiter(
+            (p.plan.interval_days if p else 0 for p in plans), dtype=np.int64
+        ),
+        next_due=to_epoch(p.next_payment_due if p else None for p in plans),
+        joined_at=to_epoch(uc.joined_at for uc in user_committees),
+        duration_months=np.fromiter(
+            (uc.committee.duration_months for uc in user_committees), dtype=np.int64
+        ),
+        roi_bp=to_basis_points(uc.committee.roi_percent for uc in user_committees),
+    )
+
+    columns = {
+        key: from_paise(result[key])
+        for key in (
+            "projected_contributions",
+            "projected_invested",
+            "projected_roi",
+            "maturity_value",
+        )
+    }
+
+    return [
+        {
+            **{key: values[i] for key, values in columns.items()},
+            "remaining_periods": int(result["remaining_periods"][i]),
+            "maturity_at": datetime.fromtimestamp(
+                int(result["maturity_at"][i]), tz=dt_timezone.utc
+            ),
+        }
+        for i in range(len(user_committees))
+    ]
+
+
+def project_queryset(queryset):
+    """
+    Bulk variant for reports: one query pulls integer paise / basis
+    points straight from Postgres, then a single vectorized pass.
+    Returns (ids, dict of int64 arrays).
+    """
+    rows = list(
+        queryset.annotate(
+            invested_paise=Cast(F("total_invested") * 100, BigIntegerField()),
+            installment_paise=Cast(
+                Coalesce(F("active_plan__plan__amount"), Value(Decimal("0"))) * 100,
+                BigIntegerField(),
+            ),
+            roi_bp=Cast(F("committee__roi_percent") * 100, BigIntegerField()),
+        ).values_list(
+            "id",
+            "invested_paise",
+            "installment_paise",
+            "active_plan__plan__interval_days",
+            "active_plan__next_payment_due",
+            "active_plan__is_active",
+            "joined_at",
+            "committee__duration_months",
+            "roi_bp",
+        )
+    )
+
+    if not rows:
+        return [], project_arrays(**{
+            key: np.zeros(0, dtype=np.int64)
+            for key in (
+                "invested", "installment", "interval_days", "next_due",
+                "joined_at", "duration_months", "roi_bp",
+            )
+        })
+
+    ids, invested, installment, interval, next_due, active, joined, months, roi_bp = zip(*rows)
+    active = np.fromiter((bool(a) for a in active), dtype=bool)
+
+    return list(ids), project_arrays(
+        invested=np.array(invested, dtype=np.int64),
+        installment=np.where(active, np.array(installment, dtype=np.int64), 0),
+        interval_days=np.where(
+            active, np.array([i or 0 for i in interval], dtype=np.int64), 0
+        ),
+        next_due=np.where(active, to_epoch(next_due), 0),
+        joined_at=to_epoch(joined),
+        duration_months=np.array(months, dtype=np.int64),
+        roi_bp=np.array(roi_bp, dtype=np.int64),
+    )
+
+
+def _active_plan(user_committee):
+    plan = getattr(user_committee, "active_plan", None)
+    return plan if plan and plan.is_active else None
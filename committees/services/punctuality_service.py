@@ -0,0 +1,367 @@
+import re
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import (
+    Case,
+    CharField,
+    DecimalField,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce, Greatest
+from django.utils import timezone
+
+from committees.models import PunctualityScore, UserCommitteePlan
+from committees.services.due_service import due_reference
+from wallet.models import PaymentTransaction, WalletTransaction
+
+# weight of the newest event in the decayed score
+DECAY_WEIGHT = Decimal("0.2")
+
+# a payment this many days late counts as badly as an overdue one
+LATE_HORIZON_DAYS = Decimal("30")
+
+# below this, loans and new committee memberships are refused
+MIN_PUNCTUALITY_SCORE = Decimal("0.5")
+
+SCORE_PLACES = Decimal("0.0001")
+
+DUE_REFERENCE = re.compile(r"^committee_due_(\d+)_(\d{8})$")
+
+SCORE_FIELDS = (
+    "on_time_count",
+    "late_count",
+    "overdue_count",
+    "total_days_late",
+    "score",
+    "last_event_at",
+)
+
+# days_late is None for an overdue event. replaces_overdue: the payment
+# settles an invoice that may already have been counted as overdue, so
+# the owner is refolded from history instead (one event per invoice).
+PunctualityEvent = namedtuple(
+    "PunctualityEvent",
+    ["user_id", "user_committee_id", "days_late", "at", "replaces_overdue"],
+    defaults=(False,),
+)
+
+
+# =========================================================
+# INCREMENTAL PUNCTUALITY SCORE
+# =========================================================
+#
+# score' = score * (1 - w) + observation * w, with observation 1 for
+# an on-time payment, falling linearly to 0 at LATE_HORIZON_DAYS late,
+# and 0 for an overdue event. k events folded at once are a single
+# UPDATE: score' = score * (1 - w)^k + sum of their weighted terms.
+
+def days_late(due_at, paid_at):
+    seconds = (paid_at - due_at).total_seconds()
+    return max(Decimal("0"), Decimal(seconds / 86400).quantize(Decimal("0.01")))
+
+
+def reference_due_by(reference_id):
+    """
+    End of the due day named by a due_reference(), or None. A payment
+    made without an invoice only keeps that day on record, so it is
+    scored against it both when it happens and on a rebuild.
+    """
+    match = DUE_REFERENCE.match(reference_id or "")
+    if match is None:
+        return None
+    due_day = datetime.strptime(match.group(2), "%Y%m%d").date()
+    return timezone.make_aware(datetime.combine(due_day + timedelta(days=1), time.min))
+
+
+def payment_event(*, user_committee, due_at, paid_at, replaces_overdue=False):
+    return PunctualityEvent(
+        user_committee.user_id,
+        user_committee.id,
+        days_late(due_at, paid_at),
+        paid_at,
+        replaces_overdue,
+    )
+
+
+def overdue_event(*, user_committee, at):
+    return PunctualityEvent(user_committee.user_id, user_committee.id, None, at)
+
+
+def observation(days):
+    if days is None:
+        return Decimal("0")
+    return max(Decimal("0"), 1 - days / LATE_HORIZON_DAYS)
+
+
+class _Fold:
+    """
+    Accumulated effect of consecutive events on one score row.
+    """
+
+    def __init__(self):
+        self.on_time = self.late = self.overdue = 0
+        self.days = Decimal("0")
+        self.multiplier = Decimal("1")
+        self.addend = Decimal("0")
+        self.last_at = None
+
+    def add(self, event):
+        if event.days_late is None:
+            self.overdue += 1
+        elif event.days_late > 0:
+            self.late += 1
+            self.days += event.days_late
+        else:
+            self.on_time += 1
+
+        self.multiplier *= 1 - DECAY_WEIGHT
+        self.addend = self.addend * (1 - DECAY_WEIGHT) + observation(event.days_late) * DECAY_WEIGHT
+        self.last_at = event.at if self.last_at is None else max(self.last_at, event.at)
+
+    def score_from(self, score):
+        return (score * self.multiplier + self.addend).quantize(SCORE_PLACES)
+
+
+def fold_events(events):
+    """
+    {("user", user_id) | ("membership", user_committee_id): _Fold},
+    events applied in time order.
+    """
+    folds = {}
+    for event in sorted(events, key=lambda e: e.at):
+        for key in (("user", event.user_id), ("membership", event.user_committee_id)):
+            folds.setdefault(key, _Fold()).add(event)
+    return folds
+
+
+def _lock_user_rows(user_ids):
+    """
+    Creates any missing per-user rows and locks them in id order. Every
+    writer takes these before touching a user's membership rows, so
+    incremental updates and rebuilds of one user serialize here.
+    Returns {user_id: row id}.
+    """
+    PunctualityScore.objects.bulk_create(
+        [PunctualityScore(user_id=u) for u in user_ids],
+        ignore_conflicts=True,
+    )
+    return dict(
+        PunctualityScore.objects.select_for_update()
+        .filter(user_id__in=user_ids, user_committee__isnull=True)
+        .order_by("id")
+        .values_list("user_id", "id")
+    )
+
+
+def _score_rows(events):
+    """
+    Creates any missing rows for the users / memberships in `events`
+    and returns {fold key: row id}, user rows locked.
+    """
+    owners = {e.user_committee_id: e.user_id for e in events}
+
+    ids = {("user", u): row_id for u, row_id in _lock_user_rows(set(owners.values())).items()}
+
+    PunctualityScore.objects.bulk_create(
+        [PunctualityScore(user_id=u, user_committee_id=uc) for uc, u in owners.items()],
+        ignore_conflicts=True,
+    )
+    for uc, row_id in PunctualityScore.objects.filter(
+        user_committee_id__in=owners
+    ).values_list("user_committee_id", "id"):
+        ids[("membership", uc)] = row_id
+    return ids
+
+
+def record_events(events):
+    """
+    Applies settlement / overdue events to the user and membership
+    scores with one UPDATE, whatever the batch size. Safe under
+    concurrency: every column moves relative to its stored value.
+    """
+    events = list(events)
+
+    # a late payment replaces the overdue miss of the same invoice;
+    # that needs the event order, so those users are refolded from
+    # history (which already holds this payment)
+    refold = {e.user_id for e in events if e.replaces_overdue}
+    if refold:
+        rebuild_scores(refold)
+        events = [e for e in events if e.user_id not in refold]
+
+    if not events:
+        return
+
+    folds = fold_events(events)
+    ids = _score_rows(events)
+    by_id = {ids[key]: fold for key, fold in folds.items()}
+
+    def per_row(value, output_field):
+        return Case(
+            *[When(id=row_id, then=Value(value(fold))) for row_id, fold in by_id.items()],
+            output_field=output_field,
+        )
+
+    count = IntegerField()
+    money = DecimalField(max_digits=12, decimal_places=2)
+    ratio = DecimalField(max_digits=12, decimal_places=8)
+
+    PunctualityScore.objects.filter(id__in=by_id).update(
+        on_time_count=F("on_time_count") + per_row(lambda f: f.on_time, count),
+        late_count=F("late_count") + per_row(lambda f: f.late, count),
+        overdue_count=F("overdue_count") + per_row(lambda f: f.overdue, count),
+        total_days_late=F("total_days_late") + per_row(lambda f: f.days, money),
+        score=(
+            F("score") * per_row(lambda f: f.multiplier.quantize(Decimal("0.00000001")), ratio)
+            + per_row(lambda f: f.addend.quantize(Decimal("0.00000001")), ratio)
+        ),
+        last_event_at=Greatest(
+            "last_event_at",
+            per_row(lambda f: f.last_at, PunctualityScore._meta.get_field("last_event_at")),
+        ),
+    )
+
+
+# =========================================================
+# REBUILD FROM HISTORY
+# =========================================================
+
+def history_events(user_ids):
+    """
+    One event per installment period of `user_ids`, from invoices and
+    wallet postings: settled invoices are payments, open overdue ones
+    misses (an invoice that went overdue and was paid later only keeps
+    its payment).
+    """
+    events = []
+    invoiced = set()
+
+    # approvals from before processed_at was stamped: the wallet debit
+    # the approval posted (referenced by invoice id) dates the payment
+    debited_at = WalletTransaction.objects.filter(
+        tx_type="committee_investment",
+        status="success",
+        reference_id=Cast(OuterRef("id"), CharField()),
+    ).values("created_at")[:1]
+
+    # 🧾 Scheduled invoices
+    for inv in PaymentTransaction.objects.filter(
+        user_id__in=user_ids,
+        transaction_type="investment",
+        user_committee__isnull=False,
+        due_at__isnull=False,
+        status__in=["approved", "overdue"],
+    ).annotate(
+        paid_at=Coalesce("processed_at", Subquery(debited_at)),
+    ).values("user_id", "user_committee_id", "user_committee_plan_id", "due_at", "status", "paid_at"):
+        if inv["user_committee_plan_id"]:
+            invoiced.add(due_reference(inv["user_committee_plan_id"], inv["due_at"]))
+
+        if inv["status"] == "overdue":
+            events.append(PunctualityEvent(
+                inv["user_id"], inv["user_committee_id"], None, inv["due_at"]
+            ))
+        elif inv["paid_at"]:
+            events.append(PunctualityEvent(
+                inv["user_id"],
+                inv["user_committee_id"],
+                days_late(inv["due_at"], inv["paid_at"]),
+                inv["paid_at"],
+            ))
+
+    # 💳 pay_due payments made without an invoice: the period is in the reference
+    payments = [
+        (DUE_REFERENCE.match(tx["reference_id"]), tx)
+        for tx in WalletTransaction.objects.filter(
+            wallet__user_id__in=user_ids,
+            tx_type="committee_investment",
+            status="success",
+            reference_id__regex=DUE_REFERENCE.pattern,
+        ).exclude(reference_id__in=invoiced).values("reference_id", "created_at")
+    ]
+    plans = {
+        plan["id"]: plan
+        for plan in UserCommitteePlan.objects.filter(
+            id__in={int(match.group(1)) for match, _ in payments}
+        ).values("id", "user_committee_id", "user_committee__user_id")
+    }
+    for match, tx in payments:
+        plan = plans.get(int(match.group(1)))
+        if plan is None:
+            continue
+        events.append(PunctualityEvent(
+            plan["user_committee__user_id"],
+            plan["user_committee_id"],
+            days_late(reference_due_by(tx["reference_id"]), tx["created_at"]),
+            tx["created_at"],
+        ))
+
+    return events
+
+
+def rebuild_scores(user_ids):
+    """
+    Recomputes every score row of `user_ids` from history, in place and
+    under the same row locks record_events takes: history is read only
+    once the rows are locked, so an event committed meanwhile is either
+    in that history or applied on top afterwards, never lost.
+    Call inside a transaction. Returns the number of rows written.
+    """
+    user_ids = set(user_ids)
+    _lock_user_rows(user_ids)
+    list(
+        PunctualityScore.objects.select_for_update()
+        .filter(user_id__in=user_ids, user_committee__isnull=False)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+
+    events = history_events(user_ids)
+    folds = fold_events(events)
+    owners = {e.user_committee_id: e.user_id for e in events}
+
+    PunctualityScore.objects.bulk_create(
+        [PunctualityScore(user_id=u, user_committee_id=uc) for uc, u in owners.items()],
+        ignore_conflicts=True,
+    )
+
+    rows = list(PunctualityScore.objects.filter(user_id__in=user_ids))
+    for row in rows:
+        if row.user_committee_id is None:
+            fold = folds.get(("user", row.user_id))
+        else:
+            fold = folds.get(("membership", row.user_committee_id))
+        fold = fold or _Fold()
+
+        row.on_time_count = fold.on_time
+        row.late_count = fold.late
+        row.overdue_count = fold.overdue
+        row.total_days_late = fold.days
+        row.score = fold.score_from(1)
+        row.last_event_at = fold.last_at
+
+    PunctualityScore.objects.bulk_update(rows, SCORE_FIELDS)
+    return len(rows)
+
+
+# =========================================================
+# READERS (O(1))
+# =========================================================
+
+def user_score(user):
+    return PunctualityScore.objects.filter(user=user, user_committee__isnull=True).first()
+
+
+def punctuality_allows(user):
+    """
+    Members without a payment history yet are given the benefit of the doubt.
+    """
+    score = user_score(user)
+    return score is None or score.score >= MIN_PUNCTUALITY_SCORE
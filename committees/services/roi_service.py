@@ -1,6 +1,15 @@
-from django.utils import timezone
-from django.db.models import Sum
 from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Q, Sum, Value, When
+from django.db.models.functions import Cast
+
+from committees.models import CommitteeLedgerEntry, UserCommittee
+from committees.services.ledger_service import post_committee_entry
+from committees.services.projection_service import flat_roi
+from wallet.models import Wallet, WalletTransaction
 from wallet.services import credit_wallet
 #def get_total_investment(user_committee):
 #    return (
@@ -23,44 +32,45 @@ def can_withdraw_roi(user_committee):
 
 
 
-
-from decimal import Decimal
-
 def calculate_total_return(user_committee):
     """
     ROI based on what the USER has actually invested,
     not on committee preset amounts.
     """
 
-    total_invested = user_committee.total_invested or Decimal("0")
-    roi_percent = user_committee.committee.roi_percent or Decimal("0")
-
-    roi_amount = total_invested * (roi_percent / Decimal(100))
-    total_return = total_invested + roi_amount
+    [(roi_amount, total_return)] = flat_roi(
+        [user_committee.total_invested],
+        [user_committee.committee.roi_percent],
+    )
 
     return {
-        "roi": round(roi_amount, 2),
-        "total_return": round(total_return, 2),
+        "roi": roi_amount,
+        "total_return": total_return,
     }
 
 
-def calculate_committee_return(committee):
-    if not committee.yearly_amount:
-        return {
-            "total_invested": Decimal("0"),
-            "roi_amount": Decimal("0"),
-            "total_return": Decimal("0"),
+def calculate_committee_returns(committees):
+    """
+    calculate_committee_return() for many committees in one vectorized pass.
+    """
+    committees = list(committees)
+    projected = flat_roi(
+        [c.yearly_amount for c in committees],
+        [c.roi_percent for c in committees],
+    )
+
+    return [
+        {
+            "total_invested": total_return - roi_amount,
+            "roi_amount": roi_amount,
+            "total_return": total_return,
         }
+        for roi_amount, total_return in projected
+    ]
 
-    total_invested = committee.yearly_amount
-    roi_amount = total_invested * (committee.roi_percent / Decimal(100))
-    total_return = total_invested + roi_amount
 
-    return {
-        "total_invested": round(total_invested, 2),
-        "roi_amount": round(roi_amount, 2),
-        "total_return": round(total_return, 2),
-    }
+def calculate_committee_return(committee):
+    return calculate_committee_returns([committee])[0]
 
 
 def credit_roi_if_eligible(user_committee):
@@ -69,7 +79,7 @@ def credit_roi_if_eligible(user_committee):
     """
 
     # 🔒 Already credited
-    if user_committee.roi_earned > 0:
+    if user_committee.roi_credited_at or user_committee.roi_earned > 0:
         return None
 
     # 🔒 Not unlocked yet
@@ -86,18 +96,192 @@ def credit_roi_if_eligible(user_committee):
 
     wallet = user_committee.user.wallet
 
-    # 💰 CREDIT WALLET (SOURCE OF TRUTH)
-    credit_wallet(
-        wallet=wallet,
-        amount=roi_amount,
-        tx_type="earned",
-        source="system",
-        reference_id=f"committee_roi_{user_committee.id}",
-        note=f"ROI credited for committee {user_committee.committee.name}",
+    with transaction.atomic():
+        # 💰 CREDIT WALLET (SOURCE OF TRUTH)
+        wallet_tx = credit_wallet(
+            wallet=wallet,
+            amount=roi_amount,
+            tx_type="earned",
+            source="system",
+            reference_id=f"committee_roi_{user_committee.id}",
+            note=f"ROI credited for committee {user_committee.committee.name}",
+        )
+
+        # 🧠 SYNC BUSINESS STATE (SUB-LEDGER)
+        post_committee_entry(
+            user_committee=user_committee,
+            entry_type="roi",
+            amount=roi_amount,
+            wallet_transaction=wallet_tx,
+            reference_id=f"committee_roi_{user_committee.id}",
+            note="ROI credited",
+        )
+
+        UserCommittee.objects.filter(pk=user_committee.pk).update(roi_credited_at=timezone.now())
+
+    return roi_amount
+
+
+# =========================================================
+# SET-BASED ROI CREDITING (CHUNKED)
+# =========================================================
+
+ROI_CHUNK_SIZE = 1000
+
+
+def roi_amount_expression():
+    """
+    total_invested * roi_percent / 100, rounded to paise by Postgres.
+    """
+    return Cast(
+        F("total_invested") * F("committee__roi_percent") / Value(Decimal("100")),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+def roi_eligible_filter(at):
+    """
+    Same rules as credit_roi_if_eligible(), expressed in SQL.
+    Served by the partial index on roi_unlock_date of rows not yet
+    processed (roi_credited_at IS NULL).
+    """
+    return Q(
+        roi_credited_at__isnull=True,
+        roi_earned=0,
+        roi_unlock_date__lte=at,
+        total_invested__gt=0,
+        committee__roi_percent__gt=0,
+        user__wallet__isnull=False,
+    )
+
+
+def _credit_roi_chunk(rows, at):
+    """
+    Posts one chunk of ROI credits:
+    one INSERT each for wallet transactions and ledger entries,
+    one UPDATE for wallets, one UPDATE marking every row processed.
+    The caller holds the wallet and membership locks.
+    """
+    keys = {row["id"]: f"committee_roi_{row['id']}" for row in rows}
+
+    # 🔒 Idempotency — skip memberships already paid by an earlier run
+    already_posted = set(
+        WalletTransaction.objects.filter(
+            tx_type="earned",
+            status="success",
+            reference_id__in=keys.values(),
+        ).values_list("reference_id", flat=True)
+    )
+
+    transactions = []
+    entries = []
+    wallet_totals = {}
+
+    for row in rows:
+        if keys[row["id"]] in already_posted or row["roi_amount"] <= 0:
+            continue
+
+        wallet_tx = WalletTransaction(
+            wallet_id=row["wallet_id"],
+            amount=row["roi_amount"],
+            tx_type="earned",
+            source="system",
+            status="success",
+            reference_id=keys[row["id"]],
+            note=f"ROI credited for committee {row['committee__name']}",
+        )
+        transactions.append(wallet_tx)
+        entries.append(CommitteeLedgerEntry(
+            user_committee_id=row["id"],
+            entry_type="roi",
+            amount=row["roi_amount"],
+            wallet_transaction=wallet_tx,
+            reference_id=keys[row["id"]],
+            note="ROI credited",
+        ))
+        wallet_totals[row["wallet_id"]] = (
+            wallet_totals.get(row["wallet_id"], Decimal("0")) + row["roi_amount"]
+        )
+
+    WalletTransaction.objects.bulk_create(transactions)
+    CommitteeLedgerEntry.objects.bulk_create(entries)
+
+    if wallet_totals:
+        delta = Case(
+            *[When(id=wallet_id, then=Value(total)) for wallet_id, total in wallet_totals.items()],
+            output_field=DecimalField(max_digits=15, decimal_places=2),
+        )
+        Wallet.objects.filter(id__in=wallet_totals).update(
+            balance=F("balance") + delta,
+            total_earned=F("total_earned") + delta,
+            updated_at=at,
+        )
+
+    # rows whose ROI rounds to 0 are marked too, so no run rescans them
+    UserCommittee.objects.filter(id__in=keys).update(
+        roi_earned=Case(
+            *[When(id=row["id"], then=Value(max(row["roi_amount"], Decimal("0")))) for row in rows],
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+        roi_credited_at=at,
     )
 
-    # 🧠 SYNC BUSINESS STATE
-    user_committee.roi_earned = roi_amount
-    user_committee.save(update_fields=["roi_earned"])
+    return len(transactions)
+
+
+def credit_eligible_roi(*, chunk_size=ROI_CHUNK_SIZE, at=None):
+    """
+    Credits ROI to every eligible membership.
+
+    Eligibility and amounts are computed in the SELECT, rows are
+    walked by primary key and each chunk commits on its own, so a
+    crash only loses the chunk in flight and a re-run picks up
+    where it stopped. Rows locked by a concurrent run are skipped.
+
+    Returns the number of wallet credits posted.
+    """
+    at = at or timezone.now()
+    last_id = 0
+    credited = 0
+
+    while True:
+        with transaction.atomic():
+            candidates = list(
+                UserCommittee.objects
+                .filter(roi_eligible_filter(at), id__gt=last_id)
+                .order_by("id")
+                .values_list("id", "user__wallet__id")[:chunk_size]
+            )
+
+            if not candidates:
+                break
+
+            # 🔒 Wallets first, in id order, then the memberships: the
+            # order join, pay-now and auto-debit take them in, so a
+            # concurrent payment cannot deadlock with this run
+            list(
+                Wallet.objects.select_for_update()
+                .filter(id__in={wallet_id for _, wallet_id in candidates})
+                .order_by("id")
+                .values_list("id", flat=True)
+            )
+
+            # eligibility again, now under the lock
+            rows = list(
+                UserCommittee.objects
+                .select_for_update(skip_locked=True, of=("self",))
+                .filter(roi_eligible_filter(at), id__in=[uc_id for uc_id, _ in candidates])
+                .annotate(
+                    roi_amount=roi_amount_expression(),
+                    wallet_id=F("user__wallet__id"),
+                )
+                .order_by("id")
+                .values("id", "wallet_id", "roi_amount", "committee__name")
+            )
+
+            if rows:
+                credited += _credit_roi_chunk(rows, at)
+
+        last_id = candidates[-1][0]
 
-    return roi_amount
\ No newline at end of file
+    return credited
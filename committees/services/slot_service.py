@@ -0,0 +1,37 @@
+from django.db.models import F
+
+from committees.models import Committee
+
+
+# =========================================================
+# COMMITTEE SLOT ALLOCATION (SINGLE-STATEMENT, NO HELD LOCK)
+# =========================================================
+
+def claim_slot(committee_id):
+    """
+    Takes one slot with a single conditional UPDATE.
+
+    The committee row is only locked for this one statement, so
+    concurrent joins are no longer serialized behind the wallet
+    debit and membership inserts. Must be called outside of an
+    open transaction, otherwise the lock lives until COMMIT.
+
+    Returns True when a slot was taken.
+    """
+    updated = Committee.objects.filter(
+        id=committee_id,
+        is_active=True,
+        filled_slots__lt=F("total_slots"),
+    ).update(filled_slots=F("filled_slots") + 1)
+
+    return updated == 1
+
+
+def release_slot(committee_id):
+    """
+    Compensation for claim_slot() when the rest of the join fails.
+    """
+    Committee.objects.filter(
+        id=committee_id,
+        filled_slots__gt=0,
+    ).update(filled_slots=F("filled_slots") - 1)
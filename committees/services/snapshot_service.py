@@ -0,0 +1,188 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import (
+    Count,
+    DecimalField,
+    F,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from committees.models import (
+    Committee,
+    CommitteeDailySnapshot,
+    CommitteeLedgerEntry,
+    UserCommittee,
+)
+from wallet.models import PaymentTransaction
+
+SNAPSHOT_FIELDS = (
+    "aum",
+    "active_members",
+    "joins",
+    "exits",
+    "dues_collected",
+    "dues_overdue",
+    "total_slots",
+    "filled_slots",
+)
+
+
+# =========================================================
+# DAILY COMMITTEE SNAPSHOTS
+# =========================================================
+#
+# Every figure is a correlated, per-committee aggregate, so a whole
+# day for every committee is one SELECT. Figures are derived from the
+# sub-ledger, memberships and invoices as of the end of the day,
+# which is what lets the same query backfill past days.
+
+def day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def _per_committee(queryset, aggregate, output_field):
+    """
+    Scalar subquery: `aggregate` over `queryset` rows of the outer committee.
+    """
+    return Coalesce(
+        Subquery(
+            queryset.order_by()
+            .values("committee_key")
+            .annotate(total=aggregate)
+            .values("total")[:1],
+            output_field=output_field,
+        ),
+        Value(0),
+        output_field=output_field,
+    )
+
+
+def snapshot_queryset(day, *, live_slots=False):
+    """
+    One row per committee with the end-of-day figures for `day`.
+
+    Past slot usage is rebuilt from memberships joined by then (a
+    claimed slot is never released on exit); live_slots reads the
+    current counters instead, which is what the nightly run wants.
+    """
+    start, end = day_bounds(day)
+    money = DecimalField(max_digits=14, decimal_places=2)
+    count = IntegerField()
+
+    ledger = CommitteeLedgerEntry.objects.filter(
+        user_committee__committee=OuterRef("pk"),
+        created_at__lt=end,
+    ).annotate(committee_key=F("user_committee__committee"))
+
+    members = UserCommittee.objects.filter(
+        committee=OuterRef("pk"),
+        joined_at__lt=end,
+    ).annotate(committee_key=F("committee"))
+
+    overdue = PaymentTransaction.objects.filter(
+        user_committee__committee=OuterRef("pk"),
+        transaction_type="investment",
+        due_at__lt=end,
+    ).filter(
+        Q(status__in=["pending", "overdue"]) | Q(processed_at__gte=end)
+    ).annotate(committee_key=F("user_committee__committee"))
+
+    queryset = Committee.objects.filter(created_at__lt=end).annotate(
+        aum=_per_committee(
+            ledger,
+            Coalesce(Sum("amount", filter=Q(entry_type="investment")), Value(Decimal("0")))
+            - Coalesce(
+                Sum("amount", filter=Q(entry_type__in=["withdrawal", "payout", "dividend"])),
+                Value(Decimal("0")),
+            ),
+            money,
+        ),
+        dues_collected=_per_committee(
+            ledger.filter(created_at__gte=start, entry_type="investment"),
+            Sum("amount"),
+            money,
+        ),
+        active_members=_per_committee(
+            members.filter(Q(left_at__isnull=True) | Q(left_at__gte=end)),
+            Count("id"),
+            count,
+        ),
+        joins=_per_committee(members.filter(joined_at__gte=start), Count("id"), count),
+        exits=_per_committee(
+            UserCommittee.objects.filter(
+                committee=OuterRef("pk"),
+                left_at__gte=start,
+                left_at__lt=end,
+            ).annotate(committee_key=F("committee")),
+            Count("id"),
+            count,
+        ),
+        dues_overdue=_per_committee(overdue, Sum("amount"), money),
+        snapshot_total_slots=F("total_slots"),
+    )
+
+    if live_slots:
+        queryset = queryset.annotate(snapshot_filled_slots=F("filled_slots"))
+    else:
+        queryset = queryset.annotate(
+            snapshot_filled_slots=_per_committee(members, Count("id"), count)
+        )
+
+    return queryset.values(
+        "id",
+        "aum",
+        "active_members",
+        "joins",
+        "exits",
+        "dues_collected",
+        "dues_overdue",
+        "snapshot_total_slots",
+        "snapshot_filled_slots",
+    )
+
+
+def take_snapshots(day, *, live_slots=False):
+    """
+    Upserts one CommitteeDailySnapshot per committee for `day`.
+    Returns the number of rows written.
+    """
+    snapshots = [
+        CommitteeDailySnapshot(
+            committee_id=row["id"],
+            date=day,
+            aum=row["aum"],
+            active_members=row["active_members"],
+            joins=row["joins"],
+            exits=row["exits"],
+            dues_collected=row["dues_collected"],
+            dues_overdue=row["dues_overdue"],
+            total_slots=row["snapshot_total_slots"],
+            filled_slots=row["snapshot_filled_slots"],
+        )
+        for row in snapshot_queryset(day, live_slots=live_slots)
+    ]
+
+    CommitteeDailySnapshot.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=["committee", "date"],
+        update_fields=[*SNAPSHOT_FIELDS, "captured_at"],
+    )
+    return len(snapshots)
+
+
+def history_start():
+    """
+    First day that has anything to snapshot, or None.
+    """
+    first = Committee.objects.order_by("created_at").values_list("created_at", flat=True).first()
+    return timezone.localtime(first).date() if first else None
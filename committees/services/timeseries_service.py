@@ -0,0 +1,133 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.core.cache import cache
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from committees.models import CommitteeLedgerEntry
+from committees.services.ledger_service import TOTALS_DELTA
+
+# =========================================================
+# PER-MEMBERSHIP CONTRIBUTION TIME SERIES
+# =========================================================
+#
+# Buckets are aggregated in Postgres with date_trunc over the
+# membership sub-ledger. Closed (past) buckets never change once the
+# period is over, so they are cached without expiry; every request
+# only aggregates the buckets that are not cached yet, which in the
+# steady state is just the current one.
+
+BUCKETS = {
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+
+# every entry type; the cumulative line moves by TOTALS_DELTA, so it
+# tracks UserCommittee.total_invested (auction payouts included)
+FLOWS = tuple(TOTALS_DELTA)
+
+INVESTED_SIGN = {flow: TOTALS_DELTA[flow].get("total_invested", 0) for flow in FLOWS}
+
+
+def bucket_start(day, bucket):
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def next_bucket(day, bucket):
+    if bucket == "week":
+        return day + timedelta(days=7)
+    return day + relativedelta(months=1)
+
+
+def cache_key(user_committee_id, bucket):
+    # v2: buckets carry payout / dividend flows
+    return f"committee_timeseries:v2:{user_committee_id}:{bucket}"
+
+
+def invalidate_timeseries(user_committee_ids):
+    cache.delete_many([
+        cache_key(uc_id, bucket)
+        for uc_id in user_committee_ids
+        for bucket in BUCKETS
+    ])
+
+
+def _aggregate(user_committee_id, bucket, since):
+    """
+    {bucket_date: {flow: Decimal}} for every bucket starting at `since`.
+    """
+    rows = (
+        CommitteeLedgerEntry.objects
+        .filter(
+            user_committee_id=user_committee_id,
+            created_at__gte=timezone.make_aware(datetime.combine(since, time.min)),
+        )
+        .annotate(period=BUCKETS[bucket]("created_at"))
+        .values("period")
+        .annotate(**{
+            flow: Sum("amount", filter=Q(entry_type=flow))
+            for flow in FLOWS
+        })
+    )
+
+    return {
+        row["period"].date(): {flow: row[flow] or Decimal("0") for flow in FLOWS}
+        for row in rows
+    }
+
+
+def contribution_timeseries(user_committee, bucket="month", today=None):
+    """
+    Gap-filled series from the joining bucket to the current one.
+    """
+    today = today or timezone.localdate()
+    first = bucket_start(timezone.localtime(user_committee.joined_at).date(), bucket)
+    current = bucket_start(today, bucket)
+
+    key = cache_key(user_committee.id, bucket)
+    closed = cache.get(key) or {}
+
+    # first bucket not yet cached
+    since = first
+    while since in closed:
+        since = next_bucket(since, bucket)
+
+    fresh = _aggregate(user_committee.id, bucket, since)
+
+    zero = {flow: Decimal("0") for flow in FLOWS}
+    series = []
+    newly_closed = {}
+    cumulative = Decimal("0")
+
+    day = first
+    while day <= current:
+        if day in closed:
+            flows = closed[day]
+        else:
+            flows = fresh.get(day, zero)
+            if day < current:
+                newly_closed[day] = flows
+
+        net = sum(flows[flow] * sign for flow, sign in INVESTED_SIGN.items())
+        cumulative += net
+        series.append({
+            "period": day,
+            "contributions": flows["investment"],
+            "withdrawals": flows["withdrawal"],
+            "roi": flows["roi"],
+            "payouts": flows["payout"],
+            "dividends": flows["dividend"],
+            "net": net,
+            "cumulative_invested": cumulative,
+        })
+        day = next_bucket(day, bucket)
+
+    if newly_closed:
+        cache.set(key, {**closed, **newly_closed}, timeout=None)
+
+    return series
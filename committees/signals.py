@@ -2,6 +2,7 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 from wallet.services import debit_wallet
 from wallet.models import PaymentTransaction
+from committees.services.ledger_service import post_committee_entry
 
 @receiver(post_save, sender=PaymentTransaction)
 def apply_committee_payment(sender, instance, **kwargs):
@@ -16,7 +17,7 @@ def apply_committee_payment(sender, instance, **kwargs):
 
     wallet = instance.user.wallet
 
-    debit_wallet(
+    wallet_tx = debit_wallet(
         wallet=wallet,
         amount=instance.amount,
         tx_type="committee_investment",
@@ -25,10 +26,16 @@ def apply_committee_payment(sender, instance, **kwargs):
         note="Committee recurring investment",
     )
 
-    # 🔁 Sync business model
+    # 🔁 Sync business model (sub-ledger)
     if instance.user_committee:
-        instance.user_committee.total_invested += instance.amount
-        instance.user_committee.save(update_fields=["total_invested"])
+        post_committee_entry(
+            user_committee=instance.user_committee,
+            entry_type="investment",
+            amount=instance.amount,
+            wallet_transaction=wallet_tx,
+            reference_id=str(instance.id),
+            note="Committee recurring investment",
+        )
 
     instance.wallet_synced = True
     instance.save(update_fields=["wallet_synced"])
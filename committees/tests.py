@@ -1,3 +1,530 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from wallet.models import PaymentTransaction, Wallet, WalletTransaction
+
+from .models import (
+    Committee,
+    CommitteeAuction,
+    CommitteeLedgerEntry,
+    PaymentPlan,
+    PunctualityScore,
+    UserCommittee,
+    UserCommitteePlan,
+)
+from .services.auction_service import close_auction
+from .services.autodebit_service import settle_due_installments
+from .services.due_service import due_inbox, elapsed_due_dates, generate_due_invoices, has_due
+from .services.ledger_service import post_committee_entry
+from .services.punctuality_service import rebuild_scores, user_score
+from .services.roi_service import credit_eligible_roi, roi_eligible_filter
+from .services.slot_service import claim_slot, release_slot
+from .services.snapshot_service import snapshot_queryset
+from .services.timeseries_service import contribution_timeseries
+
+
+def make_committee(**overrides):
+    fields = {
+        "name": "Test committee",
+        "monthly_amount": Decimal("1000.00"),
+        "total_slots": 2,
+        "filled_slots": 0,
+    }
+    fields.update(overrides)
+    return Committee.objects.create(**fields)
+
+
+def make_user(username, balance="0"):
+    user = User.objects.create_user(username=username, password="x")
+    # wallets are created by a post_save signal on User
+    Wallet.objects.filter(user=user).update(balance=Decimal(balance))
+    return user
+
+
+def jwt_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+    return client
+
+
+# =========================================================
+# SLOT CLAIM / RELEASE
+# =========================================================
+
+class SlotServiceTests(TestCase):
+
+    def test_claim_stops_at_total_slots(self):
+        committee = make_committee(total_slots=2)
+
+        self.assertTrue(claim_slot(committee.id))
+        self.assertTrue(claim_slot(committee.id))
+        self.assertFalse(claim_slot(committee.id))
+
+        committee.refresh_from_db()
+        self.assertEqual(committee.filled_slots, 2)
+
+    def test_claim_skips_inactive_committee(self):
+        committee = make_committee(is_active=False)
+        self.assertFalse(claim_slot(committee.id))
+
+    def test_release_gives_back_but_never_below_zero(self):
+        committee = make_committee(total_slots=1)
+
+        self.assertTrue(claim_slot(committee.id))
+        release_slot(committee.id)
+        release_slot(committee.id)
+
+        committee.refresh_from_db()
+        self.assertEqual(committee.filled_slots, 0)
+        self.assertTrue(claim_slot(committee.id))
+
+
+class JoinCommitteeTests(TestCase):
+
+    def join(self, user, committee):
+        return jwt_client(user).post(f"/api/committees/{committee.id}/join/")
+
+    def test_failed_debit_releases_slot(self):
+        committee = make_committee()
+        user = make_user("poor", balance="10")
+
+        response = self.join(user, committee)
+
+        self.assertEqual(response.status_code, 400)
+        committee.refresh_from_db()
+        self.assertEqual(committee.filled_slots, 0)
+        self.assertFalse(UserCommittee.objects.filter(user=user).exists())
+
+    def test_rejoin_after_leaving_is_debited_again(self):
+        committee = make_committee()
+        user = make_user("member", balance="5000")
+
+        self.assertEqual(self.join(user, committee).status_code, 200)
+        first = UserCommittee.objects.get(user=user)
+        first.is_active = False
+        first.save()
+
+        response = self.join(user, committee)
+        self.assertEqual(response.status_code, 200)
+
+        second = UserCommittee.objects.get(user=user, is_active=True)
+        self.assertEqual(second.total_invested, Decimal("1000.00"))
+        self.assertEqual(CommitteeLedgerEntry.objects.filter(user_committee=second).count(), 1)
+        self.assertEqual(
+            WalletTransaction.objects.filter(wallet__user=user, tx_type="committee_investment").count(), 2
+        )
+        self.assertEqual(Wallet.objects.get(user=user).balance, Decimal("3000.00"))
+
+
+class RebuildCommitteeLedgerTests(TestCase):
+
+    def setUp(self):
+        self.committee = make_committee()
+        self.user = make_user("member", balance="5000")
+
+    def rebuild(self):
+        CommitteeLedgerEntry.objects.all().delete()
+        UserCommittee.objects.update(total_invested=0)
+        call_command("rebuild_committee_ledger", stdout=StringIO())
+
+    def test_join_reference_names_the_membership(self):
+        client = jwt_client(self.user)
+        client.post(f"/api/committees/{self.committee.id}/join/")
+        first = UserCommittee.objects.get(user=self.user)
+        first.is_active = False
+        first.save()
+        client.post(f"/api/committees/{self.committee.id}/join/")
+        second = UserCommittee.objects.get(user=self.user, is_active=True)
+
+        self.rebuild()
+
+        for uc in (first, second):
+            entry = CommitteeLedgerEntry.objects.get(user_committee=uc)
+            self.assertEqual(entry.reference_id, f"committee_join_{self.committee.id}_{uc.id}")
+            uc.refresh_from_db()
+            self.assertEqual(uc.total_invested, Decimal("1000.00"))
+
+    def test_old_join_reference_goes_to_membership_held_then(self):
+        now = timezone.now()
+        first = UserCommittee.objects.create(user=self.user, committee=self.committee, is_active=False)
+        second = UserCommittee.objects.create(user=self.user, committee=self.committee)
+        UserCommittee.objects.filter(pk=first.pk).update(joined_at=now - timedelta(days=30))
+        UserCommittee.objects.filter(pk=second.pk).update(joined_at=now - timedelta(days=10))
+
+        tx = WalletTransaction.objects.create(
+            wallet=Wallet.objects.get(user=self.user),
+            amount=Decimal("-1000.00"),
+            tx_type="committee_investment",
+            source="system",
+            reference_id=f"committee_join_{self.committee.id}",
+        )
+        WalletTransaction.objects.filter(pk=tx.pk).update(created_at=now - timedelta(days=20))
+
+        self.rebuild()
+
+        self.assertEqual(CommitteeLedgerEntry.objects.get(wallet_transaction=tx).user_committee_id, first.id)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.total_invested, Decimal("1000.00"))
+        self.assertEqual(second.total_invested, Decimal("0"))
+
+
+# =========================================================
+# SET-BASED ROI CREDITING
+# =========================================================
+
+class CreditEligibleRoiTests(TestCase):
+
+    def member(self, username, invested, committee):
+        user = make_user(username)
+        return UserCommittee.objects.create(
+            user=user,
+            committee=committee,
+            total_invested=Decimal(invested),
+            roi_unlock_date=timezone.now() - timedelta(days=1),
+        )
+
+    def test_credits_once_and_marks_zero_amounts_processed(self):
+        committee = make_committee(roi_percent=Decimal("10"))
+        paid = self.member("paid", "1000", committee)
+        # 0.01 * 10% rounds to 0.00
+        dust = self.member("dust", "0.01", committee)
+
+        self.assertEqual(credit_eligible_roi(), 1)
+        self.assertEqual(Wallet.objects.get(user=paid.user).balance, Decimal("100.00"))
+
+        dust.refresh_from_db()
+        self.assertIsNotNone(dust.roi_credited_at)
+        self.assertFalse(UserCommittee.objects.filter(roi_eligible_filter(timezone.now())).exists())
+
+        self.assertEqual(credit_eligible_roi(), 0)
+        self.assertEqual(Wallet.objects.get(user=paid.user).balance, Decimal("100.00"))
+
+
+# =========================================================
+# DUE SCHEDULER
+# =========================================================
+
+def make_plan_membership(username, *, interval_days=1, next_due=None, amount="100"):
+    committee = make_committee()
+    user = make_user(username)
+    membership = UserCommittee.objects.create(user=user, committee=committee)
+    plan = PaymentPlan.objects.create(
+        name="Daily", plan_type="daily", amount=Decimal(amount), interval_days=interval_days
+    )
+    return UserCommitteePlan.objects.create(
+        user_committee=membership,
+        plan=plan,
+        next_payment_due=next_due or timezone.now(),
+    )
+
+
+class GenerateDueInvoicesTests(TestCase):
+
+    def test_rerun_counts_only_new_invoices(self):
+        at = timezone.now()
+        user_plan = make_plan_membership("late", next_due=at - timedelta(days=2))
+
+        self.assertEqual(generate_due_invoices(at=at), (1, 3))
+
+        # replay the same periods, as after a crash before the plan update
+        UserCommitteePlan.objects.filter(pk=user_plan.pk).update(next_payment_due=at - timedelta(days=2))
+        self.assertEqual(generate_due_invoices(at=at), (1, 0))
+        self.assertEqual(PaymentTransaction.objects.filter(user_committee_plan=user_plan).count(), 3)
+
+    def test_zero_interval_is_rejected(self):
+        with self.assertRaises(ValueError):
+            elapsed_due_dates(timezone.now(), 0, timezone.now())
+
+
+class DueInboxTests(TestCase):
+
+    def test_open_invoice_stays_due_after_scheduler_run(self):
+        at = timezone.now()
+        user_plan = make_plan_membership("unpaid", interval_days=30, next_due=at - timedelta(days=1))
+        user = user_plan.user_committee.user
+
+        generate_due_invoices(at=at)
+        user_plan.refresh_from_db()
+        self.assertGreater(user_plan.next_payment_due, at)
+
+        self.assertTrue(has_due(user, at))
+        [entry] = due_inbox(user, at)
+        self.assertEqual(entry.pk, user_plan.pk)
+        self.assertEqual(entry.due_at, at - timedelta(days=1))
+
+        PaymentTransaction.objects.filter(user_committee_plan=user_plan).update(status="success")
+        self.assertFalse(has_due(user, at))
+
+    def test_portfolio_agrees_with_inbox(self):
+        user_plan = make_plan_membership("unpaid", interval_days=30, next_due=timezone.now() - timedelta(days=1))
+        user = user_plan.user_committee.user
+        generate_due_invoices()
+
+        def is_due():
+            [entry] = jwt_client(user).get("/api/my-portfolio/").json()["committees"]
+            return entry["is_due"]
+
+        self.assertTrue(is_due())
+        PaymentTransaction.objects.filter(user_committee_plan=user_plan).update(status="success")
+        self.assertFalse(is_due())
+
+
+# =========================================================
+# MEMBERSHIP EXITS
+# =========================================================
+
+class MembershipLeftAtTests(TestCase):
+
+    def test_bulk_deactivation_stamps_left_at(self):
+        committee = make_committee(total_slots=5)
+        members = [
+            UserCommittee.objects.create(user=make_user(f"member{i}"), committee=committee)
+            for i in range(3)
+        ]
+
+        UserCommittee.objects.filter(pk=members[0].pk).update(is_active=False)
+        members[1].is_active = False
+        UserCommittee.objects.bulk_update([members[1]], ["is_active"])
+
+        rows = {uc.pk: uc for uc in UserCommittee.objects.filter(committee=committee)}
+        self.assertIsNotNone(rows[members[0].pk].left_at)
+        self.assertIsNotNone(rows[members[1].pk].left_at)
+        self.assertIsNone(rows[members[2].pk].left_at)
+
+        [snapshot] = snapshot_queryset(timezone.localdate()).filter(id=committee.id)
+        self.assertEqual(snapshot["exits"], 2)
+        self.assertEqual(snapshot["active_members"], 1)
+
+    def test_reactivation_clears_left_at(self):
+        uc = UserCommittee.objects.create(user=make_user("back"), committee=make_committee())
+        UserCommittee.objects.filter(pk=uc.pk).update(is_active=False)
+        UserCommittee.objects.filter(pk=uc.pk).update(is_active=True)
+        uc.refresh_from_db()
+        self.assertIsNone(uc.left_at)
+
+
+# =========================================================
+# PAY NOW
+# =========================================================
+
+class PayDueTests(TestCase):
+
+    def setUp(self):
+        self.at = timezone.now()
+        self.user_plan = make_plan_membership("payer", interval_days=30, next_due=self.at - timedelta(days=1))
+        self.user = self.user_plan.user_committee.user
+        generate_due_invoices(at=self.at)
+        self.url = f"/api/pay-due/{self.user_plan.user_committee_id}/"
+
+    def test_invoice_is_paid_once(self):
+        Wallet.objects.filter(user=self.user).update(balance=Decimal("500.00"))
+        client = jwt_client(self.user)
+
+        self.assertEqual(client.post(self.url).status_code, 200)
+        self.assertEqual(client.post(self.url).status_code, 400)
+
+        self.assertEqual(Wallet.objects.get(user=self.user).balance, Decimal("400.00"))
+        invoice = PaymentTransaction.objects.get(user_committee_plan=self.user_plan)
+        self.assertEqual(invoice.status, "approved")
+
+    def test_bonus_balance_is_not_spendable(self):
+        Wallet.objects.filter(user=self.user).update(balance=Decimal("50.00"), bonus_balance=Decimal("500.00"))
+
+        response = jwt_client(self.user).post(self.url)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["available"], 50.0)
+        self.assertFalse(WalletTransaction.objects.filter(wallet__user=self.user).exists())
+
+    def test_reference_is_unique_per_wallet_and_type(self):
+        wallet = Wallet.objects.get(user=self.user)
+        fields = dict(wallet=wallet, amount=Decimal("-1"), tx_type="paid", source="system", reference_id="r1")
+        WalletTransaction.objects.create(**fields)
+        with self.assertRaises(IntegrityError):
+            WalletTransaction.objects.create(**fields)
+
+
+# =========================================================
+# AUCTION SETTLEMENT
+# =========================================================
+
+class AuctionSettlementTests(TestCase):
+
+    def setUp(self):
+        self.committee = make_committee(total_slots=3)
+        self.members = [
+            UserCommittee.objects.create(
+                user=make_user(f"bidder{i}"),
+                committee=self.committee,
+                total_invested=Decimal("1000.00"),
+            )
+            for i in range(3)
+        ]
+        self.winner = self.members[0]
+
+    def make_auction(self, bid="300.00"):
+        return CommitteeAuction.objects.create(
+            committee=self.committee,
+            closes_at=timezone.now() - timedelta(minutes=1),
+            best_bid_amount=Decimal(bid),
+            best_bidder=self.winner,
+        )
+
+    def balance(self, membership):
+        return Wallet.objects.get(user=membership.user).balance
+
+    def test_pot_comes_out_of_the_pool(self):
+        auction = self.make_auction()
+
+        self.assertTrue(close_auction(auction.id))
+
+        self.assertEqual(self.balance(self.winner), Decimal("2700.00"))
+        self.assertEqual(self.balance(self.members[1]), Decimal("150.00"))
+
+        invested = dict(UserCommittee.objects.values_list("id", "total_invested"))
+        self.assertEqual(invested[self.winner.id], Decimal("-1700.00"))
+        self.assertEqual(invested[self.members[1].id], Decimal("850.00"))
+        self.assertEqual(sum(invested.values()), Decimal("0"))
+
+    def test_short_pool_pays_only_the_pool(self):
+        UserCommittee.objects.filter(committee=self.committee).update(total_invested=Decimal("500.00"))
+        auction = self.make_auction()
+
+        close_auction(auction.id)
+
+        self.assertEqual(self.balance(self.winner), Decimal("1350.00"))
+        self.assertEqual(self.balance(self.members[2]), Decimal("75.00"))
+        self.assertEqual(
+            WalletTransaction.objects.filter(reference_id__startswith=f"committee_auction_{auction.id}_")
+            .aggregate(total=Sum("amount"))["total"],
+            Decimal("1500.00"),
+        )
+
+    def test_empty_pool_leaves_auction_unsold(self):
+        UserCommittee.objects.filter(committee=self.committee).update(total_invested=0)
+        auction = self.make_auction()
+
+        self.assertFalse(close_auction(auction.id))
+        self.assertFalse(WalletTransaction.objects.exists())
+
+    def test_winner_without_wallet_gets_one(self):
+        Wallet.objects.filter(user=self.winner.user).delete()
+        auction = self.make_auction()
+
+        self.assertTrue(close_auction(auction.id))
+        self.assertEqual(self.balance(self.winner), Decimal("2700.00"))
+
+    def test_timeseries_follows_total_invested(self):
+        UserCommittee.objects.filter(committee=self.committee).update(total_invested=0)
+        for member in self.members:
+            post_committee_entry(user_committee=member, entry_type="investment", amount=Decimal("1000.00"))
+
+        close_auction(self.make_auction().id)
+
+        for member in UserCommittee.objects.filter(committee=self.committee):
+            series = contribution_timeseries(member)
+            self.assertEqual(series[-1]["cumulative_invested"], member.total_invested)
+
+    def test_close_auction_settles_only_that_auction(self):
+        auction = self.make_auction()
+        other = CommitteeAuction.objects.create(
+            committee=make_committee(), closes_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        close_auction(auction.id)
+
+        other.refresh_from_db()
+        self.assertEqual(other.status, "open")
+
+
+# =========================================================
+# PUNCTUALITY
+# =========================================================
+
+class PunctualityTests(TestCase):
+
+    def setUp(self):
+        self.at = timezone.now()
+        self.user_plan = make_plan_membership("slow", interval_days=30, next_due=self.at - timedelta(days=3))
+        UserCommitteePlan.objects.filter(pk=self.user_plan.pk).update(auto_debit=True)
+        self.user = self.user_plan.user_committee.user
+        generate_due_invoices(at=self.at)
+
+    def scores(self):
+        return list(
+            PunctualityScore.objects.filter(user=self.user)
+            .order_by("id")
+            .values_list("on_time_count", "late_count", "overdue_count", "score")
+        )
+
+    def test_late_payment_replaces_overdue_miss(self):
+        # wallet empty: the auto-debit marks the invoice overdue
+        settle_due_installments(at=self.at)
+        self.assertEqual(user_score(self.user).overdue_count, 1)
+
+        Wallet.objects.filter(user=self.user).update(balance=Decimal("100.00"))
+        settle_due_installments(at=self.at + timedelta(hours=1))
+
+        score = user_score(self.user)
+        self.assertEqual((score.late_count, score.overdue_count), (1, 0))
+
+        incremental = self.scores()
+        with transaction.atomic():
+            rebuild_scores([self.user.id])
+        self.assertEqual(self.scores(), incremental)
+
+    def test_pay_without_invoice_scores_like_the_rebuild(self):
+        user_plan = make_plan_membership("direct", interval_days=30, next_due=self.at - timedelta(days=2))
+        user = user_plan.user_committee.user
+        Wallet.objects.filter(user=user).update(balance=Decimal("100.00"))
+
+        response = jwt_client(user).post(f"/api/pay-due/{user_plan.user_committee_id}/")
+        self.assertEqual(response.status_code, 200)
+
+        incremental = user_score(user)
+        with transaction.atomic():
+            rebuild_scores([user.id])
+        rebuilt = user_score(user)
+        self.assertEqual(
+            (rebuilt.late_count, rebuilt.total_days_late, rebuilt.score),
+            (incremental.late_count, incremental.total_days_late, incremental.score),
+        )
+
+    def test_approved_invoice_is_kept_in_history(self):
+        invoice = PaymentTransaction.objects.get(user_committee_plan=self.user_plan)
+        Wallet.objects.filter(user=self.user).update(balance=Decimal("100.00"))
+
+        invoice.status = "approved"
+        invoice.save()
+        invoice.refresh_from_db()
+        self.assertIsNotNone(invoice.processed_at)
+        self.assertEqual(user_score(self.user).late_count, 1)
+
+        # rows approved before processed_at was stamped
+        PaymentTransaction.objects.filter(pk=invoice.pk).update(processed_at=None)
+        with transaction.atomic():
+            rebuild_scores([self.user.id])
+        self.assertEqual(user_score(self.user).late_count, 1)
+
+    def test_rebuild_keeps_rows_in_place(self):
+        Wallet.objects.filter(user=self.user).update(balance=Decimal("100.00"))
+        settle_due_installments(at=self.at)
+        ids = set(PunctualityScore.objects.filter(user=self.user).values_list("id", flat=True))
+
+        with transaction.atomic():
+            rebuild_scores([self.user.id])
+
+        self.assertEqual(set(PunctualityScore.objects.filter(user=self.user).values_list("id", flat=True)), ids)
+        self.assertEqual(user_score(self.user).late_count, 1)
 
-# Create your tests here.
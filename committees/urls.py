@@ -5,6 +5,7 @@ urlpatterns = [
    path("committees/", committee_list, name="committee-list"),
    path("committees/<int:committee_id>/join/", join_committee, name="join-committee"),
    path("my-committees/", my_committees),   # 👈 NEW
+   path("my-portfolio/", my_portfolio, name="my-portfolio"),
    path(
         "committee-detail/<int:user_committee_id>/",
         committee_detail,
@@ -17,6 +18,28 @@ urlpatterns = [
 
     path("pending-payments/<user_committee_id>/", pending_payments, name="pending-payments"),  # NEW
     path("my-due-payments/", my_due_payments),
+    path("has-due/", has_due_payments, name="has-due"),
+    path(
+        "committee-timeseries/<int:user_committee_id>/",
+        committee_timeseries,
+        name="committee-timeseries"
+    ),
+    path(
+        "committee-snapshots/<int:committee_id>/",
+        committee_snapshots,
+        name="committee-snapshots"
+    ),
+    path(
+        "auto-debit/<int:user_committee_id>/",
+        set_auto_debit,
+        name="auto-debit"
+    ),
+    path(
+        "committees/<int:committee_id>/auction/",
+        committee_auction,
+        name="committee-auction"
+    ),
+    path("auctions/<int:auction_id>/bid/", place_auction_bid, name="auction-bid"),
     path(
     "pay-due/<int:user_committee_id>/",
     pay_due,
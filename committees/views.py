@@ -20,14 +20,13 @@ def user_roi_view(request, committee_id):
 
 from django.http import JsonResponse
 from .models import Committee
-from committees.services.roi_service import calculate_committee_return
+from committees.services.roi_service import calculate_committee_returns
 
 def committee_list(request):
-    committees = Committee.objects.filter(is_active=True)
+    committees = list(Committee.objects.filter(is_active=True))
 
     data = []
-    for c in committees:
-        roi_data = calculate_committee_return(c)
+    for c, roi_data in zip(committees, calculate_committee_returns(committees)):
         data.append({
             "id": c.id,
             "name": c.name,
@@ -64,12 +63,24 @@ from django.db import transaction
 from .models import Committee, UserCommittee
 from django.contrib.auth.models import User
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 
 from committees.models import Committee, UserCommittee
 from wallet.models import Wallet, PaymentTransaction
-from wallet.calculations import calculate_net_balance_for_user
-from wallet.services import debit_wallet
+from wallet.services import debit_wallet, spendable_balance
+from committees.services.slot_service import claim_slot, release_slot
+from committees.services.ledger_service import post_committee_entry
+from committees.services.portfolio_service import portfolio_queryset
+from committees.services.due_service import due_inbox, due_reference, has_due, open_invoices
+from committees.services.projection_service import flat_roi, project_user_committees
+from committees.services.timeseries_service import BUCKETS, contribution_timeseries
+from committees.services.auction_service import place_bid
+from committees.services.punctuality_service import (
+    payment_event,
+    punctuality_allows,
+    record_events,
+    reference_due_by,
+)
 
 @csrf_exempt
 @require_POST
@@ -82,61 +93,93 @@ def join_committee(request, committee_id):
 
     user, _ = auth_result
 
+    # 🔓 Plain read — no row lock on the committee
     try:
-        with transaction.atomic():
+        committee = Committee.objects.get(id=committee_id, is_active=True)
+    except Committee.DoesNotExist:
+        return JsonResponse(
+            {"error": "Committee not found or inactive"},
+            status=404
+        )
 
-            committee = Committee.objects.select_for_update().get(
-                id=committee_id,
-                is_active=True
-            )
+    # ❌ Slot full (cheap early exit, claim_slot() is authoritative)
+    if committee.filled_slots >= committee.total_slots:
+        return JsonResponse(
+            {"error": "No slots available"},
+            status=400
+        )
 
-            # ❌ Slot full
-            if committee.filled_slots >= committee.total_slots:
-                return JsonResponse(
-                    {"error": "No slots available"},
-                    status=400
-                )
+    # ❌ Already joined
+    if UserCommittee.objects.filter(
+        user=user,
+        committee=committee,
+        is_active=True
+    ).exists():
+        return JsonResponse(
+            {"error": "You already joined this committee"},
+            status=400
+        )
+
+    # ⏱️ Payment discipline (one indexed row read)
+    if not punctuality_allows(user):
+        return JsonResponse(
+            {"error": "Your payment punctuality is too low to join a new committee"},
+            status=400
+        )
+
+    # ---------------------------------
+    # 💰 DETERMINE JOIN AMOUNT
+    # ---------------------------------
+    if committee.daily_amount:
+        join_amount = Decimal(committee.daily_amount)
+        join_type = "daily"
+    elif committee.monthly_amount:
+        join_amount = Decimal(committee.monthly_amount)
+        join_type = "monthly"
+    elif committee.yearly_amount:
+        join_amount = Decimal(committee.yearly_amount)
+        join_type = "yearly"
+    else:
+        return JsonResponse(
+            {"error": "Committee joining amount not defined"},
+            status=400
+        )
+
+    # ---------------------------------
+    # 🎟️ CLAIM SLOT (ONE STATEMENT)
+    # ---------------------------------
+    if not claim_slot(committee.id):
+        return JsonResponse(
+            {"error": "No slots available"},
+            status=400
+        )
 
-            # ❌ Already joined
+    try:
+        with transaction.atomic():
+
+            # 🔒 Lock only this user's wallet (serializes double-taps)
+            Wallet.objects.get_or_create(user=user)
+            wallet = Wallet.objects.select_for_update().get(user=user)
+
+            # ❌ Already joined (re-check under the wallet lock)
             if UserCommittee.objects.filter(
                 user=user,
                 committee=committee,
                 is_active=True
             ).exists():
+                release_slot(committee.id)
                 return JsonResponse(
                     {"error": "You already joined this committee"},
                     status=400
                 )
 
-            # ---------------------------------
-            # 💰 DETERMINE JOIN AMOUNT
-            # ---------------------------------
-            if committee.daily_amount:
-                join_amount = Decimal(committee.daily_amount)
-                join_type = "daily"
-            elif committee.monthly_amount:
-                join_amount = Decimal(committee.monthly_amount)
-                join_type = "monthly"
-            elif committee.yearly_amount:
-                join_amount = Decimal(committee.yearly_amount)
-                join_type = "yearly"
-            else:
-                return JsonResponse(
-                    {"error": "Committee joining amount not defined"},
-                    status=400
-                )
-
             # ---------------------------------
             # 💰 WALLET CHECK
             # ---------------------------------
-            wallet, _ = Wallet.objects.get_or_create(user=user)
-
-            available_balance = (
-                calculate_net_balance_for_user(user)
-                + wallet.bonus_balance
-            )
+            available_balance = spendable_balance(wallet)
 
             if available_balance < join_amount:
+                release_slot(committee.id)
                 return JsonResponse(
                     {
                         "error": "Insufficient wallet balance",
@@ -147,24 +190,38 @@ def join_committee(request, committee_id):
                 )
 
             # ---------------------------------
-            # 🔥 DEDUCT MONEY
+            # ✅ CREATE USER COMMITTEE
             # ---------------------------------
-            debit_wallet(
+            user_committee = UserCommittee.objects.create(
+                user=user,
+                committee=committee,
+            )
+
+            # ---------------------------------
+            # 🔥 DEDUCT MONEY + SUB-LEDGER
+            # ---------------------------------
+            # per membership: a leave + rejoin is a new debit, not a replay
+            join_reference = f"committee_join_{committee.id}_{user_committee.id}"
+
+            wallet_tx = debit_wallet(
                 wallet=wallet,
                 amount=join_amount,
                 tx_type="committee_investment",
                 source="system",
-                reference_id=f"committee_join_{committee.id}",
+                reference_id=join_reference,
                 note=f"Joined committee ({join_type}): {committee.name}",
             )
+            if wallet_tx is None:
+                # never join without the debit + ledger entry
+                raise ValueError("Join payment was already recorded")
 
-            # ---------------------------------
-            # ✅ CREATE USER COMMITTEE
-            # ---------------------------------
-            user_committee = UserCommittee.objects.create(
-                user=user,
-                committee=committee,
-                total_invested=join_amount
+            post_committee_entry(
+                user_committee=user_committee,
+                entry_type="investment",
+                amount=join_amount,
+                wallet_transaction=wallet_tx,
+                reference_id=join_reference,
+                note=f"Joined committee ({join_type})",
             )
 
             # ---------------------------------
@@ -189,27 +246,25 @@ def join_committee(request, committee_id):
                     is_active=True
                 )
 
-            # ---------------------------------
-            # UPDATE SLOT COUNT
-            # ---------------------------------
-            committee.filled_slots += 1
-            committee.save(update_fields=["filled_slots"])
+    except ValueError as e:
+        # ↩️ debit refused (frozen / balance / replay): nothing committed
+        release_slot(committee.id)
+        return JsonResponse({"error": str(e)}, status=400)
 
-            return JsonResponse({
-                "success": True,
-                "message": "Successfully joined committee",
-                "committee_id": committee.id,
-                "user_committee_id": user_committee.id,
-                "amount_deducted": float(join_amount),
-                "plan_type": join_type,
-                "plan_auto_created": True if committee_plan else False,
-            })
+    except Exception:
+        # ↩️ COMPENSATE: give the slot back, nothing else was committed
+        release_slot(committee.id)
+        raise
 
-    except Committee.DoesNotExist:
-        return JsonResponse(
-            {"error": "Committee not found or inactive"},
-            status=404
-        )
+    return JsonResponse({
+        "success": True,
+        "message": "Successfully joined committee",
+        "committee_id": committee.id,
+        "user_committee_id": user_committee.id,
+        "amount_deducted": float(join_amount),
+        "plan_type": join_type,
+        "plan_auto_created": True if committee_plan else False,
+    })
 
 @api_view(["POST"])
 def pay_due(request, user_committee_id):
@@ -239,51 +294,105 @@ def pay_due(request, user_committee_id):
             status=404
         )
 
-    # 🔴 CHECK IF DUE
-    if user_plan.next_payment_due > now():
-        return JsonResponse({
-            "error": "No due payment yet",
-            "next_due": user_plan.next_payment_due
-        }, status=400)
+    wallet, _ = Wallet.objects.get_or_create(user=user)
 
-    amount = Decimal(user_plan.plan.amount)
+    with transaction.atomic():
+        # 🔒 Lock order matches auto-debit: invoice → wallet → plan.
+        # A parallel pay / auto-debit of the same period waits here and
+        # then sees it paid.
+        open_invoice = (
+            open_invoices(user_committee_plan=user_plan)
+            .select_for_update()
+            .first()
+        )
 
-    # 💰 WALLET CHECK
-    wallet, _ = Wallet.objects.get_or_create(user=user)
+        if open_invoice is None:
+            # nothing invoiced yet: the period is next_payment_due itself
+            user_plan = UserCommitteePlan.objects.select_for_update().get(pk=user_plan.pk)
 
-    available_balance = (
-        calculate_net_balance_for_user(user)
-        + wallet.bonus_balance
-    )
+            # 🔴 CHECK IF DUE
+            if user_plan.next_payment_due > now():
+                return JsonResponse({
+                    "error": "No due payment yet",
+                    "next_due": user_plan.next_payment_due
+                }, status=400)
 
-    if available_balance < amount:
-        return JsonResponse({
-            "error": "Insufficient wallet balance",
-            "required": float(amount),
-            "available": float(available_balance),
-        }, status=400)
-
-    # 🔥 DEDUCT MONEY
-    debit_wallet(
-        wallet=wallet,
-        amount=amount,
-        tx_type="committee_investment",
-        source="system",
-        reference_id=f"committee_due_{user_plan.id}",
-        note=f"Committee due payment"
-    )
+            due_at = user_plan.next_payment_due
+            amount = Decimal(user_plan.plan.amount)
+        else:
+            due_at = open_invoice.due_at
+            amount = Decimal(open_invoice.amount)
 
-    # 🔁 UPDATE USER COMMITTEE TOTAL
-    uc = user_plan.user_committee
-    uc.total_invested += amount
-    uc.save(update_fields=["total_invested"])
+        # 💰 WALLET CHECK (on the locked row)
+        wallet = Wallet.objects.select_for_update().get(pk=wallet.pk)
+        available_balance = spendable_balance(wallet)
 
-    # 🔁 UPDATE NEXT DUE DATE
-    user_plan.last_payment_at = now()
-    user_plan.next_payment_due = now() + timedelta(
-        days=user_plan.plan.interval_days
-    )
-    user_plan.save(update_fields=["last_payment_at", "next_payment_due"])
+        if available_balance < amount:
+            return JsonResponse({
+                "error": "Insufficient wallet balance",
+                "required": float(amount),
+                "available": float(available_balance),
+            }, status=400)
+
+        # 🔑 One key per period, so every installment can be paid once
+        reference_id = due_reference(user_plan.id, due_at)
+
+        # 🔥 DEDUCT MONEY
+        wallet_tx = debit_wallet(
+            wallet=wallet,
+            amount=amount,
+            tx_type="committee_investment",
+            source="system",
+            reference_id=reference_id,
+            note=f"Committee due payment"
+        )
+
+        if wallet_tx is None:
+            return JsonResponse(
+                {"error": "This installment is already paid"},
+                status=400
+            )
+
+        # 🔁 UPDATE USER COMMITTEE SUB-LEDGER
+        post_committee_entry(
+            user_committee=user_plan.user_committee,
+            entry_type="investment",
+            amount=amount,
+            wallet_transaction=wallet_tx,
+            reference_id=reference_id,
+            note="Committee due payment",
+        )
+
+        user_plan.last_payment_at = now()
+
+        if open_invoice:
+            # 🧾 Close the invoice (queryset update: the wallet was
+            # already debited above, the signal must not run again)
+            PaymentTransaction.objects.filter(id=open_invoice.id).update(
+                status="approved",
+                processed_at=now(),
+                wallet=wallet,
+                wallet_effect="debit",
+                wallet_synced=True,
+            )
+            user_plan.save(update_fields=["last_payment_at"])
+        else:
+            # 🔁 UPDATE NEXT DUE DATE (stay on the plan's schedule)
+            user_plan.next_payment_due = due_at + timedelta(
+                days=user_plan.plan.interval_days
+            )
+            user_plan.save(update_fields=["last_payment_at", "next_payment_due"])
+
+        # ⏱️ PUNCTUALITY (after the invoice update: a payment that
+        # replaces an overdue miss is refolded from history)
+        record_events([payment_event(
+            user_committee=user_plan.user_committee,
+            # without an invoice only the due day is on record; the
+            # rebuild scores by the same rule
+            due_at=due_at if open_invoice else reference_due_by(reference_id),
+            paid_at=now(),
+            replaces_overdue=bool(open_invoice and open_invoice.status == "overdue"),
+        )])
 
     return JsonResponse({
         "success": True,
@@ -311,7 +420,9 @@ def my_committees(request):
 
     user, token = auth_result
 
-    user_committees = UserCommittee.objects.filter(user=user)
+    user_committees = UserCommittee.objects.filter(
+        user=user
+    ).select_related("committee")
 
     data = []
     for uc in user_committees:
@@ -325,7 +436,82 @@ def my_committees(request):
         })
 
     return JsonResponse({
-        "count": user_committees.count(),
+        "count": len(data),
+        "committees": data,
+    })
+
+
+@api_view(["GET"])
+def my_portfolio(request):
+    jwt_authenticator = JWTAuthentication()
+    auth = jwt_authenticator.authenticate(request)
+
+    if not auth:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+
+    user, _ = auth
+    current_time = now()
+
+    memberships = list(portfolio_queryset(user))
+    projections = project_user_committees(memberships)
+
+    data = []
+    for uc, projection in zip(memberships, projections):
+        plan = getattr(uc, "active_plan", None)
+
+        data.append({
+            "id": uc.id,
+            "committee": {
+                "id": uc.committee.id,
+                "name": uc.committee.name,
+                "roi_percent": float(uc.committee.roi_percent),
+                "duration_months": uc.committee.duration_months,
+            },
+            "joined_at": uc.joined_at,
+            "is_active": uc.is_active,
+
+            # 📋 PLAN
+            "plan": {
+                "id": plan.plan.id,
+                "name": plan.plan.name,
+                "type": plan.plan.plan_type,
+                "amount": float(plan.plan.amount),
+                "interval_days": plan.plan.interval_days,
+                "is_active": plan.is_active,
+            } if plan else None,
+            "next_due": uc.next_payment_due,
+            "is_due": bool(
+                plan and plan.is_active
+                and (uc.has_open_invoice or uc.next_payment_due <= current_time)
+            ),
+
+            # 💰 MONEY (sub-ledger running totals)
+            "net_invested": float(uc.total_invested),
+            "withdrawn": float(uc.total_withdrawn),
+            "roi_earned": float(uc.roi_earned),
+            "roi_unlock_date": uc.roi_unlock_date,
+
+            # 📈 PROJECTION TO MATURITY
+            "remaining_installments": projection["remaining_periods"],
+            "projected_contributions": float(projection["projected_contributions"]),
+            "projected_roi": float(projection["projected_roi"]),
+            "maturity_value": float(projection["maturity_value"]),
+            "maturity_at": projection["maturity_at"],
+
+            # 🧾 OPEN INVOICES
+            "open_invoices": [
+                {
+                    "id": p.id,
+                    "amount": float(p.amount or 0),
+                    "status": p.status,
+                    "due_at": p.due_at,
+                }
+                for p in uc.open_invoices
+            ],
+        })
+
+    return JsonResponse({
+        "count": len(data),
         "committees": data,
     })
 
@@ -366,7 +552,9 @@ def committee_detail(request, user_committee_id):
 
     # 🎯 USER COMMITTEE
     try:
-        uc = UserCommittee.objects.get(id=user_committee_id, user=user)
+        uc = UserCommittee.objects.select_related("committee").get(
+            id=user_committee_id, user=user
+        )
     except UserCommittee.DoesNotExist:
         return JsonResponse({"error": "Not found"}, status=404)
 
@@ -374,30 +562,14 @@ def committee_detail(request, user_committee_id):
     # 💰 FINANCIAL CALCULATIONS
     # ===============================
 
-    # ✅ Total invested (approved only)
-    total_invested = abs(
-        WalletTransaction.objects.filter(
-        wallet=user.wallet,
-        tx_type="committee_investment",
-        status="success",
-    ).aggregate(total=Sum("amount"))["total"] or 0
-)
+    # ✅ Running totals from the membership sub-ledger
+    net_invested = uc.total_invested
+    total_withdrawn = uc.total_withdrawn
 
-    # ✅ Total withdrawn (approved only)
-    total_withdrawn = PaymentTransaction.objects.filter(
-        user_committee=uc,
-        transaction_type="withdrawal",
-        status="approved"
-    ).aggregate(total=Sum("amount"))["total"] or 0
-
-    # ✅ Net invested
-    net_invested = total_invested - total_withdrawn
-
-    # ✅ ROI on NET invested
-    roi_amount = net_invested * (uc.committee.roi_percent / 100)
-
-    # ✅ Final amount after 1 year
-    total_after_year = net_invested + roi_amount
+    # ✅ ROI on NET invested → final amount after 1 year
+    [(roi_amount, total_after_year)] = flat_roi(
+        [net_invested], [uc.committee.roi_percent]
+    )
 
     # ===============================
     # 💳 PAYMENT METHODS
@@ -482,6 +654,7 @@ def committee_plans(request, committee_id):
 
 from .models import *
 
+from django.utils import timezone
 from django.utils.timezone import now
 from datetime import timedelta
 from rest_framework.decorators import api_view
@@ -539,8 +712,9 @@ def pending_payments(request, user_committee_id):
     user, _ = auth
 
     try:
-        plan = UserCommitteePlan.objects.get(
+        plan = UserCommitteePlan.objects.select_related("plan").get(
             user_committee_id=user_committee_id,
+            user=user,
             is_active=True
         )
     except UserCommitteePlan.DoesNotExist:
@@ -548,14 +722,16 @@ def pending_payments(request, user_committee_id):
             "has_plan": False
         })
 
-    # user HAS a plan
-    if plan.next_payment_due <= now():
+    # user HAS a plan; an unpaid invoice stays due after the scheduler ran
+    open_invoice = open_invoices(user_committee_plan=plan).first()
+    if open_invoice or plan.next_payment_due <= now():
+        due_at = open_invoice.due_at if open_invoice else plan.next_payment_due
         return JsonResponse({
             "has_plan": True,
             "due": True,
             "amount": float(plan.plan.amount),
             "plan_type": plan.plan.plan_type,
-            "due_at": plan.next_payment_due.strftime("%Y-%m-%d %H:%M"),
+            "due_at": due_at.strftime("%Y-%m-%d %H:%M"),
         })
 
     return JsonResponse({
@@ -575,24 +751,244 @@ def my_due_payments(request):
 
     user, _ = auth
 
-    plans = UserCommitteePlan.objects.filter(
-        user_committee__user=user,
-        is_active=True
-    )
-
     due_list = []
 
-    for plan in plans:
-        if plan.next_payment_due <= now():
-            due_list.append({
-                "user_committee_id": plan.user_committee.id,
-                "committee_name": plan.user_committee.committee.name,
-                "amount": float(plan.plan.amount),
-                "plan_type": plan.plan.plan_type,
-                "due_at": plan.next_payment_due.strftime("%Y-%m-%d %H:%M"),
-            })
+    for plan in due_inbox(user):
+        due_list.append({
+            "user_committee_id": plan.user_committee_id,
+            "committee_name": plan.user_committee.committee.name,
+            "amount": float(plan.plan.amount),
+            "plan_type": plan.plan.plan_type,
+            "due_at": plan.due_at.strftime("%Y-%m-%d %H:%M"),
+        })
 
     return JsonResponse({
         "has_due": len(due_list) > 0,
         "dues": due_list
     })
+
+
+@api_view(["GET"])
+def committee_timeseries(request, user_committee_id):
+    jwt_authenticator = JWTAuthentication()
+    auth = jwt_authenticator.authenticate(request)
+
+    if not auth:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+
+    user, _ = auth
+
+    bucket = request.GET.get("bucket", "month")
+    if bucket not in BUCKETS:
+        return JsonResponse(
+            {"error": f"bucket must be one of {', '.join(BUCKETS)}"},
+            status=400
+        )
+
+    # 👮 Members see their own membership, admins see any
+    memberships = UserCommittee.objects.all()
+    if not user.is_staff:
+        memberships = memberships.filter(user=user)
+
+    try:
+        uc = memberships.get(id=user_committee_id)
+    except UserCommittee.DoesNotExist:
+        return JsonResponse({"error": "Not found"}, status=404)
+
+    series = contribution_timeseries(uc, bucket)
+
+    return JsonResponse({
+        "user_committee_id": uc.id,
+        "bucket": bucket,
+        "series": [
+            {
+                "period": point["period"].isoformat(),
+                "contributions": float(point["contributions"]),
+                "withdrawals": float(point["withdrawals"]),
+                "roi": float(point["roi"]),
+                "payouts": float(point["payouts"]),
+                "dividends": float(point["dividends"]),
+                "net": float(point["net"]),
+                "cumulative_invested": float(point["cumulative_invested"]),
+            }
+            for point in series
+        ],
+    })
+
+
+@api_view(["GET"])
+def committee_snapshots(request, committee_id):
+    jwt_authenticator = JWTAuthentication()
+    auth = jwt_authenticator.authenticate(request)
+
+    if not auth:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+
+    user, _ = auth
+
+    if not user.is_staff:
+        return JsonResponse({"error": "Forbidden"}, status=403)
+
+    try:
+        days = min(int(request.GET.get("days", 30)), 366)
+    except ValueError:
+        return JsonResponse({"error": "days must be a number"}, status=400)
+
+    since = timezone.localdate() - timedelta(days=days)
+
+    # 📸 Read straight from the nightly snapshots, no live aggregation
+    snapshots = CommitteeDailySnapshot.objects.filter(
+        committee_id=committee_id,
+        date__gt=since,
+    ).order_by("date")
+
+    return JsonResponse({
+        "committee_id": committee_id,
+        "days": days,
+        "snapshots": [
+            {
+                "date": s.date.isoformat(),
+                "aum": float(s.aum),
+                "active_members": s.active_members,
+                "joins": s.joins,
+                "exits": s.exits,
+                "dues_collected": float(s.dues_collected),
+                "dues_overdue": float(s.dues_overdue),
+                "total_slots": s.total_slots,
+                "filled_slots": s.filled_slots,
+                "fill_rate": s.fill_rate(),
+            }
+            for s in snapshots
+        ],
+    })
+
+
+@api_view(["POST"])
+def set_auto_debit(request, user_committee_id):
+    jwt_authenticator = JWTAuthentication()
+    auth = jwt_authenticator.authenticate(request)
+
+    if not auth:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+
+    user, _ = auth
+
+    enabled = request.data.get("enabled")
+    if not isinstance(enabled, bool):
+        return JsonResponse({"error": "enabled must be true or false"}, status=400)
+
+    updated = UserCommitteePlan.objects.filter(
+        user_committee_id=user_committee_id,
+        user=user,
+        is_active=True,
+    ).update(auto_debit=enabled)
+
+    if not updated:
+        return JsonResponse({"error": "No active plan found"}, status=404)
+
+    return JsonResponse({
+        "success": True,
+        "user_committee_id": user_committee_id,
+        "auto_debit": enabled,
+    })
+
+
+@api_view(["GET"])
+def committee_auction(request, committee_id):
+    jwt_authenticator = JWTAuthentication()
+    auth = jwt_authenticator.authenticate(request)
+
+    if not auth:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+
+    user, _ = auth
+
+    membership = UserCommittee.objects.filter(
+        user=user,
+        committee_id=committee_id
+    ).first()
+
+    if membership is None:
+        return JsonResponse({"error": "Not a member of this committee"}, status=403)
+
+    auction = CommitteeAuction.objects.filter(
+        committee_id=committee_id
+    ).order_by("-cycle").first()
+
+    if auction is None:
+        return JsonResponse({"auction": None})
+
+    next_bid = (
+        auction.best_bid_amount + auction.min_increment
+        if auction.best_bid_amount is not None
+        else auction.min_increment
+    )
+
+    return JsonResponse({
+        "auction": {
+            "id": auction.id,
+            "cycle": auction.cycle,
+            "status": auction.status,
+            "pot_amount": float(auction.pot_amount),
+            "opens_at": auction.opens_at,
+            "closes_at": auction.closes_at,
+            "best_bid_amount": (
+                float(auction.best_bid_amount)
+                if auction.best_bid_amount is not None else None
+            ),
+            "you_are_leading": auction.best_bidder_id == membership.id,
+            "min_next_bid": float(next_bid),
+            "max_bid": float(auction.max_bid()),
+            "winner_is_you": auction.winner_id == membership.id,
+            "dividend_per_member": (
+                float(auction.dividend_per_member)
+                if auction.dividend_per_member is not None else None
+            ),
+        }
+    })
+
+
+@api_view(["POST"])
+def place_auction_bid(request, auction_id):
+    jwt_authenticator = JWTAuthentication()
+    auth = jwt_authenticator.authenticate(request)
+
+    if not auth:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+
+    user, _ = auth
+
+    try:
+        amount = Decimal(str(request.data.get("amount")))
+    except (InvalidOperation, TypeError):
+        amount = None
+
+    if amount is None or not amount.is_finite():
+        return JsonResponse({"error": "amount must be a number"}, status=400)
+
+    try:
+        bid = place_bid(auction_id=auction_id, user=user, amount=amount)
+    except CommitteeAuction.DoesNotExist:
+        return JsonResponse({"error": "Auction not found"}, status=404)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({
+        "success": True,
+        "bid_id": bid.id,
+        "amount": float(bid.amount),
+        "leading": True,
+    })
+
+
+@api_view(["GET"])
+def has_due_payments(request):
+    jwt_authenticator = JWTAuthentication()
+    auth = jwt_authenticator.authenticate(request)
+
+    if not auth:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+
+    user, _ = auth
+
+    return JsonResponse({"has_due": has_due(user)})
@@ -5,6 +5,7 @@ from dateutil.relativedelta import relativedelta
 
 from .models import *
 from committees.models import UserCommittee
+from committees.services.punctuality_service import punctuality_allows
 from notifications.models import Notification
 
 
@@ -15,7 +16,7 @@ def check_loan_eligibility(user):
         user=user,
         is_active=True,
         joined_at__lte=six_months_ago
-    ).exists()
+    ).exists() and punctuality_allows(user)
 
 
 
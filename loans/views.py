@@ -97,7 +97,10 @@ class LoanEligibilityView(APIView):
 
         return Response({
             "eligible": False,
-            "message": "You must be active in a committee for at least 6 months"
+            "message": (
+                "You must be active in a committee for at least 6 months "
+                "and keep your installments on time"
+            )
         })
 
 
@@ -210,6 +213,7 @@ class LoanWalletView(APIView):
 
 from django.db.models import Sum
 from datetime import date
+from committees.services.punctuality_service import punctuality_allows
 
 class LoanEligibilityDashboardView(APIView):
     permission_classes = [IsAuthenticated]
@@ -250,7 +254,7 @@ class LoanEligibilityDashboardView(APIView):
         # 🔹 EMI preview (12 months – display only)
         emi_12_months = eligible_loan_amount // 12 if eligible_loan_amount else 0
 
-        eligible = months_completed >= 6
+        eligible = months_completed >= 6 and punctuality_allows(user)
 
         return Response({
             "monthly_investment": None,  # optional (you don’t truly have this)
@@ -262,7 +266,7 @@ class LoanEligibilityDashboardView(APIView):
             "message": (
                 f"You are eligible for a loan! Based on your investment, you can apply for up to ₹{eligible_loan_amount}"
                 if eligible
-                else "You must be active in a committee for at least 6 months"
+                else "You must be active in a committee for at least 6 months and keep your installments on time"
             )
         })
 
@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.db.models import Count
 from .models import Property, PropertyImage, PropertyVideo
+from .services.facets import bump_facets_version
+from .services.listing_cache import bump_listing_version
 import logging
 
 # properties/admin.py
@@ -116,6 +118,9 @@ class PropertyAdmin(admin.ModelAdmin):
             status="draft",
             is_verified=True
         ).update(status="available")
+        # update() sends no post_save
+        bump_facets_version()
+        bump_listing_version()
 
 
 
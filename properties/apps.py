@@ -1,5 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class PropertiesConfig(AppConfig):
     name = 'properties'
+
+    def ready(self):
+        import properties.signals
+        from properties.services.user_search import ensure_user_search_index
+
+        post_migrate.connect(ensure_user_search_index, sender=self)
@@ -1,5 +1,13 @@
+import math
+
 import django_filters
-from .models import Property
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+
+from .geo import covering_prefixes, distance_km, prefix_filter, radius_bbox
+from .models import SEARCH_CONFIG, Property
 
 class PropertyFilter(django_filters.FilterSet):
     min_price = django_filters.NumberFilter(field_name="price", lookup_expr='gte')
@@ -26,3 +34,100 @@ class PropertyFilter(django_filters.FilterSet):
             'property_type', 'listing_type', 'status', 'city', 
             'bedrooms', 'bathrooms', 'furnished'
         ]
+
+
+class PropertySearchFilter(filters.BaseFilterBackend):
+    """
+    ?search= over the weighted search_vector (GIN indexed), parsed with
+    websearch_to_tsquery: "quoted phrases", OR and -exclusions work.
+    Results are ranked by relevance unless ?ordering= is given, so this
+    backend must run after OrderingFilter.
+    """
+    search_param = "search"
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, "").strip()
+        if not terms:
+            return queryset
+
+        query = SearchQuery(terms, search_type="websearch", config=SEARCH_CONFIG)
+        queryset = queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F("search_vector"), query)
+        )
+
+        if request.query_params.get(filters.OrderingFilter.ordering_param):
+            return queryset
+        return queryset.order_by("-search_rank", "-created_at")
+
+
+class PropertyGeoFilter(filters.BaseFilterBackend):
+    """
+    ?near=lat,lng&radius=km  — within radius, nearest first
+    ?bbox=min_lat,min_lng,max_lat,max_lng  — map viewport
+
+    Candidates come from a handful of geohash prefix range scans with
+    the box check in the index; the exact distance is computed on
+    those rows only.
+    Distance ordering applies unless ?ordering= is given.
+    """
+    DEFAULT_RADIUS_KM = 5
+    MAX_RADIUS_KM = 200
+
+    def _floats(self, request, name, count):
+        raw = request.query_params.get(name)
+        if raw is None:
+            return None
+        try:
+            values = [float(v) for v in raw.split(",")]
+        except ValueError:
+            raise ValidationError({name: "Expected comma-separated numbers"})
+        if len(values) != count or not all(map(math.isfinite, values)):
+            raise ValidationError({name: f"Expected {count} comma-separated numbers"})
+        return values
+
+    def _check_point(self, name, lat, lng):
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise ValidationError({name: "Latitude must be within ±90 and longitude within ±180"})
+
+    def filter_queryset(self, request, queryset, view):
+        near = self._floats(request, "near", 2)
+        bbox = self._floats(request, "bbox", 4)
+
+        if bbox:
+            min_lat, min_lng, max_lat, max_lng = bbox
+            self._check_point("bbox", min_lat, min_lng)
+            self._check_point("bbox", max_lat, max_lng)
+            if min_lat > max_lat or min_lng > max_lng:
+                raise ValidationError({"bbox": "Expected min_lat,min_lng,max_lat,max_lng"})
+
+            queryset = queryset.filter(
+                prefix_filter(covering_prefixes(min_lat, min_lng, max_lat, max_lng)),
+                latitude__range=(min_lat, max_lat),
+                longitude__range=(min_lng, max_lng),
+            )
+
+        if not near:
+            return queryset
+
+        lat, lng = near
+        self._check_point("near", lat, lng)
+
+        try:
+            radius = float(request.query_params.get("radius", self.DEFAULT_RADIUS_KM))
+        except ValueError:
+            raise ValidationError({"radius": "Expected a number of km"})
+        if not 0 < radius <= self.MAX_RADIUS_KM:
+            raise ValidationError({"radius": f"Radius must be between 0 and {self.MAX_RADIUS_KM} km"})
+
+        min_lat, min_lng, max_lat, max_lng = radius_bbox(lat, lng, radius)
+        queryset = queryset.filter(
+            prefix_filter(covering_prefixes(min_lat, min_lng, max_lat, max_lng)),
+            latitude__range=(min_lat, max_lat),
+            longitude__range=(min_lng, max_lng),
+        ).annotate(
+            distance_km=distance_km(lat, lng)
+        ).filter(distance_km__lte=radius)
+
+        if request.query_params.get(filters.OrderingFilter.ordering_param):
+            return queryset
+        return queryset.order_by("distance_km", "-created_at")
@@ -0,0 +1,147 @@
+import math
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cast, Cos, Least, Power, Radians, Sin, Sqrt
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# stored precision (~4 cm cells)
+GEOHASH_PRECISION = 12
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# upper bound on prefixes OR-ed together for a map viewport
+MAX_BBOX_CELLS = 32
+
+
+# =========================================================
+# GEOHASH
+# =========================================================
+
+def encode_geohash(lat, lng, precision=GEOHASH_PRECISION):
+    lat, lng = float(lat), float(lng)
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+
+    while len(chars) < precision:
+        rng, coord = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if coord >= mid:
+            value = value * 2 + 1
+            rng[0] = mid
+        else:
+            value = value * 2
+            rng[1] = mid
+        even = not even
+        bits += 1
+
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits = value = 0
+
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """
+    (lat degrees, lng degrees) covered by one cell.
+    """
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def _cells_covering(min_lat, min_lng, max_lat, max_lng, precision):
+    lat_step, lng_step = cell_size(precision)
+    cells = set()
+
+    lat = min_lat
+    while True:
+        lng = min_lng
+        while True:
+            cells.add(encode_geohash(lat, lng, precision))
+            if lng >= max_lng:
+                break
+            lng = min(lng + lng_step, max_lng)
+        if lat >= max_lat:
+            break
+        lat = min(lat + lat_step, max_lat)
+
+    return cells
+
+
+def radius_bbox(lat, lng, radius_km):
+    """
+    Box around the circle, clamped to valid coordinates. Longitude
+    degrees are sized at the box edge nearest a pole, so the box
+    never clips the circle.
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    widest = min(abs(lat) + dlat, 89.0)
+    dlng = radius_km / (KM_PER_DEGREE * math.cos(math.radians(widest)))
+    return (
+        max(lat - dlat, -90.0),
+        max(lng - dlng, -180.0),
+        min(lat + dlat, 90.0),
+        min(lng + dlng, 180.0),
+    )
+
+
+def covering_prefixes(min_lat, min_lng, max_lat, max_lng, max_cells=MAX_BBOX_CELLS):
+    """
+    The finest geohash prefixes that cover the box in at most
+    max_cells cells. Each prefix is one B-tree range scan.
+    """
+    best = {""}
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        lat_step, lng_step = cell_size(precision)
+        estimate = (
+            ((max_lat - min_lat) / lat_step + 2)
+            * ((max_lng - min_lng) / lng_step + 2)
+        )
+        if estimate > max_cells * 4:
+            break
+
+        cells = _cells_covering(min_lat, min_lng, max_lat, max_lng, precision)
+        if len(cells) > max_cells:
+            break
+        best = cells
+
+    return best
+
+
+def prefix_filter(prefixes):
+    if prefixes == {""}:
+        return Q(geohash__isnull=False)
+
+    query = Q()
+    for prefix in sorted(prefixes):
+        query |= Q(geohash__startswith=prefix)
+    return query
+
+
+# =========================================================
+# DISTANCE (HAVERSINE, IN SQL)
+# =========================================================
+
+def distance_km(lat, lng):
+    """
+    Great-circle distance in km from (lat, lng) to each row.
+    """
+    row_lat = Radians(Cast(F("latitude"), FloatField()))
+    row_lng = Radians(Cast(F("longitude"), FloatField()))
+    origin_lat = math.radians(lat)
+    origin_lng = math.radians(lng)
+
+    a = (
+        Power(Sin((row_lat - Value(origin_lat)) / 2), 2)
+        + Value(math.cos(origin_lat)) * Cos(row_lat)
+        * Power(Sin((row_lng - Value(origin_lng)) / 2), 2)
+    )
+    # Least() guards asin against rounding just above 1
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Least(Sqrt(a), Value(1.0)))
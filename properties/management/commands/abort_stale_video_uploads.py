@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from properties.models import VideoUploadSession
+from properties.services.chunked_upload import abort_video_upload
+
+
+class Command(BaseCommand):
+    help = "Abort resumable video uploads with no chunk received for --hours (frees S3 parts / staged files)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["hours"])
+        stale = VideoUploadSession.objects.filter(status="uploading", updated_at__lt=cutoff)
+
+        aborted = 0
+        for session in stale.iterator():
+            try:
+                abort_video_upload(session)
+                aborted += 1
+            except Exception as exc:
+                self.stderr.write(f"Upload {session.pk}: {exc}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Aborted {aborted} stale video uploads")
+        )
@@ -0,0 +1,146 @@
+import random
+import statistics
+import time
+import uuid
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from properties.filters import PropertyGeoFilter
+from properties.geo import KM_PER_DEGREE, encode_geohash
+from properties.models import Property
+
+# (lat, lng) of the cities most listings cluster around
+CITY_CENTRES = [
+    (18.5204, 73.8567),   # Pune
+    (19.0760, 72.8777),   # Mumbai
+    (12.9716, 77.5946),   # Bengaluru
+    (17.3850, 78.4867),   # Hyderabad
+    (13.0827, 80.2707),   # Chennai
+    (28.6139, 77.2090),   # Delhi
+    (22.5726, 88.3639),   # Kolkata
+    (9.9312, 76.2673),    # Kochi
+]
+CITY_SHARE = 0.6
+CITY_SPREAD_KM = 15
+
+
+class Command(BaseCommand):
+    help = "Benchmark radius and bounding-box property search on synthetic listings"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=1_000_000)
+        parser.add_argument("--chunk-size", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--radius", type=float, default=5)
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the benchmark listings afterwards",
+        )
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:8]
+        owner = User.objects.create(username=f"geo-bench-{tag}")
+
+        try:
+            self.seed(owner, options["count"], options["chunk_size"])
+
+            lat, lng = CITY_CENTRES[0]
+            half = 5 / KM_PER_DEGREE
+            cases = [
+                ("near city centre", {"near": f"{lat},{lng}", "radius": options["radius"]}),
+                ("near outskirts", {"near": f"{lat + 0.15},{lng + 0.15}", "radius": options["radius"]}),
+                ("10 km viewport", {"bbox": f"{lat - half},{lng - half},{lat + half},{lng + half}"}),
+            ]
+            for label, params in cases:
+                self.report(label, params, options["repeat"])
+        finally:
+            if not options["keep"]:
+                # bench listings have no related rows, so skip the ORM collector
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"DELETE FROM {Property._meta.db_table} WHERE owner_id = %s",
+                        [owner.id],
+                    )
+                owner.delete()
+
+    def random_point(self, rng):
+        if rng.random() < CITY_SHARE:
+            lat, lng = rng.choice(CITY_CENTRES)
+            return (
+                lat + rng.gauss(0, CITY_SPREAD_KM / KM_PER_DEGREE),
+                lng + rng.gauss(0, CITY_SPREAD_KM / KM_PER_DEGREE),
+            )
+        return rng.uniform(8, 35), rng.uniform(68, 97)
+
+    def seed(self, owner, count, chunk_size):
+        rng = random.Random(count)
+        started = time.perf_counter()
+        made = 0
+
+        while made < count:
+            size = min(chunk_size, count - made)
+            rows = []
+            for i in range(size):
+                lat, lng = self.random_point(rng)
+                rows.append(Property(
+                    title=f"Listing {made + i}",
+                    description="Synthetic listing",
+                    property_type="apartment",
+                    status="available",
+                    location="Bench",
+                    address="Bench",
+                    city="Bench",
+                    state="IN",
+                    pincode="400001",
+                    latitude=Decimal(f"{lat:.8f}"),
+                    longitude=Decimal(f"{lng:.8f}"),
+                    # bulk_create skips save(), so set it here
+                    geohash=encode_geohash(lat, lng),
+                    price=Decimal(rng.randint(20, 500) * 100_000),
+                    area_sqft=rng.randint(400, 4000),
+                    bedrooms=rng.randint(1, 5),
+                    bathrooms=rng.randint(1, 4),
+                    owner=owner,
+                    contact_name="Bench",
+                    contact_phone="9000000000",
+                    contact_email="bench@example.com",
+                    is_verified=True,
+                ))
+            Property.objects.bulk_create(rows)
+            made += size
+
+        # steady state: visibility map and hint bits set, stats fresh
+        with connection.cursor() as cursor:
+            cursor.execute(f"VACUUM ANALYZE {Property._meta.db_table}")
+
+        self.stdout.write(
+            f"Seeded {count} listings in {time.perf_counter() - started:.1f}s"
+        )
+
+    def report(self, label, params, repeat):
+        """
+        Median ms for one listing page: COUNT + first 20 rows.
+        """
+        request = Request(RequestFactory().get("/", params))
+        queryset = PropertyGeoFilter().filter_queryset(
+            request,
+            Property.objects.filter(status="available", is_verified=True),
+            None,
+        )
+
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            total = queryset.count()
+            list(queryset[:20])
+            samples.append((time.perf_counter() - started) * 1000)
+
+        median = statistics.median(samples)
+        style = self.style.SUCCESS if median < 50 else self.style.WARNING
+        self.stdout.write(style(f"{label:18} {median:8.1f} ms  hits={total}"))
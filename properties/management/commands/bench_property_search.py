@@ -0,0 +1,161 @@
+import random
+import statistics
+import time
+import uuid
+from decimal import Decimal
+from functools import reduce
+from operator import and_, or_
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from properties.filters import PropertySearchFilter
+from properties.models import Property, property_search_vector
+
+CITIES = ["Pune", "Mumbai", "Bengaluru", "Hyderabad", "Chennai", "Delhi", "Noida", "Kochi"]
+AREAS = ["Baner", "Powai", "Whitefield", "Gachibowli", "Adyar", "Dwarka", "Sector 62", "Kakkanad"]
+KINDS = ["apartment", "villa", "penthouse", "studio", "duplex", "bungalow", "plot", "office"]
+FEATURES = [
+    "sea view", "garden", "modular kitchen", "gated community", "near metro",
+    "covered parking", "swimming pool", "corner unit", "east facing", "power backup",
+    "club house", "vastu compliant", "high floor", "semi furnished", "pet friendly",
+]
+LEGACY_FIELDS = ["title", "description", "location", "city"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark property search on synthetic listings: "
+        "legacy ILIKE SearchFilter vs the ranked full-text search"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=1_000_000)
+        parser.add_argument("--chunk-size", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--query",
+            action="append",
+            help="Search string (repeatable); defaults to a few typical ones",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the benchmark listings afterwards",
+        )
+
+    def handle(self, *args, **options):
+        queries = options["query"] or ["sea view villa", "pune", '"gated community" -plot']
+        tag = uuid.uuid4().hex[:8]
+        owner = User.objects.create(username=f"search-bench-{tag}")
+
+        try:
+            self.seed(owner, options["count"], options["chunk_size"])
+            for terms in queries:
+                self.compare(terms, options["repeat"])
+        finally:
+            if not options["keep"]:
+                # bench listings have no related rows, so skip the ORM collector
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"DELETE FROM {Property._meta.db_table} WHERE owner_id = %s",
+                        [owner.id],
+                    )
+                owner.delete()
+
+    def seed(self, owner, count, chunk_size):
+        rng = random.Random(count)
+        started = time.perf_counter()
+        made = 0
+
+        while made < count:
+            size = min(chunk_size, count - made)
+            rows = []
+            for _ in range(size):
+                city = rng.choice(CITIES)
+                area = rng.choice(AREAS)
+                kind = rng.choice(KINDS)
+                features = rng.sample(FEATURES, 3)
+                rows.append(Property(
+                    title=f"{rng.randint(1, 5)} BHK {kind} in {area}",
+                    description=(
+                        f"Spacious {kind} with {', '.join(features)}. "
+                        f"Close to schools and markets in {city}."
+                    ),
+                    property_type="apartment",
+                    status="available",
+                    location=area,
+                    address=f"{rng.randint(1, 999)} Main Road",
+                    city=city,
+                    state="IN",
+                    pincode="400001",
+                    price=Decimal(rng.randint(20, 500) * 100_000),
+                    area_sqft=rng.randint(400, 4000),
+                    bedrooms=rng.randint(1, 5),
+                    bathrooms=rng.randint(1, 4),
+                    owner=owner,
+                    contact_name="Bench",
+                    contact_phone="9000000000",
+                    contact_email="bench@example.com",
+                    is_verified=True,
+                ))
+
+            with transaction.atomic():
+                created = Property.objects.bulk_create(rows)
+                Property.objects.filter(pk__in=[p.pk for p in created]).update(
+                    search_vector=property_search_vector()
+                )
+            made += size
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Property._meta.db_table}")
+
+        self.stdout.write(
+            f"Seeded {count} listings in {time.perf_counter() - started:.1f}s"
+        )
+
+    def legacy_queryset(self, terms):
+        """
+        What DRF SearchFilter built: every term must ILIKE-match some field.
+        """
+        return Property.objects.filter(status="available", is_verified=True).filter(
+            reduce(and_, [
+                reduce(or_, [Q(**{f"{field}__icontains": term}) for field in LEGACY_FIELDS])
+                for term in terms.replace('"', "").split()
+            ])
+        )
+
+    def fts_queryset(self, terms):
+        request = Request(RequestFactory().get("/", {"search": terms}))
+        return PropertySearchFilter().filter_queryset(
+            request,
+            Property.objects.filter(status="available", is_verified=True),
+            None,
+        )
+
+    def timed(self, queryset, repeat):
+        """
+        Median ms for one listing page: COUNT + first 20 rows.
+        """
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            total = queryset.count()
+            list(queryset[:20])
+            samples.append((time.perf_counter() - started) * 1000)
+        return statistics.median(samples), total
+
+    def compare(self, terms, repeat):
+        legacy_ms, legacy_hits = self.timed(self.legacy_queryset(terms), repeat)
+        fts_ms, fts_hits = self.timed(self.fts_queryset(terms), repeat)
+
+        self.stdout.write(f"search={terms!r}")
+        self.stdout.write(f"  ILIKE     {legacy_ms:9.1f} ms  hits={legacy_hits}")
+        self.stdout.write(f"  full-text {fts_ms:9.1f} ms  hits={fts_hits}")
+        self.stdout.write(
+            self.style.SUCCESS(f"  speed-up  {legacy_ms / fts_ms:9.1f}x")
+        )
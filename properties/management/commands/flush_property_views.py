@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from properties.services.view_counter import flush_view_counts
+
+
+class Command(BaseCommand):
+    help = "Fold buffered property detail views into Property.views_count"
+
+    def handle(self, *args, **options):
+        flushed = flush_view_counts()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Flushed {flushed} property views")
+        )
@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from properties.models import PropertyImage
+from properties.services.image_variants import needs_variants, render_variants
+
+
+def _render(image_id):
+    try:
+        return render_variants(image_id) is not None
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = "Render thumb/card/full variants for images uploaded before they existed (--all: every image)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--all", action="store_true")
+
+    def handle(self, *args, **options):
+        queryset = PropertyImage.objects.exclude(image="").order_by("pk")
+
+        last_pk = None
+        rendered = 0
+        failed = 0
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            while True:
+                chunk = queryset
+                if last_pk is not None:
+                    chunk = chunk.filter(pk__gt=last_pk)
+                rows = list(chunk.only("pk", "image", "variants")[:options["chunk_size"]])
+
+                if not rows:
+                    break
+
+                ids = [row.pk for row in rows if options["all"] or needs_variants(row)]
+                futures = [pool.submit(_render, pk) for pk in ids]
+
+                for pk, future in zip(ids, futures):
+                    try:
+                        rendered += future.result()
+                    except Exception as exc:
+                        failed += 1
+                        self.stderr.write(f"PropertyImage {pk}: {exc}")
+
+                last_pk = rows[-1].pk
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Variants rendered for {rendered} images ({failed} failed)")
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from properties.models import PurchasePlan
+
+
+class Command(BaseCommand):
+    help = "Recompute PurchasePlan.confirmed_count / confirmed_total from confirmed contributions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        plan_ids = list(PurchasePlan.objects.order_by("pk").values_list("pk", flat=True))
+        size = options["chunk_size"]
+
+        for start in range(0, len(plan_ids), size):
+            with transaction.atomic():
+                for plan in PurchasePlan.objects.select_for_update().filter(
+                    pk__in=plan_ids[start:start + size]
+                ):
+                    plan.recount_confirmed()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Counters rebuilt for {len(plan_ids)} plans")
+        )
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from properties.geo import encode_geohash
+from properties.models import Property
+
+
+class Command(BaseCommand):
+    help = "Fill Property.geohash for located rows saved before it existed (--all: every row)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--all", action="store_true")
+
+    def handle(self, *args, **options):
+        queryset = Property.objects.filter(
+            latitude__isnull=False,
+            longitude__isnull=False,
+        ).order_by("pk")
+        if not options["all"]:
+            queryset = queryset.filter(geohash__isnull=True)
+
+        last_pk = None
+        updated = 0
+
+        while True:
+            chunk = queryset
+            if last_pk is not None:
+                chunk = chunk.filter(pk__gt=last_pk)
+            rows = list(chunk.only("pk", "latitude", "longitude")[:options["chunk_size"]])
+
+            if not rows:
+                break
+
+            for row in rows:
+                row.geohash = encode_geohash(row.latitude, row.longitude)
+            # bulk_update skips save(), so search vectors are left alone
+            updated += Property.objects.bulk_update(rows, ["geohash"])
+            last_pk = rows[-1].pk
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Geohashes rebuilt for {updated} properties")
+        )
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from properties.models import Property, property_search_vector
+
+
+class Command(BaseCommand):
+    help = "Fill Property.search_vector for rows saved before it existed (--all: every row)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--all", action="store_true")
+
+    def handle(self, *args, **options):
+        queryset = Property.objects.order_by("pk")
+        if not options["all"]:
+            queryset = queryset.filter(search_vector__isnull=True)
+
+        last_pk = None
+        updated = 0
+
+        while True:
+            chunk = queryset
+            if last_pk is not None:
+                chunk = chunk.filter(pk__gt=last_pk)
+            pks = list(chunk.values_list("pk", flat=True)[:options["chunk_size"]])
+
+            if not pks:
+                break
+
+            updated += Property.objects.filter(pk__in=pks).update(
+                search_vector=property_search_vector()
+            )
+            last_pk = pks[-1]
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Search vectors rebuilt for {updated} properties")
+        )
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from properties.services.similarity import TOP_K, refresh_similar_properties
+
+
+class Command(BaseCommand):
+    help = "Recompute the similar-properties table (incremental; --full: every listing)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true")
+        parser.add_argument("--top-k", type=int, default=TOP_K)
+        # default: sized from the catalogue (BATCH_ELEMENTS)
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        recomputed, total = refresh_similar_properties(
+            full=options["full"],
+            k=options["top_k"],
+            batch_size=options["batch_size"],
+        )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Similar properties recomputed for {recomputed} of {total} listings in {elapsed:.2f}s"
+            )
+        )
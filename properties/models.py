@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
@@ -7,6 +9,8 @@ import uuid
 import os
 import builtins
 
+from .geo import encode_geohash
+
 
 def property_image_upload_path(instance, filename):
     """Generate upload path for property images"""
@@ -14,6 +18,27 @@ def property_image_upload_path(instance, filename):
     filename = f'{uuid.uuid4()}.{ext}'
     return os.path.join('properties', str(instance.property.id), filename)
 
+
+# =========================================================
+# FULL-TEXT SEARCH
+# =========================================================
+
+SEARCH_CONFIG = "english"
+
+# fields that feed Property.search_vector
+SEARCH_FIELDS = {"title", "location", "city", "description"}
+
+
+def property_search_vector():
+    """
+    Weighted document: title (A) > location / city (B) > description (C).
+    """
+    return (
+        SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("location", "city", weight="B", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="C", config=SEARCH_CONFIG)
+    )
+
 class Property(models.Model):
     PROPERTY_TYPES = [
         ('residential', 'Residential'),
@@ -96,16 +121,47 @@ class Property(models.Model):
     investment_enabled = models.BooleanField(default=True)
     investors_min = models.PositiveIntegerField(default=2) 
     investors_max = models.PositiveIntegerField(default=50)
-    
 
+    # 🔍 maintained on save — see property_search_vector()
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # 📍 maintained on save from latitude / longitude — see properties.geo
+    geohash = models.CharField(max_length=12, null=True, blank=True, editable=False)
 
     
     class Meta:
         ordering = ['-created_at']
         verbose_name_plural = 'Properties'
+        indexes = [
+            GinIndex(fields=["search_vector"], name="property_search_gin"),
+            # pattern ops so LIKE 'prefix%' can use the B-tree; lat / lng
+            # let the box check run in the index, before any heap fetch
+            models.Index(
+                fields=["geohash", "latitude", "longitude"],
+                name="property_geohash_idx",
+                opclasses=["varchar_pattern_ops", "numeric_ops", "numeric_ops"],
+            ),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.location}"
+
+    def save(self, *args, **kwargs):
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        else:
+            self.geohash = None
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"latitude", "longitude"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "geohash"}
+
+        super().save(*args, **kwargs)
+
+        if update_fields is None or SEARCH_FIELDS & set(update_fields):
+            Property.objects.filter(pk=self.pk).update(
+                search_vector=property_search_vector()
+            )
     
     @builtins.property
     def main_image(self):
@@ -128,6 +184,10 @@ class PropertyImage(models.Model):
     caption = models.CharField(max_length=200, blank=True)
     is_primary = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    # resized copies, filled off the request path by
+    # services.image_variants: {"source": <image name>, "thumb": {...}, ...}
+    variants = models.JSONField(default=dict, blank=True, editable=False)
     
     class Meta:
         ordering = ['-is_primary', 'created_at']
@@ -149,6 +209,86 @@ class PropertyVideo(models.Model):
     def __str__(self):
         return f"Video - {self.property.title}"
 
+
+class VideoUploadSession(models.Model):
+    """
+    One resumable (chunked) video upload: init, PUT parts at offsets,
+    complete. See services.chunked_upload.
+    """
+    STATUS_CHOICES = [
+        ("uploading", "Uploading"),
+        ("complete", "Complete"),
+        ("aborted", "Aborted"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name="video_uploads")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="video_uploads")
+
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100)
+    total_size = models.BigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+
+    # storage name of the assembled file, and the backend's handle on
+    # the in-progress upload (S3 UploadId / local staging dir)
+    key = models.CharField(max_length=500)
+    backend_upload_id = models.CharField(max_length=1024, blank=True)
+
+    # {"<part number>": {"etag": ..., "size": ...}}
+    parts = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="uploading")
+    video = models.OneToOneField(
+        PropertyVideo, on_delete=models.SET_NULL, null=True, blank=True, related_name="upload_session"
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "updated_at"], name="video_upload_status_idx"),
+        ]
+
+    @builtins.property
+    def part_count(self):
+        return max(1, -(-self.total_size // self.chunk_size))
+
+    def part_size(self, number):
+        if number == self.part_count:
+            return self.total_size - self.chunk_size * (number - 1)
+        return self.chunk_size
+
+    @builtins.property
+    def missing_parts(self):
+        return [n for n in range(1, self.part_count + 1) if str(n) not in self.parts]
+
+    def __str__(self):
+        return f"Upload {self.filename} ({self.status})"
+
+class SimilarProperty(models.Model):
+    """
+    Precomputed "similar properties" rail: the top-K catalogue
+    neighbours of `property`, nearest first. Written only by
+    services.similarity (refresh_similar_properties).
+    """
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name="similar_entries")
+    similar = models.ForeignKey(Property, on_delete=models.CASCADE, related_name="similar_to_entries")
+    rank = models.PositiveSmallIntegerField()
+    distance = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            # also the index the API reads through
+            models.UniqueConstraint(fields=["property", "rank"], name="similar_property_rank_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.property_id} #{self.rank} → {self.similar_id}"
+
+
 class PropertyInquiry(models.Model):
     INQUIRY_TYPES = [
         ('buying', 'Interested in Buying'),
@@ -257,7 +397,7 @@ import uuid
 from decimal import Decimal
 
 class OwnerNotification(models.Model):
-    TYPE_CHOICES = [("interest","Interest"), ("payment","Payment"), ("sold","Sold")]
+    TYPE_CHOICES = [("interest","Interest"), ("payment","Payment"), ("sold","Sold"), ("group_payment","Group Payment")]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(
@@ -284,7 +424,7 @@ import uuid
 from decimal import Decimal, ROUND_HALF_UP
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models import Sum
+from django.db.models import Count, F, Sum
 from django.core.exceptions import ValidationError
 
 def money_round(x: Decimal) -> Decimal:
@@ -309,6 +449,10 @@ class PurchasePlan(models.Model):
     status = models.CharField(max_length=20, choices=STATUS, default="draft")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # 🔒 denormalized from confirmed contributions — see record_confirmed()
+    confirmed_count = models.PositiveIntegerField(default=0)
+    confirmed_total = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal("0.00"))
+
     def calc_total(self) -> Decimal:
         multiplier = Decimal("1.00") + (self.gst_percent / Decimal("100")) + (self.platform_percent / Decimal("100"))
         return money_round(self.base_price * multiplier)
@@ -330,7 +474,7 @@ class PurchasePlan(models.Model):
         if not self.is_ready_to_activate():
             raise ValidationError("Plan not ready")
         self.status = "active"
-        self.save()
+        self.save(update_fields=["status"])
 
     def last_person_amount(self) -> Decimal:
         share = self.per_person_amount()
@@ -338,14 +482,27 @@ class PurchasePlan(models.Model):
             return self.total_payable
         return money_round(self.total_payable - (share * Decimal(self.group_size - 1)))
 
-    @builtins.property
-    def confirmed_total(self) -> Decimal:
-        s = self.contributions.filter(status="confirmed").aggregate(t=Sum("amount"))["t"]
-        return s or Decimal("0.00")
+    def record_confirmed(self, amount: Decimal):
+        """
+        Counts one confirmed contribution. Callers hold the plan row
+        lock (select_for_update), so the count the next payer's amount
+        is based on cannot move underneath them.
+        """
+        PurchasePlan.objects.filter(pk=self.pk).update(
+            confirmed_count=F("confirmed_count") + 1,
+            confirmed_total=F("confirmed_total") + amount,
+        )
+        self.confirmed_count += 1
+        self.confirmed_total += amount
 
-    @builtins.property
-    def confirmed_count(self) -> int:
-        return self.contributions.filter(status="confirmed").count()
+    def recount_confirmed(self):
+        """Rebuild the counters from contributions (backfill / repair)."""
+        totals = self.contributions.filter(status="confirmed").aggregate(
+            n=Count("id"), t=Sum("amount")
+        )
+        self.confirmed_count = totals["n"]
+        self.confirmed_total = totals["t"] or Decimal("0.00")
+        self.save(update_fields=["confirmed_count", "confirmed_total"])
 
 
 class PlanInvite(models.Model):
@@ -444,15 +601,21 @@ class GroupPaymentInvite(models.Model):
 
     token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False )
 
+    # share requested from this member (None for share links / non-payers)
+    amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    is_payer = models.BooleanField(default=True)
+
     status = models.CharField(
         max_length=20,
         choices=[
             ("pending", "Pending"),
             ("accepted", "Accepted"),
             ("rejected", "Rejected"),
+            ("paid", "Paid"),
         ],
         default="pending"
     )
+    created_at = models.DateTimeField(auto_now_add=True)
 
 
 
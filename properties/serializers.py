@@ -1,18 +1,22 @@
 from rest_framework import serializers
+from django.db.models import CharField, Count, Exists, OuterRef, Prefetch, Subquery, Value
 from .models import Property, PropertyImage, PropertyInquiry, PropertyFavorite
 from django.contrib.auth.models import User
 from .models import *
 from .models import GroupPaymentInvite
+from .services.image_variants import variant_urls
 
 
 class PropertyImageSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    variants = serializers.SerializerMethodField()
 
     class Meta:
         model = PropertyImage
         fields = [
             "id",
             "image",
+            "variants",
             "caption",
             "is_primary",
             "created_at",
@@ -25,6 +29,10 @@ class PropertyImageSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(obj.image.url)
             return obj.image.url
         return None
+
+    def get_variants(self, obj):
+        request = self.context.get("request")
+        return variant_urls(obj, request.build_absolute_uri if request else str)
 class PropertyVideoSerializer(serializers.ModelSerializer):
     video = serializers.SerializerMethodField()
 
@@ -39,6 +47,28 @@ class PropertyVideoSerializer(serializers.ModelSerializer):
         return None
 
 
+class VideoUploadSessionSerializer(serializers.ModelSerializer):
+    part_count = serializers.ReadOnlyField()
+    missing_parts = serializers.ReadOnlyField()
+    video = PropertyVideoSerializer(read_only=True)
+
+    class Meta:
+        model = VideoUploadSession
+        fields = [
+            "id",
+            "filename",
+            "content_type",
+            "total_size",
+            "chunk_size",
+            "part_count",
+            "missing_parts",
+            "status",
+            "video",
+            "created_at",
+            "updated_at",
+        ]
+
+
 class PropertyOwnerSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -46,7 +76,9 @@ class PropertyOwnerSerializer(serializers.ModelSerializer):
 
 class PropertyListSerializer(serializers.ModelSerializer):
     main_image = serializers.SerializerMethodField()
+    main_image_variants = serializers.SerializerMethodField()
     other_images = serializers.SerializerMethodField()
+    other_image_variants = serializers.SerializerMethodField()
     video = serializers.SerializerMethodField()
 
     class Meta:
@@ -64,36 +96,60 @@ class PropertyListSerializer(serializers.ModelSerializer):
             "property_type",
             "is_verified",
             "main_image",
+            "main_image_variants",
             "other_images",
+            "other_image_variants",
             "video",   # 👈 IMPORTANT
         ]
 
-    def get_main_image(self, obj):
+    @staticmethod
+    def media_prefetches(prefix=""):
+        """
+        Prefetch lookups for the listing media. `prefix` points at the
+        property from another model, e.g. "property__" for favorites.
+        """
+        return [
+            Prefetch(f"{prefix}images", queryset=PropertyImage.objects.order_by("-is_primary", "created_at", "id")),
+            Prefetch(f"{prefix}videos", queryset=PropertyVideo.objects.order_by("id")),
+        ]
+
+    # ⚡ media is picked from the prefetched cache — no query per row
+    def _absolute(self, url):
         request = self.context.get("request")
-        image = obj.images.filter(is_primary=True).first() or obj.images.first()
+        return request.build_absolute_uri(url) if request else url
+
+    def _url(self, file):
+        return self._absolute(file.url)
+
+    def _main(self, obj):
+        images = list(obj.images.all())
+        return next((img for img in images if img.is_primary), None) or (images[0] if images else None)
+
+    def get_main_image(self, obj):
+        image = self._main(obj)
 
         if image and image.image:
-            return request.build_absolute_uri(image.image.url) if request else image.image.url
+            return self._url(image.image)
         return None
 
-    def get_other_images(self, obj):
-        request = self.context.get("request")
-        images = obj.images.filter(is_primary=False)
+    def get_main_image_variants(self, obj):
+        image = self._main(obj)
+        return variant_urls(image, self._absolute) if image else None
 
-        urls = []
-        for img in images:
-            urls.append(request.build_absolute_uri(img.image.url) if request else img.image.url)
+    def get_other_images(self, obj):
+        return [self._url(img.image) for img in obj.images.all() if not img.is_primary]
 
-        return urls
+    # same order as other_images; None where variants are still pending
+    def get_other_image_variants(self, obj):
+        return [variant_urls(img, self._absolute) for img in obj.images.all() if not img.is_primary]
 
     def get_video(self, obj):
-        request = self.context.get("request")
-        vid = obj.videos.first()
+        vid = next(iter(obj.videos.all()), None)
 
         if not vid:
             return None
 
-        return request.build_absolute_uri(vid.video.url) if request else vid.video.url
+        return self._url(vid.video)
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
@@ -102,6 +158,10 @@ class PropertyListSerializer(serializers.ModelSerializer):
         if not data.get("video"):
             data.pop("video", None)
 
+        # 📍 only present on ?near= searches
+        if getattr(instance, "distance_km", None) is not None:
+            data["distance_km"] = round(instance.distance_km, 2)
+
         return data
 
 class PropertyDetailSerializer(serializers.ModelSerializer):
@@ -117,9 +177,33 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
         model = Property
         fields = "__all__"
 
+    @staticmethod
+    def annotate_for(queryset, user):
+        """
+        Everything the detail payload needs besides media, in the row
+        itself: owner joined, favorited / inquiry count / request status
+        annotated. Media comes from media_prefetches().
+        """
+        if user.is_authenticated:
+            is_favorited = Exists(PropertyFavorite.objects.filter(property=OuterRef("pk"), user=user))
+            request_status = Subquery(
+                PropertyRequest.objects.filter(property=OuterRef("pk"), user=user)
+                .order_by("-created_at")
+                .values("status")[:1]
+            )
+        else:
+            is_favorited = Value(False)
+            request_status = Value(None, output_field=CharField())
+
+        return queryset.select_related("owner").annotate(
+            is_favorited=is_favorited,
+            inquiry_count=Count("inquiries"),
+            user_request_status=request_status,
+        )
+
     def get_video(self, obj):
         request = self.context.get("request")
-        vid = obj.videos.first()
+        vid = next(iter(obj.videos.all()), None)
 
         if not vid:
             return None
@@ -134,7 +218,12 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
 
         return data
 
+    # annotated by annotate_for(); the queries below are the fallback
+
     def get_is_favorited(self, obj):
+        if hasattr(obj, "is_favorited"):
+            return obj.is_favorited
+
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return PropertyFavorite.objects.filter(
@@ -143,9 +232,14 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
         return False
 
     def get_inquiry_count(self, obj):
+        if hasattr(obj, "inquiry_count"):
+            return obj.inquiry_count
         return obj.inquiries.count()
 
     def get_user_request_status(self, obj):
+        if hasattr(obj, "user_request_status"):
+            return obj.user_request_status
+
         request = self.context.get('request')
         if not request or not request.user.is_authenticated:
             return None
@@ -246,12 +340,11 @@ class CreateInterestSerializer(serializers.Serializer):
 class PurchasePlanSerializer(serializers.ModelSerializer):
     per_person_amount = serializers.SerializerMethodField()
     last_person_amount = serializers.SerializerMethodField()
-    confirmed_total = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
-    confirmed_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = PurchasePlan
         fields = "__all__"
+        read_only_fields = ["confirmed_count", "confirmed_total"]
 
     def get_per_person_amount(self, obj):
         return str(obj.per_person_amount())
@@ -342,6 +435,7 @@ class GroupPaymentInviteSerializer(serializers.ModelSerializer):
         model = GroupPaymentInvite
         fields = [
             "id",
+            "token",
             "status",
             "created_at",
             "property",
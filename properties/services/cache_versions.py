@@ -0,0 +1,44 @@
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+
+# =========================================================
+# VERSIONED CACHE KEYS
+# =========================================================
+#
+# Entries are keyed (or stamped) with a version counter instead of
+# being deleted: bumping it orphans every entry of that family at
+# once, and the old entries simply expire. A bump reaches every process
+# only when the default cache is shared (REDIS_URL); on the LocMem
+# fallback it invalidates the bumping process alone.
+
+def current_version(key):
+    version = cache.get(key)
+    if version is None:
+        # never restart at a number older entries may still be under
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def query_signature(query_params, ignored=()):
+    """
+    Stable hash of a query string: key order, value order within a
+    repeated key and blank values do not matter.
+    """
+    normalized = sorted(
+        (key, sorted(v.strip() for v in values if v.strip()))
+        for key, values in query_params.lists()
+        if key not in ignored
+    )
+    normalized = [(key, values) for key, values in normalized if values]
+    return hashlib.sha1(json.dumps(normalized).encode()).hexdigest()
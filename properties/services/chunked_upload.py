@@ -0,0 +1,239 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from storages.backends.s3boto3 import S3Boto3Storage
+from storages.utils import clean_name
+
+from properties.models import PropertyVideo, VideoUploadSession
+
+VIDEO_PREFIX = "properties/videos/"
+
+# request body is copied through this much memory at a time; anything
+# beyond SPOOL_BYTES of one chunk spills to a temp file
+READ_BYTES = 1024 * 1024
+SPOOL_BYTES = 2 * 1024 * 1024
+
+
+# =========================================================
+# STORAGE BACKENDS
+# =========================================================
+#
+# Both keep parts out of the database and out of memory. S3 assembles
+# them server-side (multipart upload); anything else stages them on
+# local disk and concatenates on completion. Tests run on the latter.
+
+class S3MultipartBackend:
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.client = storage.connection.meta.client
+        self.bucket = storage.bucket_name
+
+    def _key(self, name):
+        return self.storage._normalize_name(clean_name(name))
+
+    def start(self, name, content_type):
+        params = self.storage.get_object_parameters(name)
+        params["ContentType"] = content_type
+        response = self.client.create_multipart_upload(
+            Bucket=self.bucket, Key=self._key(name), **params
+        )
+        return response["UploadId"]
+
+    def put_part(self, session, number, fh, size):
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=self._key(session.key),
+            UploadId=session.backend_upload_id,
+            PartNumber=number,
+            Body=fh,
+            ContentLength=size,
+        )
+        return response["ETag"].strip('"')
+
+    def complete(self, session):
+        parts = sorted(
+            ({"PartNumber": int(n), "ETag": part["etag"]} for n, part in session.parts.items()),
+            key=lambda p: p["PartNumber"],
+        )
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self._key(session.key),
+            UploadId=session.backend_upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+        return session.key
+
+    def abort(self, session):
+        self.client.abort_multipart_upload(
+            Bucket=self.bucket,
+            Key=self._key(session.key),
+            UploadId=session.backend_upload_id,
+        )
+
+
+class LocalChunkBackend:
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.root = settings.VIDEO_UPLOAD_STAGING_DIR
+
+    def _dir(self, session):
+        return os.path.join(self.root, session.backend_upload_id)
+
+    def start(self, name, content_type):
+        upload_id = uuid.uuid4().hex
+        os.makedirs(os.path.join(self.root, upload_id))
+        return upload_id
+
+    def put_part(self, session, number, fh, size):
+        digest = hashlib.md5()
+        # write-then-rename: a retried or interrupted part never leaves
+        # a half-written file under its final name
+        path = os.path.join(self._dir(session), f"{number}.part")
+        with open(f"{path}.tmp", "wb") as out:
+            for block in iter(lambda: fh.read(READ_BYTES), b""):
+                digest.update(block)
+                out.write(block)
+        os.replace(f"{path}.tmp", path)
+        return digest.hexdigest()
+
+    def complete(self, session):
+        with tempfile.TemporaryFile() as assembled:
+            for number in range(1, session.part_count + 1):
+                with open(os.path.join(self._dir(session), f"{number}.part"), "rb") as part:
+                    shutil.copyfileobj(part, assembled, READ_BYTES)
+            assembled.seek(0)
+            name = self.storage.save(session.key, File(assembled, name=session.key))
+
+        shutil.rmtree(self._dir(session), ignore_errors=True)
+        return name
+
+    def abort(self, session):
+        shutil.rmtree(self._dir(session), ignore_errors=True)
+
+
+def get_upload_backend():
+    storage = PropertyVideo._meta.get_field("video").storage
+    if isinstance(storage, S3Boto3Storage):
+        return S3MultipartBackend(storage)
+    return LocalChunkBackend(storage)
+
+
+# =========================================================
+# UPLOAD PROTOCOL: START → PUT PARTS → COMPLETE
+# =========================================================
+
+def start_video_upload(prop, user, *, filename, size, content_type):
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise ValueError("size must be an integer byte count")
+
+    if size <= 0 or size > settings.VIDEO_UPLOAD_MAX_BYTES:
+        raise ValueError(f"size must be between 1 and {settings.VIDEO_UPLOAD_MAX_BYTES} bytes")
+    if not filename:
+        raise ValueError("filename is required")
+    if not (content_type or "").startswith("video/"):
+        raise ValueError("content_type must be a video/* type")
+
+    ext = os.path.splitext(filename)[1].lower()[:10]
+    key = f"{VIDEO_PREFIX}{uuid.uuid4().hex}{ext}"
+
+    backend = get_upload_backend()
+    return VideoUploadSession.objects.create(
+        property=prop,
+        user=user,
+        filename=os.path.basename(filename)[:255],
+        content_type=content_type,
+        total_size=size,
+        chunk_size=settings.VIDEO_UPLOAD_CHUNK_SIZE,
+        key=key,
+        backend_upload_id=backend.start(key, content_type),
+    )
+
+
+def receive_part(session, *, offset, length, stream):
+    """
+    Stores the chunk starting at byte `offset`. Chunks are fixed-size
+    (session.chunk_size, the last one shorter), so re-sending a chunk
+    simply replaces it. Returns the refreshed session.
+    """
+    if session.status != "uploading":
+        raise ValueError(f"Upload is {session.status}")
+
+    try:
+        offset, length = int(offset), int(length)
+    except (TypeError, ValueError):
+        raise ValueError("offset and Content-Length must be integers")
+
+    if offset < 0 or offset >= session.total_size or offset % session.chunk_size:
+        raise ValueError(f"offset must be a multiple of {session.chunk_size} below {session.total_size}")
+
+    number = offset // session.chunk_size + 1
+    expected = session.part_size(number)
+    if length != expected:
+        raise ValueError(f"chunk at offset {offset} must be {expected} bytes")
+
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES) as chunk:
+        remaining = expected
+        while remaining:
+            block = stream.read(min(READ_BYTES, remaining))
+            if not block:
+                raise ValueError("Chunk ended early; resend it")
+            chunk.write(block)
+            remaining -= len(block)
+        chunk.seek(0)
+
+        etag = get_upload_backend().put_part(session, number, chunk, expected)
+
+    # parts of one upload may arrive in parallel: merge under the row lock
+    with transaction.atomic():
+        session = VideoUploadSession.objects.select_for_update().get(pk=session.pk)
+        if session.status != "uploading":
+            raise ValueError(f"Upload is {session.status}")
+        session.parts[str(number)] = {"etag": etag, "size": expected}
+        session.save(update_fields=["parts", "updated_at"])
+
+    return session
+
+
+def complete_video_upload(session):
+    """Assembles the parts into a PropertyVideo. Repeating it is a no-op."""
+    with transaction.atomic():
+        session = VideoUploadSession.objects.select_for_update().get(pk=session.pk)
+
+        if session.status == "complete":
+            return session
+        if session.status != "uploading":
+            raise ValueError(f"Upload is {session.status}")
+
+        missing = session.missing_parts
+        if missing:
+            raise ValueError(f"Missing parts: {missing[:20]}")
+
+        name = get_upload_backend().complete(session)
+        session.video = PropertyVideo.objects.create(property=session.property, video=name)
+        session.status = "complete"
+        session.save(update_fields=["video", "status", "updated_at"])
+
+    return session
+
+
+def abort_video_upload(session):
+    with transaction.atomic():
+        session = VideoUploadSession.objects.select_for_update().get(pk=session.pk)
+        if session.status != "uploading":
+            return session
+
+        get_upload_backend().abort(session)
+        session.status = "aborted"
+        session.save(update_fields=["status", "updated_at"])
+
+    return session
@@ -0,0 +1,121 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Case, CharField, Count, Q, Value, When
+
+from properties.models import Property
+from properties.services.cache_versions import bump_version, current_version, query_signature
+
+FACETS = ("city", "property_type", "listing_type", "bedrooms", "price_bucket")
+
+# (upper bound, label); the last bucket is open-ended
+PRICE_BUCKETS = [
+    (Decimal("2500000"), "under_25l"),
+    (Decimal("5000000"), "25l_50l"),
+    (Decimal("10000000"), "50l_1cr"),
+    (Decimal("20000000"), "1cr_2cr"),
+    (Decimal("50000000"), "2cr_5cr"),
+    (None, "over_5cr"),
+]
+
+# query params that do not change which rows match
+IGNORED_PARAMS = {"page", "page_size", "ordering", "format"}
+
+VERSION_KEY = "property_facets:version"
+
+# status / verification changes invalidate at once; other edits age out
+FACETS_CACHE_SECONDS = 600
+
+
+def facets_version():
+    return current_version(VERSION_KEY)
+
+
+def bump_facets_version():
+    bump_version(VERSION_KEY)
+
+
+# =========================================================
+# FACET COUNTS (ONE GROUPING SETS QUERY)
+# =========================================================
+
+def _price_bucket():
+    return Case(
+        *[When(price__lt=bound, then=Value(label)) for bound, label in PRICE_BUCKETS if bound],
+        default=Value(PRICE_BUCKETS[-1][1]),
+        output_field=CharField(),
+    )
+
+
+def facet_counts(queryset):
+    """
+    Counts per city, property_type, listing_type, bedrooms and price
+    bucket over `queryset`, plus the total, in a single scan.
+    """
+    inner, params = (
+        queryset.order_by()
+        .annotate(price_bucket=_price_bucket())
+        .values(*FACETS)
+        .query.sql_with_params()
+    )
+    columns = ", ".join(FACETS)
+    sets = ", ".join(f"({name})" for name in FACETS)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {columns}, GROUPING({columns}), COUNT(*) "
+            f"FROM ({inner}) AS listing "
+            f"GROUP BY GROUPING SETS ({sets}, ())",
+            params,
+        )
+        rows = cursor.fetchall()
+
+    # GROUPING() sets a bit, first column highest, for every column
+    # that is NOT grouped in the row's set
+    full = (1 << len(FACETS)) - 1
+    facet_of = {full ^ (1 << (len(FACETS) - 1 - i)): i for i in range(len(FACETS))}
+
+    total = 0
+    facets = {name: [] for name in FACETS}
+
+    for row in rows:
+        grouping, count = row[-2], row[-1]
+        if grouping == full:
+            total = count
+            continue
+        index = facet_of[grouping]
+        facets[FACETS[index]].append({"value": row[index], "count": count})
+
+    for name in ("city", "property_type", "listing_type"):
+        facets[name].sort(key=lambda f: (-f["count"], str(f["value"])))
+    facets["bedrooms"].sort(key=lambda f: (f["value"] is None, f["value"] or 0))
+
+    order = {label: i for i, (_, label) in enumerate(PRICE_BUCKETS)}
+    facets["price"] = sorted(facets.pop("price_bucket"), key=lambda f: order[f["value"]])
+
+    return {"total": total, "facets": facets}
+
+
+def cached_facet_counts(queryset, query_params):
+    signature = query_signature(query_params, ignored=IGNORED_PARAMS)
+    key = f"property_facets:{facets_version()}:{signature}"
+    result = cache.get(key)
+    if result is None:
+        result = facet_counts(queryset)
+        cache.set(key, result, timeout=FACETS_CACHE_SECONDS)
+    return result
+
+
+def cached_property_stats():
+    key = f"property_stats:{facets_version()}"
+    stats = cache.get(key)
+    if stats is None:
+        stats = Property.objects.aggregate(
+            total_properties=Count("id"),
+            available_properties=Count("id", filter=Q(status="available")),
+            sold_properties=Count("id", filter=Q(status="sold")),
+            property_types=Count("property_type", distinct=True),
+        )
+        cache.set(key, stats, timeout=FACETS_CACHE_SECONDS)
+    return stats
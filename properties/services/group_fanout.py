@@ -0,0 +1,67 @@
+from properties.models import GroupPaymentInvite, OwnerNotification, PlanInvite
+
+
+# =========================================================
+# GROUP PURCHASE FAN-OUT
+# =========================================================
+#
+# Group flows address up to 50 members at once. Every helper here is
+# one INSERT however many users it is given, instead of a create() per
+# member inside the request.
+
+def notify_users(users, *, property, type, title, message):
+    """
+    One OwnerNotification per user. `message` may be a callable taking
+    the user, for per-member text.
+    """
+    notifications = [
+        OwnerNotification(
+            user=user,
+            property=property,
+            type=type,
+            title=title,
+            message=message(user) if callable(message) else message,
+        )
+        for user in users
+    ]
+    return OwnerNotification.objects.bulk_create(notifications)
+
+
+def create_plan_invites(plan, users):
+    return PlanInvite.objects.bulk_create([
+        PlanInvite(plan=plan, invited_user=user, status="invited")
+        for user in users
+    ])
+
+
+def send_group_payment_invites(plan, users, *, sender, amount=None, is_payer=True):
+    """
+    Creates a GroupPaymentInvite and a notification for every user.
+    Returns {user_id: token}. Tokens are generated client-side, so they
+    are known without reading the rows back.
+    """
+    users = list(users)
+    invites = GroupPaymentInvite.objects.bulk_create([
+        GroupPaymentInvite(
+            plan=plan,
+            invited_user=user,
+            amount=amount,
+            is_payer=is_payer,
+        )
+        for user in users
+    ])
+
+    if amount is not None:
+        message = f"{sender.username} invited you to pay ₹{amount} for {plan.property.title}"
+    else:
+        message = f"{sender.username} invited you to join payment for {plan.property.title}"
+
+    notify_users(
+        users,
+        property=plan.property,
+        type="group_payment",
+        title="Group payment request",
+        message=message,
+    )
+
+    return {invite.invited_user_id: invite.token for invite in invites}
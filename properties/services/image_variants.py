@@ -0,0 +1,192 @@
+import atexit
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from properties.models import Property, PropertyImage
+from properties.services.listing_cache import bump_listing_version
+
+logger = logging.getLogger(__name__)
+
+# (name, max width); never upscaled
+VARIANTS = (
+    ("thumb", 320),
+    ("card", 768),
+    ("full", 1600),
+)
+
+# (key, Pillow format, extension, save options)
+FORMATS = (
+    ("webp", "WEBP", "webp", {"quality": 80, "method": 4}),
+    ("jpeg", "JPEG", "jpg", {"quality": 82, "optimize": True, "progressive": True}),
+)
+
+
+# =========================================================
+# RESPONSIVE IMAGE VARIANTS
+# =========================================================
+#
+# Every stored PropertyImage gets thumb / card / full copies in WebP
+# and JPEG. Rendering happens in a small per-process thread pool once
+# the upload's transaction commits (Pillow drops the GIL while
+# decoding, resizing and encoding), so the upload request only pays
+# for storing the original. Until the variants exist, serializers
+# keep returning the original URL alone.
+
+def _flatten(image):
+    """RGB for both encoders; transparency goes onto white."""
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def _encode(image, fmt, options):
+    buffer = BytesIO()
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def render_variants(image_id):
+    """
+    Builds and stores every variant of one PropertyImage, then records
+    them on the row. Safe to re-run; a replaced original is picked up
+    through the recorded source name.
+    """
+    obj = PropertyImage.objects.filter(pk=image_id).only("pk", "property_id", "image", "variants").first()
+    if obj is None or not obj.image:
+        return None
+
+    source = obj.image.name
+    storage = obj.image.storage
+    stem = os.path.splitext(source)[0]
+
+    # earlier renders (also of a replaced original) go first, so names
+    # are reused instead of piling up suffixed copies in storage
+    delete_variant_files(storage, obj.variants)
+
+    with storage.open(source, "rb") as fh:
+        original = Image.open(fh)
+        # JPEG: decode straight at a reduced scale when even the
+        # largest variant is much smaller than the upload
+        original.draft("RGB", (VARIANTS[-1][1], VARIANTS[-1][1]))
+        original = _flatten(ImageOps.exif_transpose(original))
+
+    variants = {"source": source}
+
+    # largest first, each one resized from the previous
+    current = original
+    for name, max_width in reversed(VARIANTS):
+        if current.width > max_width:
+            height = max(1, round(current.height * max_width / current.width))
+            current = current.resize((max_width, height), Image.LANCZOS)
+
+        entry = {"width": current.width, "height": current.height}
+        for key, fmt, ext, options in FORMATS:
+            target = f"{stem}_{name}.{ext}"
+            # left over by a run that never got recorded
+            storage.delete(target)
+            entry[key] = storage.save(target, ContentFile(_encode(current, fmt, options)))
+        variants[name] = entry
+
+    # queryset update: no post_save, so no re-scheduling from the signal
+    updated = PropertyImage.objects.filter(pk=image_id, image=source).update(variants=variants)
+    if updated:
+        Property.objects.filter(pk=obj.property_id).update(updated_at=timezone.now())
+        bump_listing_version()
+    return variants
+
+
+def variant_files(variants):
+    """Storage names recorded in a PropertyImage.variants value."""
+    files = []
+    for name, _ in VARIANTS:
+        entry = (variants or {}).get(name)
+        if isinstance(entry, dict):
+            files += [entry[key] for key, *_ in FORMATS if entry.get(key)]
+    return files
+
+
+def delete_variant_files(storage, variants):
+    for name in variant_files(variants):
+        try:
+            storage.delete(name)
+        except Exception:
+            logger.warning("Could not delete image variant %s", name, exc_info=True)
+
+
+def _render_in_worker(image_id):
+    try:
+        render_variants(image_id)
+    except Exception:
+        logger.exception("Image variants failed for PropertyImage %s", image_id)
+    finally:
+        close_old_connections()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_VARIANT_WORKERS,
+                thread_name_prefix="image-variants",
+            )
+            atexit.register(_executor.shutdown, wait=True)
+        return _executor
+
+
+def schedule_variants(image_id):
+    """Renders variants in the pool once the current transaction commits."""
+    transaction.on_commit(lambda: get_executor().submit(_render_in_worker, image_id))
+
+
+def needs_variants(obj):
+    return bool(obj.image) and obj.variants.get("source") != obj.image.name
+
+
+# =========================================================
+# URLS FOR SERIALIZERS
+# =========================================================
+
+def variant_urls(obj, build_url):
+    """
+    {"thumb": {"width", "height", "webp", "jpeg"}, "card": ..., "full": ...,
+     "srcset": {"webp": "... 320w, ... 768w", "jpeg": ...}} with URLs made
+    by `build_url(storage_url)`, or None while the variants are pending.
+    """
+    if not obj.image or obj.variants.get("source") != obj.image.name:
+        return None
+
+    storage = obj.image.storage
+    urls = {}
+    srcset = {key: [] for key, *_ in FORMATS}
+
+    for name, _ in VARIANTS:
+        entry = obj.variants.get(name)
+        if not entry:
+            return None
+        urls[name] = {"width": entry["width"], "height": entry["height"]}
+        for key, *_ in FORMATS:
+            url = build_url(storage.url(entry[key]))
+            urls[name][key] = url
+            # small originals repeat a width; keep the first only
+            if not srcset[key] or not srcset[key][-1].endswith(f" {entry['width']}w"):
+                srcset[key].append(f"{url} {entry['width']}w")
+
+    urls["srcset"] = {key: ", ".join(parts) for key, parts in srcset.items()}
+    return urls
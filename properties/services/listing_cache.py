@@ -0,0 +1,79 @@
+import time
+
+from django.core.cache import cache
+
+from properties.services.cache_versions import bump_version, current_version, query_signature
+
+VERSION_KEY = "property_listing:version"
+
+# served as-is for this long after it was built, if nothing changed
+FRESH_SECONDS = 30
+
+# past fresh (or outdated by a change), still served while one request
+# rebuilds it; after this it is dropped and callers rebuild inline
+STALE_SECONDS = 300
+
+# a rebuild that crashed frees the slot after this
+REFRESH_LOCK_SECONDS = 30
+
+
+# =========================================================
+# ANONYMOUS LISTING RESPONSE CACHE (STALE-WHILE-REVALIDATE)
+# =========================================================
+#
+# One entry per normalized query string (filters, ordering, page),
+# stamped with the listing version at build time. Any Property,
+# PropertyImage or PropertyVideo change bumps the version (see
+# properties.signals), which makes every entry stale at once. A stale
+# entry is rebuilt by exactly one request (cache.add lock); the rest
+# keep getting the stale copy instead of piling onto the database.
+#
+# Both the version and the lock live in the default cache, so they hold
+# across workers only when it is shared (REDIS_URL). On the LocMem
+# fallback each process has its own entries, version and lock: a change
+# is seen at once by the process that made it, and by the others within
+# FRESH_SECONDS, and each process rebuilds a stale entry once.
+
+def listing_version():
+    return current_version(VERSION_KEY)
+
+
+def bump_listing_version():
+    bump_version(VERSION_KEY)
+
+
+def listing_cache_key(request):
+    signature = query_signature(request.query_params)
+    return f"property_listing:{request.get_host()}:{request.path}:{signature}"
+
+
+def cached_listing(request, build):
+    """
+    Returns (data, state), state being "hit", "stale" or "miss".
+    `build()` produces the response data.
+    """
+    key = listing_cache_key(request)
+    version = listing_version()
+    entry = cache.get(key)
+    now = time.time()
+
+    if entry is None:
+        data = build()
+        cache.set(key, {"version": version, "at": now, "data": data}, timeout=STALE_SECONDS)
+        return data, "miss"
+
+    if entry["version"] == version and now - entry["at"] < FRESH_SECONDS:
+        return entry["data"], "hit"
+
+    # someone else is rebuilding — the stale copy will do
+    lock = f"{key}:refresh"
+    if not cache.add(lock, 1, timeout=REFRESH_LOCK_SECONDS):
+        return entry["data"], "stale"
+
+    try:
+        data = build()
+        cache.set(key, {"version": version, "at": now, "data": data}, timeout=STALE_SECONDS)
+    finally:
+        cache.delete(lock)
+
+    return data, "miss"
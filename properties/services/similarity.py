@@ -0,0 +1,254 @@
+import math
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+
+from properties.geo import EARTH_RADIUS_KM
+from properties.models import Property, SimilarProperty
+
+TOP_K = 12
+
+# float64 distances held per batch (~128 MB): a batch is as many query
+# rows as fit, so memory stays flat however large the catalogue grows
+BATCH_ELEMENTS = 16 * 1024 * 1024
+
+AMENITIES = (
+    "furnished",
+    "ac_available",
+    "balcony",
+    "gym",
+    "swimming_pool",
+    "garden",
+    "security",
+    "lift_available",
+    "power_backup",
+)
+
+PROPERTY_TYPES = [value for value, _ in Property.PROPERTY_TYPES]
+
+# Fixed scales, so a vector depends on its own row only and stored
+# distances stay comparable between incremental runs. One unit of
+# distance is about: 2x the price, 2x the area, 1.5 rooms, ...
+LOG_PRICE_SCALE = math.log(2)
+LOG_AREA_SCALE = math.log(2)
+ROOM_SCALE = 1.5
+TYPE_WEIGHT = 1.0
+AMENITY_WEIGHT = 0.35
+# ... or GEO_SCALE_KM apart
+GEO_SCALE_KM = 25.0
+
+FEATURE_FIELDS = (
+    "pk",
+    "price",
+    "area_sqft",
+    "bedrooms",
+    "bathrooms",
+    "property_type",
+    "city",
+    "latitude",
+    "longitude",
+    *AMENITIES,
+)
+
+
+# =========================================================
+# SIMILAR PROPERTIES (OFFLINE TOP-K)
+# =========================================================
+#
+# Every listed property becomes one vector:
+#   price, area (log), bedrooms, bathrooms  divided by the scales above
+#   property_type                           one-hot
+#   amenities                               0 / 1
+#   latitude / longitude                    point on a sphere scaled so
+#                                           GEO_SCALE_KM of chord = 1
+# Neighbours are nearest by Euclidean distance, found a batch of rows
+# at a time with one matrix product per batch, and stored in
+# SimilarProperty. The API only reads that table.
+
+def catalogue():
+    return Property.objects.filter(status="available", is_verified=True)
+
+
+def encode(rows):
+    """Feature matrix for FEATURE_FIELDS rows, one row per property."""
+    n = len(rows)
+    columns = dict(zip(FEATURE_FIELDS, zip(*rows))) if rows else {}
+
+    numeric = np.column_stack([
+        np.log1p(np.array(columns["price"], dtype=np.float64)) / LOG_PRICE_SCALE,
+        np.log1p(np.array(columns["area_sqft"], dtype=np.float64)) / LOG_AREA_SCALE,
+        np.array(columns["bedrooms"], dtype=np.float64) / ROOM_SCALE,
+        np.array(columns["bathrooms"], dtype=np.float64) / ROOM_SCALE,
+    ])
+
+    types = np.zeros((n, len(PROPERTY_TYPES)))
+    for i, value in enumerate(columns["property_type"]):
+        if value in PROPERTY_TYPES:
+            types[i, PROPERTY_TYPES.index(value)] = TYPE_WEIGHT
+
+    amenities = np.column_stack([
+        np.array(columns[name], dtype=np.float64) for name in AMENITIES
+    ]) * AMENITY_WEIGHT
+
+    return np.hstack([numeric, types, amenities, _geo(columns)])
+
+
+def _geo(columns):
+    """
+    Unit-sphere points scaled by EARTH_RADIUS_KM / GEO_SCALE_KM. Rows
+    without coordinates take their city's mean point (else the
+    catalogue's), so missing coordinates neither attract nor repel.
+    """
+    lat = np.array([math.nan if v is None else float(v) for v in columns["latitude"]])
+    lng = np.array([math.nan if v is None else float(v) for v in columns["longitude"]])
+    lat, lng = np.radians(lat), np.radians(lng)
+    points = np.column_stack([np.cos(lat) * np.cos(lng), np.cos(lat) * np.sin(lng), np.sin(lat)])
+
+    missing = np.isnan(points).any(axis=1)
+    if missing.any():
+        located = ~missing
+        fallback = points[located].mean(axis=0) if located.any() else np.zeros(3)
+        cities = np.array([(c or "").strip().lower() for c in columns["city"]])
+        for city in set(cities[missing]):
+            same = located & (cities == city)
+            points[missing & (cities == city)] = points[same].mean(axis=0) if same.any() else fallback
+
+    return points * (EARTH_RADIUS_KM / GEO_SCALE_KM)
+
+
+def batch_rows(catalogue_size, batch_size=None):
+    """Query rows per batch: `batch_size` if given, else BATCH_ELEMENTS' worth."""
+    return batch_size or max(1, BATCH_ELEMENTS // max(1, catalogue_size))
+
+
+def _squared_distances(features, norms, rows):
+    # one batch x catalogue matrix, updated in place
+    d2 = features[rows] @ features.T
+    d2 *= -2
+    d2 += norms[rows, None]
+    d2 += norms[None, :]
+    return np.maximum(d2, 0, out=d2)
+
+
+def nearest(features, rows, k=TOP_K, batch_size=None):
+    """Yields (rows, neighbours, distances) per batch; self excluded."""
+    norms = np.einsum("ij,ij->i", features, features)
+    k = min(k, len(features) - 1)
+    batch_size = batch_rows(len(features), batch_size)
+
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        if k <= 0:
+            yield batch, np.empty((len(batch), 0), int), np.empty((len(batch), 0))
+            continue
+
+        d2 = _squared_distances(features, norms, batch)
+        d2[np.arange(len(batch)), batch] = np.inf
+
+        candidates = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        order = np.take_along_axis(d2, candidates, axis=1).argsort(axis=1)
+        neighbours = np.take_along_axis(candidates, order, axis=1)
+        yield batch, neighbours, np.sqrt(np.take_along_axis(d2, neighbours, axis=1))
+
+
+def _closest_to(features, rows, batch_size=None):
+    """Per catalogue row, the distance to the nearest of `rows` (not itself)."""
+    norms = np.einsum("ij,ij->i", features, features)
+    batch_size = batch_rows(len(features), batch_size)
+    best = np.full(len(features), np.inf)
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        d2 = _squared_distances(features, norms, batch)
+        d2[np.arange(len(batch)), batch] = np.inf
+        best = np.minimum(best, np.sqrt(d2.min(axis=0)))
+    return best
+
+
+def _store(ids, batch, neighbours, distances, computed_at):
+    owners = [ids[i] for i in batch]
+    entries = [
+        SimilarProperty(
+            property_id=ids[i],
+            similar_id=ids[j],
+            rank=rank,
+            distance=float(distance),
+            computed_at=computed_at,
+        )
+        for i, row_neighbours, row_distances in zip(batch, neighbours, distances)
+        for rank, (j, distance) in enumerate(zip(row_neighbours, row_distances), start=1)
+    ]
+    with transaction.atomic():
+        SimilarProperty.objects.filter(property_id__in=owners).delete()
+        SimilarProperty.objects.bulk_create(entries)
+
+
+# =========================================================
+# REFRESH (FULL / INCREMENTAL)
+# =========================================================
+
+def refresh_similar_properties(*, full=False, k=TOP_K, batch_size=None):
+    """
+    Recomputes neighbour lists. Incremental runs only redo rows whose
+    list can have changed:
+      - listings edited since their list was computed, or new
+      - lists pointing at an edited or de-listed property
+      - lists an edited listing now beats the current K-th entry of
+    Listings without coordinates borrow their city's mean point, which
+    moves as that city changes; run with full=True now and then.
+    Returns (rows recomputed, catalogue size).
+    """
+    computed_at = timezone.now()
+
+    rows = list(
+        catalogue()
+        .annotate(
+            last_computed=Min("similar_entries__computed_at"),
+            kth_distance=Max("similar_entries__distance"),
+            neighbour_count=Max("similar_entries__rank"),
+        )
+        .order_by("pk")
+        .values_list(*FEATURE_FIELDS, "updated_at", "last_computed", "kth_distance", "neighbour_count")
+    )
+
+    # de-listed properties lose their own rail
+    SimilarProperty.objects.exclude(property__status="available", property__is_verified=True).delete()
+
+    if not rows:
+        return 0, 0
+
+    ids = [row[0] for row in rows]
+    features = encode([row[:len(FEATURE_FIELDS)] for row in rows])
+    # distances do not move, but |a|^2 + |b|^2 - 2ab stays precise for
+    # close pairs (the geo columns alone are ~250 away from the origin)
+    features -= features.mean(axis=0)
+    expected = min(k, len(rows) - 1)
+
+    if full:
+        dirty = np.arange(len(rows))
+    else:
+        position = {pk: i for i, pk in enumerate(ids)}
+        changed = [
+            i for i, (*_, updated_at, last_computed, _kth, count) in enumerate(rows)
+            if last_computed is None or updated_at > last_computed or (count or 0) < expected
+        ]
+
+        stale = SimilarProperty.objects.filter(
+            Q(similar_id__in=[ids[i] for i in changed])
+            | ~Q(similar__status="available")
+            | Q(similar__is_verified=False)
+        ).values_list("property_id", flat=True).distinct()
+        dirty = set(changed) | {position[pk] for pk in stale if pk in position}
+
+        if changed:
+            kth = np.array([np.inf if row[-2] is None else row[-2] for row in rows])
+            closer = _closest_to(features, np.array(changed), batch_size) < kth
+            dirty |= set(np.flatnonzero(closer).tolist())
+
+        dirty = np.array(sorted(dirty), dtype=int)
+
+    for batch, neighbours, distances in nearest(features, dirty, k, batch_size):
+        _store(ids, batch, neighbours, distances, computed_at)
+
+    return len(dirty), len(rows)
@@ -0,0 +1,190 @@
+import base64
+import binascii
+import json
+import logging
+import re
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Case, FloatField, IntegerField, Q, Value, When
+from django.db.models.functions import Cast, Greatest
+
+logger = logging.getLogger(__name__)
+
+SEARCH_FIELDS = ("username", "first_name", "last_name", "email")
+
+# hard cap on search results, whatever the client asks for
+USER_SEARCH_LIMIT = 20
+
+MIN_QUERY_LENGTH = 2
+MAX_QUERY_LENGTH = 64
+
+INDEX_NAME = "auth_user_search_trgm"
+
+_trigram_available = {}
+
+
+# =========================================================
+# TRIGRAM INDEX (auth_user is not ours, so no model Meta)
+# =========================================================
+#
+# Migrations are generated per environment here, so the index cannot
+# ship as one; migrate builds it from post_migrate instead. Outside
+# development (USER_SEARCH_REQUIRE_TRIGRAM) a missing pg_trgm fails the
+# migrate run rather than silently leaving search unindexed.
+
+def ensure_user_search_index(sender=None, using="default", **kwargs):
+    """
+    post_migrate hook: pg_trgm plus one multi-column GIN index over the
+    searched auth_user columns, built CONCURRENTLY so a live auth_user
+    stays writable. Idempotent; an index left INVALID by an interrupted
+    build is dropped and rebuilt.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+
+    table = User._meta.db_table
+    columns = ", ".join(f"{name} gin_trgm_ops" for name in SEARCH_FIELDS)
+    # CONCURRENTLY is refused inside a transaction block; there, a
+    # savepoint keeps a failure from breaking the outer transaction
+    nested = connection.in_atomic_block
+    concurrently = "" if nested else "CONCURRENTLY "
+    block = transaction.atomic(using=using) if nested else nullcontext()
+
+    try:
+        with block, connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(
+                "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)",
+                [INDEX_NAME],
+            )
+            row = cursor.fetchone()
+            if row and not row[0]:
+                cursor.execute(f"DROP INDEX {concurrently}IF EXISTS {INDEX_NAME}")
+            cursor.execute(
+                f"CREATE INDEX {concurrently}IF NOT EXISTS {INDEX_NAME} "
+                f"ON {table} USING gin ({columns})"
+            )
+    except DatabaseError as exc:
+        if settings.USER_SEARCH_REQUIRE_TRIGRAM:
+            raise ImproperlyConfigured(
+                f"User search index {INDEX_NAME} could not be created; install "
+                f"pg_trgm on the database server (or set "
+                f"USER_SEARCH_REQUIRE_TRIGRAM=False): {exc}"
+            ) from exc
+        logger.warning("User search index not created (pg_trgm unavailable?): %s", exc)
+
+    _trigram_available.pop(using, None)
+
+
+def trigram_available(using="default"):
+    if using not in _trigram_available:
+        with connections[using].cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_available[using] = cursor.fetchone() is not None
+    return _trigram_available[using]
+
+
+# =========================================================
+# RANKED SEARCH: PREFIX FIRST, THEN FUZZY
+# =========================================================
+
+def search_users(query, *, exclude_ids=(), after=None, limit=USER_SEARCH_LIMIT):
+    """
+    Active users matching `query`, best first:
+      0  username starts with it
+      1  first / last name or email starts with it
+      2  fuzzy (trigram word similarity) match on any of them
+    Every condition is one the trigram GIN index serves: anchored
+    case-insensitive regexes and the %> operator.
+
+    Pages are keyset: `after` is the search_position() of the last row
+    already returned, never an offset.
+    """
+    q = (query or "").strip()[:MAX_QUERY_LENGTH]
+    if len(q) < MIN_QUERY_LENGTH:
+        return User.objects.none()
+
+    prefix = "^" + re.escape(q)
+    starts = {name: Q(**{f"{name}__iregex": prefix}) for name in SEARCH_FIELDS}
+    any_prefix = starts["username"] | starts["first_name"] | starts["last_name"] | starts["email"]
+
+    match_rank = Case(
+        When(starts["username"], then=Value(0)),
+        When(any_prefix, then=Value(1)),
+        default=Value(2),
+        output_field=IntegerField(),
+    )
+
+    users = User.objects.filter(is_active=True).exclude(id__in=exclude_ids)
+
+    if trigram_available():
+        fuzzy = Q()
+        for name in SEARCH_FIELDS:
+            fuzzy |= Q(**{f"{name}__trigram_word_similar": q})
+
+        users = users.filter(any_prefix | fuzzy).annotate(
+            match_rank=match_rank,
+            # float8: a real comes back as its shortest decimal, which no
+            # longer compares equal to the stored value in the cursor
+            similarity=Cast(
+                Greatest(*[TrigramWordSimilarity(q, name) for name in SEARCH_FIELDS]),
+                FloatField(),
+            ),
+        ).order_by("match_rank", "-similarity", "username")
+    else:
+        users = users.filter(any_prefix).annotate(
+            match_rank=match_rank,
+        ).order_by("match_rank", "username")
+
+    if after is not None:
+        users = users.filter(_after(after))
+
+    return users.only("id", "username")[:min(limit, USER_SEARCH_LIMIT)]
+
+
+# =========================================================
+# KEYSET CURSOR ON (match_rank, similarity, username)
+# =========================================================
+
+def _after(position):
+    rank, similarity, username = position
+    later = Q(match_rank__gt=rank)
+    if similarity is None:
+        return later | Q(match_rank=rank, username__gt=username)
+    return (
+        later
+        | Q(match_rank=rank, similarity__lt=similarity)
+        | Q(match_rank=rank, similarity=similarity, username__gt=username)
+    )
+
+
+def search_position(user):
+    return [user.match_rank, getattr(user, "similarity", None), user.username]
+
+
+def encode_cursor(position):
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Position from encode_cursor(); ValueError when it is not one.
+    """
+    try:
+        rank, similarity, username = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+    if (
+        not isinstance(rank, int)
+        or not isinstance(username, str)
+        or not (similarity is None or isinstance(similarity, (int, float)))
+    ):
+        raise ValueError("Invalid cursor")
+    return [rank, similarity, username]
@@ -0,0 +1,231 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from properties.models import Property
+
+try:
+    import redis
+except ImportError:  # optional: the in-process buffer is used instead
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# ids per UPDATE when flushing
+FLUSH_CHUNK_SIZE = 1000
+
+# dedup entries kept in-process; past this the oldest are dropped
+# first (such a viewer may be counted again), so memory stays bounded
+LOCAL_SEEN_LIMIT = 100_000
+
+VIEWS_KEY = "property_views"
+FLUSHING_KEY = "property_views:flushing"
+FLUSH_LOCK_KEY = "property_views:flush_lock"
+SEEN_KEY = "property_views:seen:{property_id}:{viewer}"
+
+
+# =========================================================
+# BUFFERED VIEW COUNTER
+# =========================================================
+#
+# A detail GET records a hit in a buffer instead of writing the
+# property row. Hits are folded into Property.views_count by
+# flush_view_counts(): one UPDATE per FLUSH_CHUNK_SIZE properties,
+# each row moved relative to its stored value.
+#
+# With REDIS_URL set every worker shares one Redis hash, drained by
+# the flush_property_views command (cron). Without it each process
+# keeps its own counter and flushes it itself.
+
+class RedisViewBuffer:
+    shared = True
+
+    # SET NX marks the viewer as seen for the window; only then count
+    HIT_SCRIPT = """
+    if tonumber(ARGV[2]) > 0 then
+        if not redis.call('SET', KEYS[2], 1, 'NX', 'EX', ARGV[2]) then
+            return 0
+        end
+    end
+    redis.call('HINCRBY', KEYS[1], ARGV[1], 1)
+    return 1
+    """
+
+    def __init__(self, url):
+        self.client = redis.Redis.from_url(url)
+        self.hit_script = self.client.register_script(self.HIT_SCRIPT)
+
+    def hit(self, property_id, viewer, window):
+        key = SEEN_KEY.format(property_id=property_id, viewer=viewer)
+        return bool(self.hit_script(keys=[VIEWS_KEY, key], args=[str(property_id), window]))
+
+    def drain(self, apply):
+        """
+        Moves the live hash aside and applies it. A batch that failed
+        to apply is still under FLUSHING_KEY and is retried first, so
+        hits are never lost or counted twice.
+        """
+        if not self.client.set(FLUSH_LOCK_KEY, 1, nx=True, ex=300):
+            return 0
+
+        try:
+            if not self.client.exists(FLUSHING_KEY):
+                try:
+                    self.client.renamenx(VIEWS_KEY, FLUSHING_KEY)
+                except redis.ResponseError:  # no hits since the last flush
+                    return 0
+
+            counts = {
+                key.decode(): int(value)
+                for key, value in self.client.hgetall(FLUSHING_KEY).items()
+            }
+            flushed = apply(counts)
+            self.client.delete(FLUSHING_KEY)
+            return flushed
+        finally:
+            self.client.delete(FLUSH_LOCK_KEY)
+
+
+class LocalViewBuffer:
+    """
+    In-process stand-in for RedisViewBuffer (dev, tests, single worker).
+    """
+    shared = False
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        self.seen = {}
+        self.last_flush = time.monotonic()
+
+    def hit(self, property_id, viewer, window):
+        now = time.monotonic()
+        key = (str(property_id), viewer)
+
+        with self.lock:
+            if window > 0:
+                if self.seen.get(key, 0) > now:
+                    return False
+                if len(self.seen) >= LOCAL_SEEN_LIMIT:
+                    self._prune_seen(now)
+                # re-insert, so dict order stays oldest-first
+                self.seen.pop(key, None)
+                self.seen[key] = now + window
+            self.counts[str(property_id)] += 1
+            return True
+
+    def _prune_seen(self, now):
+        self.seen = {key: until for key, until in self.seen.items() if until > now}
+        excess = len(self.seen) - LOCAL_SEEN_LIMIT * 9 // 10
+        if excess > 0:
+            for key in list(self.seen)[:excess]:
+                del self.seen[key]
+
+    def due(self, interval):
+        return time.monotonic() - self.last_flush >= interval
+
+    def drain(self, apply):
+        with self.lock:
+            counts, self.counts = self.counts, Counter()
+            self.last_flush = now = time.monotonic()
+            self.seen = {key: until for key, until in self.seen.items() if until > now}
+
+        try:
+            return apply(counts)
+        except Exception:
+            # put the batch back so the next flush retries it
+            with self.lock:
+                self.counts.update(counts)
+            raise
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_view_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                if redis is not None and settings.REDIS_URL:
+                    _buffer = RedisViewBuffer(settings.REDIS_URL)
+                else:
+                    _buffer = LocalViewBuffer()
+                    atexit.register(_flush_at_exit)
+    return _buffer
+
+
+def viewer_key(request):
+    """
+    Dedup identity: the user when logged in, else the client IP.
+    """
+    if request.user.is_authenticated:
+        return f"u{request.user.id}"
+
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR")
+    if forwarded:
+        return f"ip{forwarded.split(',')[0].strip()}"
+    return f"ip{request.META.get('REMOTE_ADDR', '')}"
+
+
+def record_view(property_obj, request):
+    """
+    Buffers one view. Returns False when the viewer was already
+    counted within PROPERTY_VIEW_DEDUP_SECONDS.
+    """
+    buffer = get_view_buffer()
+    counted = buffer.hit(
+        property_obj.pk,
+        viewer_key(request),
+        settings.PROPERTY_VIEW_DEDUP_SECONDS,
+    )
+
+    if not buffer.shared and buffer.due(settings.PROPERTY_VIEW_FLUSH_SECONDS):
+        flush_view_counts()
+
+    return counted
+
+
+def _apply_counts(counts):
+    counts = {pk: n for pk, n in counts.items() if n}
+    ids = list(counts)
+
+    with transaction.atomic():
+        for start in range(0, len(ids), FLUSH_CHUNK_SIZE):
+            chunk = ids[start:start + FLUSH_CHUNK_SIZE]
+            Property.objects.filter(pk__in=chunk).update(
+                views_count=F("views_count") + Case(
+                    *[When(pk=pk, then=Value(counts[pk])) for pk in chunk],
+                    output_field=IntegerField(),
+                )
+            )
+
+    return sum(counts.values())
+
+
+def flush_view_counts():
+    """
+    Folds buffered hits into views_count. Returns the number of views written.
+    """
+    return get_view_buffer().drain(_apply_counts)
+
+
+def _flush_at_exit():
+    """
+    Last flush of the in-process buffer. The database may already be
+    gone at interpreter exit (test databases are dropped first), so a
+    failure is logged and the hits are dropped rather than raised.
+    """
+    if not _buffer or not _buffer.counts:
+        return
+    try:
+        flush_view_counts()
+    except Exception:
+        logger.warning("Dropped %s buffered property views at exit", sum(_buffer.counts.values()), exc_info=True)
@@ -0,0 +1,61 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Property, PropertyImage, PropertyVideo
+from .services.facets import bump_facets_version
+from .services.image_variants import delete_variant_files, needs_variants, schedule_variants
+from .services.listing_cache import bump_listing_version
+
+# fields that decide whether a property is listed at all
+LISTING_STATE_FIELDS = {"status", "is_verified"}
+
+
+@receiver(post_save, sender=Property)
+def invalidate_facets_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields is None or LISTING_STATE_FIELDS & set(update_fields):
+        bump_facets_version()
+
+
+@receiver(post_delete, sender=Property)
+def invalidate_facets_on_delete(sender, instance, **kwargs):
+    bump_facets_version()
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_delete, sender=PropertyImage)
+@receiver(post_save, sender=PropertyVideo)
+@receiver(post_delete, sender=PropertyVideo)
+def invalidate_listing_cache(sender, **kwargs):
+    bump_listing_version()
+
+
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_delete, sender=PropertyImage)
+@receiver(post_save, sender=PropertyVideo)
+@receiver(post_delete, sender=PropertyVideo)
+def touch_property(sender, instance, **kwargs):
+    # media is part of the detail payload, so it moves the property's
+    # detail ETag; queryset update, no Property signals
+    Property.objects.filter(pk=instance.property_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=PropertyImage)
+def render_image_variants(sender, instance, **kwargs):
+    # new upload or replaced file; every upload path ends up here
+    if needs_variants(instance):
+        schedule_variants(instance.pk)
+
+
+@receiver(post_delete, sender=PropertyImage)
+def delete_image_variants(sender, instance, **kwargs):
+    # only once the delete is committed: a rollback keeps the row, and
+    # its variants must still be there
+    if instance.variants:
+        storage = instance.image.storage
+        variants = instance.variants
+        transaction.on_commit(lambda: delete_variant_files(storage, variants))
+
@@ -1,3 +1,496 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+import time
+from decimal import Decimal
+from io import BytesIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils.http import http_date
+from PIL import Image
+from rest_framework.test import APIClient
+
+from .models import (
+    GroupPaymentInvite,
+    PlanInvite,
+    Property,
+    PropertyFavorite,
+    PropertyImage,
+    PropertyVideo,
+    PurchasePlan,
+)
+from .services.image_variants import FORMATS, VARIANTS, render_variants
+from .services.similarity import refresh_similar_properties
+from .services.user_search import trigram_available
+from .services.view_counter import LocalViewBuffer
+
+
+def make_property(owner, **overrides):
+    """A listed (available, verified) property; keyword arguments override fields."""
+    fields = {
+        "title": "Flat",
+        "description": "Test flat",
+        "property_type": "apartment",
+        "status": "available",
+        "location": "Sector 1",
+        "address": "Street 1",
+        "city": "Pune",
+        "state": "MH",
+        "pincode": "411001",
+        "price": Decimal("1000000.00"),
+        "area_sqft": 900,
+        "bedrooms": 2,
+        "bathrooms": 2,
+        "contact_name": "Owner",
+        "contact_phone": "9999999999",
+        "contact_email": "owner@example.com",
+        "is_verified": True,
+    }
+    fields.update(overrides)
+    return Property.objects.create(owner=owner, **fields)
+
+
+# =========================================================
+# LISTING QUERY COUNTS (N+1 REGRESSION)
+# =========================================================
+#
+# count + page + images + videos, however many rows are on the page.
+
+LISTING_QUERIES = 4
+
+
+class PropertyListingQueryCountTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username="owner", password="x")
+        cls.viewer = User.objects.create_user(username="viewer", password="x")
+
+    def setUp(self):
+        # anonymous listing pages are response-cached
+        cache.clear()
+        self.client = APIClient()
+
+    def make_properties(self, count):
+        for i in range(count):
+            prop = make_property(self.owner, title=f"Flat {i}")
+            PropertyImage.objects.create(property=prop, image=f"properties/{i}_a.jpg", is_primary=True)
+            PropertyImage.objects.create(property=prop, image=f"properties/{i}_b.jpg")
+            PropertyImage.objects.create(property=prop, image=f"properties/{i}_c.jpg")
+            PropertyVideo.objects.create(property=prop, video=f"properties/videos/{i}.mp4")
+            PropertyFavorite.objects.create(property=prop, user=self.viewer)
+
+    def assert_constant_queries(self, url, user=None):
+        if user:
+            self.client.force_authenticate(user)
+
+        self.make_properties(1)
+        with self.assertNumQueries(LISTING_QUERIES):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        self.make_properties(9)
+        with self.assertNumQueries(LISTING_QUERIES):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 10)
+        return response.json()["results"]
+
+    def test_property_list(self):
+        results = self.assert_constant_queries("/api/properties/")
+
+        row = results[0]
+        self.assertTrue(row["main_image"].endswith("_a.jpg"))
+        self.assertEqual(len(row["other_images"]), 2)
+        self.assertTrue(row["video"].endswith(".mp4"))
+
+    def test_my_properties(self):
+        self.assert_constant_queries("/api/properties/my-properties/", self.owner)
+
+    def test_favorites(self):
+        results = self.assert_constant_queries("/api/properties/favorites/", self.viewer)
+
+        self.assertTrue(results[0]["property"]["main_image"].endswith("_a.jpg"))
+
+
+# =========================================================
+# RESUMABLE VIDEO UPLOADS (LOCAL STAGING BACKEND)
+# =========================================================
+
+class ResumableVideoUploadTests(TestCase):
+
+    CHUNK = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username="owner", password="x")
+        cls.prop = make_property(cls.owner, status="draft", is_verified=False)
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        staging = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, staging, ignore_errors=True)
+
+        overrides = override_settings(
+            STORAGES={
+                "default": {
+                    "BACKEND": "django.core.files.storage.FileSystemStorage",
+                    "OPTIONS": {"location": media},
+                },
+                "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+            },
+            VIDEO_UPLOAD_CHUNK_SIZE=self.CHUNK,
+            VIDEO_UPLOAD_STAGING_DIR=staging,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def start(self, payload):
+        response = self.client.post(
+            f"/api/properties/{self.prop.id}/videos/uploads/",
+            {"filename": "tour.mp4", "size": len(payload), "content_type": "video/mp4"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def put(self, upload_id, offset, data):
+        return self.client.generic(
+            "PUT",
+            f"/api/properties/video-uploads/{upload_id}/?offset={offset}",
+            data,
+            content_type="application/octet-stream",
+        )
+
+    def test_out_of_order_and_retried_chunks_assemble(self):
+        payload = b"0123456789"
+        upload = self.start(payload)
+        self.assertEqual(upload["part_count"], 3)
+
+        self.assertEqual(self.put(upload["id"], 8, payload[8:]).status_code, 200)
+        self.assertEqual(self.put(upload["id"], 0, b"xxxx").status_code, 200)
+        # retry replaces the part
+        response = self.put(upload["id"], 0, payload[0:4])
+        self.assertEqual(response.json()["missing_parts"], [2])
+
+        response = self.client.post(f"/api/properties/video-uploads/{upload['id']}/complete/")
+        self.assertEqual(response.status_code, 400)
+
+        self.put(upload["id"], 4, payload[4:8])
+        response = self.client.post(f"/api/properties/video-uploads/{upload['id']}/complete/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "complete")
+
+        video = PropertyVideo.objects.get(property=self.prop)
+        with video.video.open("rb") as fh:
+            self.assertEqual(fh.read(), payload)
+
+    def test_rejects_misaligned_or_wrong_sized_chunks(self):
+        upload = self.start(b"0123456789")
+
+        self.assertEqual(self.put(upload["id"], 2, b"2345").status_code, 400)
+        self.assertEqual(self.put(upload["id"], 0, b"012").status_code, 400)
+        self.assertEqual(self.put(upload["id"], 12, b"01").status_code, 400)
+
+
+# =========================================================
+# PROPERTY DETAIL: ONE ANNOTATED ROW + CONDITIONAL GET
+# =========================================================
+#
+# row (owner, favorited, inquiry count, request status) + images + videos
+
+DETAIL_QUERIES = 3
+
+
+class PropertyDetailConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username="owner", password="x")
+        cls.viewer = User.objects.create_user(username="viewer", password="x")
+        cls.prop = make_property(cls.owner, is_verified=False)
+        for i in range(3):
+            PropertyImage.objects.create(property=cls.prop, image=f"properties/{i}.jpg", is_primary=not i)
+        PropertyVideo.objects.create(property=cls.prop, video="properties/videos/tour.mp4")
+        PropertyFavorite.objects.create(property=cls.prop, user=cls.viewer)
+
+    def setUp(self):
+        self.client = APIClient()
+        # owner views are not counted, so no view-buffer flush mid-test
+        self.client.force_authenticate(self.owner)
+        self.url = f"/api/properties/{self.prop.id}/"
+
+    def test_detail_queries(self):
+        with self.assertNumQueries(DETAIL_QUERIES):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data["images"]), 3)
+        self.assertTrue(data["video"].endswith("tour.mp4"))
+        self.assertEqual(data["owner"]["username"], "owner")
+        self.assertFalse(data["is_favorited"])
+        self.assertEqual(data["inquiry_count"], 0)
+
+    def test_repeat_visit_is_not_modified(self):
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+        self.assertFalse(response.has_header("Last-Modified"))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # per-viewer fields are part of the ETag
+        self.client.force_authenticate(self.viewer)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["is_favorited"])
+
+    def test_if_modified_since_alone_is_not_trusted(self):
+        # the viewer's own fields change without updated_at moving
+        self.client.force_authenticate(self.viewer)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 3600))
+        self.assertEqual(response.status_code, 200)
+
+    def test_media_change_invalidates(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        PropertyVideo.objects.all().delete()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("video", response.json())
+
+
+# =========================================================
+# SIMILAR PROPERTIES (PRECOMPUTED TOP-K)
+# =========================================================
+
+class SimilarPropertiesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username="owner", password="x")
+
+    def make(self, title, price, bedrooms, property_type="apartment", lat="18.52", lng="73.85"):
+        return make_property(
+            self.owner,
+            title=title,
+            property_type=property_type,
+            price=Decimal(price),
+            bedrooms=bedrooms,
+            latitude=Decimal(lat),
+            longitude=Decimal(lng),
+        )
+
+    def similar_titles(self, prop):
+        response = APIClient().get(f"/api/properties/{prop.id}/similar/")
+        self.assertEqual(response.status_code, 200)
+        return [row["title"] for row in response.json()]
+
+    def test_nearest_first_and_incremental_refresh(self):
+        base = self.make("base", "5000000", 2)
+        twin = self.make("twin", "5200000", 2)
+        self.make("bigger", "9000000", 4)
+        self.make("villa", "5000000", 2, property_type="villa")
+        self.make("far", "5000000", 2, lat="28.61", lng="77.20")
+
+        self.assertEqual(refresh_similar_properties(k=3), (5, 5))
+        self.assertEqual(self.similar_titles(base), ["twin", "villa", "bigger"])
+
+        # nothing changed: nothing recomputed
+        self.assertEqual(refresh_similar_properties(k=3), (0, 5))
+
+        twin.status = "sold"
+        twin.save()
+        close = self.make("close", "5100000", 2)
+
+        refresh_similar_properties(k=3)
+        self.assertEqual(self.similar_titles(base), ["close", "villa", "bigger"])
+        self.assertNotIn("twin", self.similar_titles(close))
+
+    @patch("properties.services.similarity.BATCH_ELEMENTS", 10)
+    def test_batches_are_sized_from_the_catalogue(self):
+        base = self.make("base", "5000000", 2)
+        for i in range(5):
+            self.make(f"flat{i}", str(5100000 + i * 100000), 2)
+
+        # 10 elements over 6 listings: one query row per batch
+        refresh_similar_properties(k=3)
+        self.assertEqual(self.similar_titles(base), ["flat0", "flat1", "flat2"])
+
+
+# =========================================================
+# IN-PROCESS VIEW BUFFER
+# =========================================================
+
+class LocalViewBufferTests(TestCase):
+
+    @patch("properties.services.view_counter.LOCAL_SEEN_LIMIT", 10)
+    def test_seen_entries_stay_bounded(self):
+        buffer = LocalViewBuffer()
+
+        for i in range(50):
+            self.assertTrue(buffer.hit("p1", f"viewer{i}", 1800))
+
+        self.assertLessEqual(len(buffer.seen), 10)
+        # the newest viewers are still deduplicated
+        self.assertFalse(buffer.hit("p1", "viewer49", 1800))
+        self.assertEqual(buffer.counts["p1"], 50)
+
+
+# =========================================================
+# GROUP PAYMENT INVITES
+# =========================================================
+
+class GroupPaymentInviteTests(TestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username="seller", password="x")
+        self.host = User.objects.create_user(username="host", password="x")
+        self.members = [User.objects.create_user(username=f"member{i}", password="x") for i in range(2)]
+        prop = make_property(self.owner, title="Group flat", price=Decimal("3000000.00"))
+        self.plan = PurchasePlan.objects.create(
+            property=prop,
+            created_by=self.host,
+            mode="group",
+            group_size=3,
+            base_price=prop.price,
+            total_payable=prop.price,
+            status="active",
+        )
+        for member in self.members:
+            PlanInvite.objects.create(plan=self.plan, invited_user=member)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_initiate_does_not_hand_out_invitee_tokens(self):
+        response = self.client_for(self.host).post(
+            f"/api/properties/plans/{self.plan.id}/initiate-group-payment/"
+        )
+
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual(sorted(body["invited_user_ids"]), sorted(u.id for u in self.members))
+        self.assertNotIn("token", str(body))
+
+    def test_invite_list_holds_only_own_invites(self):
+        self.client_for(self.host).post(f"/api/properties/plans/{self.plan.id}/initiate-group-payment/")
+
+        response = self.client_for(self.members[0]).get("/api/properties/group-invites/")
+
+        rows = response.json()["results"]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(
+            str(GroupPaymentInvite.objects.get(invited_user=self.members[0]).token),
+            str(rows[0]["token"]),
+        )
+
+
+# =========================================================
+# USER SEARCH (KEYSET PAGES)
+# =========================================================
+
+class UserSearchPaginationTests(TestCase):
+
+    def setUp(self):
+        self.searcher = User.objects.create_user(username="searcher", password="x")
+        User.objects.bulk_create([User(username=f"zed{i:02d}") for i in range(25)])
+        self.client = APIClient()
+        self.client.force_authenticate(self.searcher)
+
+    def test_pages_follow_the_cursor(self):
+        first = self.client.get("/api/properties/users/search/", {"q": "zed"}).json()
+        self.assertEqual(len(first["results"]), 20)
+
+        second = self.client.get(first["next"]).json()
+        self.assertEqual(len(second["results"]), 5)
+        self.assertIsNone(second["next"])
+
+        names = [u["username"] for u in first["results"] + second["results"]]
+        self.assertEqual(names, [f"zed{i:02d}" for i in range(25)])
+
+    def test_tied_fuzzy_scores_are_not_skipped(self):
+        if not trigram_available():
+            self.skipTest("pg_trgm is not installed")
+        # no prefix match; every row has the same word similarity
+        User.objects.bulk_create([User(username=f"xsmith{i:02d}") for i in range(25)])
+
+        first = self.client.get("/api/properties/users/search/", {"q": "smith"}).json()
+        second = self.client.get(first["next"]).json()
+
+        names = sorted(u["username"] for u in first["results"] + second["results"])
+        self.assertEqual(names, [f"xsmith{i:02d}" for i in range(25)])
+
+    def test_bad_cursor_is_rejected(self):
+        response = self.client.get("/api/properties/users/search/", {"q": "zed", "cursor": "nope"})
+        self.assertEqual(response.status_code, 404)
+
+
+# =========================================================
+# IMAGE VARIANT FILES
+# =========================================================
+
+class ImageVariantFilesTests(TestCase):
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        overrides = override_settings(
+            STORAGES={
+                "default": {
+                    "BACKEND": "django.core.files.storage.FileSystemStorage",
+                    "OPTIONS": {"location": self.media},
+                },
+                "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+            },
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        owner = User.objects.create_user(username="owner", password="x")
+        prop = make_property(owner, status="draft", is_verified=False)
+        buffer = BytesIO()
+        Image.new("RGB", (2000, 1000), "red").save(buffer, "PNG")
+        self.image = PropertyImage.objects.create(
+            property=prop, image=SimpleUploadedFile("room.png", buffer.getvalue())
+        )
+
+    def stored_files(self):
+        return sorted(
+            os.path.relpath(os.path.join(root, name), self.media)
+            for root, _, names in os.walk(self.media)
+            for name in names
+        )
+
+    def test_rerender_replaces_previous_files(self):
+        render_variants(self.image.pk)
+        first = self.stored_files()
+
+        render_variants(self.image.pk)
+
+        self.assertEqual(self.stored_files(), first)
+        self.assertEqual(len(first), 1 + len(VARIANTS) * len(FORMATS))
+
+    def test_delete_removes_variant_files(self):
+        render_variants(self.image.pk)
+        self.image.refresh_from_db()
+        original = self.image.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.image.delete()
+
+        self.assertEqual(self.stored_files(), [original])
 
-# Create your tests here.
@@ -41,6 +41,11 @@ path(
     PropertyVideoDeleteView.as_view(),
 ),
 
+    # Resumable video uploads
+    path('<uuid:property_id>/videos/uploads/', views.VideoUploadStartView.as_view(), name='video-upload-start'),
+    path('video-uploads/<uuid:pk>/', views.VideoUploadSessionView.as_view(), name='video-upload-session'),
+    path('video-uploads/<uuid:pk>/complete/', views.VideoUploadCompleteView.as_view(), name='video-upload-complete'),
+
     # Inquiries
     path('<uuid:property_id>/inquire/', views.PropertyInquiryView.as_view(), name='property-inquire'),
     path('inquiries/sent/', views.MyInquiriesView.as_view(), name='my-inquiries'),
@@ -52,6 +57,8 @@ path(
     
     # Statistics
     path('stats/', views.property_stats, name='property-stats'),
+    path('facets/', views.PropertyFacetsView.as_view(), name='property-facets'),
+    path('<uuid:property_id>/similar/', views.SimilarPropertiesView.as_view(), name='property-similar'),
 
 
 
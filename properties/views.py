@@ -1,3 +1,5 @@
+import hashlib
+
 from rest_framework import generics, status, filters
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
@@ -5,11 +7,24 @@ from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.exceptions import PermissionDenied
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
+from django.db.models import Q, prefetch_related_objects
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
 
 from wallet.services import credit_wallet
-from .filters import PropertyFilter
+from .filters import PropertyFilter, PropertyGeoFilter, PropertySearchFilter
+from .services.chunked_upload import abort_video_upload, complete_video_upload, receive_part, start_video_upload
+from .services.facets import cached_facet_counts, cached_property_stats
+from .services.group_fanout import create_plan_invites, notify_users, send_group_payment_invites
+from .services.listing_cache import cached_listing
+from .services.user_search import (
+    USER_SEARCH_LIMIT,
+    decode_cursor,
+    encode_cursor,
+    search_position,
+    search_users,
+)
+from .services.view_counter import record_view
 from django.db import transaction as db_tx
 from .models import *
 from .serializers import *
@@ -18,7 +33,7 @@ from decimal import Decimal
 from wallet.calculations import calculate_net_balance_for_user
 from wallet.models import PaymentTransaction, Wallet
 
-from wallet.services import debit_wallet
+from wallet.services import debit_wallet, spendable_balance
 from properties.models import Property
 from properties.serializers import (
     PropertyListSerializer,
@@ -28,9 +43,14 @@ from properties.serializers import (
 
 class PropertyListCreateView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # search / geo run last so relevance or distance can replace the default ordering
+    filter_backends = [
+        DjangoFilterBackend,
+        filters.OrderingFilter,
+        PropertySearchFilter,
+        PropertyGeoFilter,
+    ]
     filterset_class = PropertyFilter
-    search_fields = ["title", "description", "location", "city"]
     ordering_fields = ["price", "area_sqft", "created_at", "views_count"]
     ordering = ["-created_at"]
 
@@ -38,7 +58,7 @@ class PropertyListCreateView(generics.ListCreateAPIView):
         return Property.objects.filter(
             status="available",
             is_verified=True
-        )
+        ).prefetch_related(*PropertyListSerializer.media_prefetches())
 
     def get_serializer_class(self):
         if self.request.method == "POST":
@@ -48,6 +68,19 @@ class PropertyListCreateView(generics.ListCreateAPIView):
     def get_serializer_context(self):
         return {"request": self.request}
 
+    def list(self, request, *args, **kwargs):
+        # 🗄 anonymous pages are the same for everyone — serve them from cache
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+
+        build_page = super().list
+        data, state = cached_listing(
+            request, lambda: build_page(request, *args, **kwargs).data
+        )
+        response = Response(data)
+        response["X-Cache"] = state.upper()
+        return response
+
     def perform_create(self, serializer):
         user = self.request.user
         VERIFICATION_FEE = Decimal("1000.00")
@@ -60,7 +93,7 @@ class PropertyListCreateView(generics.ListCreateAPIView):
         wallet, _ = Wallet.objects.get_or_create(user=user)
 
         # ✅ ONLY DB VALUE (NO CALCULATION)
-        available_balance = wallet.balance + wallet.bonus_balance
+        available_balance = spendable_balance(wallet)
 
         if available_balance >= VERIFICATION_FEE:
             # 🔥 CUT MONEY FROM WALLET
@@ -83,16 +116,58 @@ class PropertyListCreateView(generics.ListCreateAPIView):
     
 
 
+def property_detail_etag(obj):
+    """
+    Everything the detail payload depends on: the row (updated_at also
+    moves with its images / videos, see properties.signals), the
+    buffered view count and the viewer-specific annotations.
+    """
+    parts = [
+        obj.pk,
+        obj.updated_at.isoformat(),
+        obj.views_count,
+        obj.inquiry_count,
+        obj.is_favorited,
+        obj.user_request_status,
+    ]
+    return '"%s"' % hashlib.md5("|".join(map(str, parts)).encode()).hexdigest()
+
+
 class PropertyDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete a property"""
-    queryset = Property.objects.all()
     permission_classes = [IsAuthenticatedOrReadOnly]
     
+    def get_queryset(self):
+        queryset = Property.objects.all()
+        if self.request.method in ("GET", "HEAD"):
+            queryset = PropertyDetailSerializer.annotate_for(queryset, self.request.user)
+        return queryset
+
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
             return PropertyCreateUpdateSerializer
         return PropertyDetailSerializer
     
+    def retrieve(self, request, *args, **kwargs):
+        obj = self.get_object()
+
+        # ⚡ conditional GET: a matching ETag is answered before media
+        # is loaded or anything is serialized. No Last-Modified: view
+        # counts and per-viewer fields change without updated_at moving,
+        # and If-Modified-Since would answer 304 for them.
+        etag = property_detail_etag(obj)
+        response = get_conditional_response(request, etag=etag)
+
+        if response is None:
+            prefetch_related_objects([obj], *PropertyListSerializer.media_prefetches())
+            response = Response(self.get_serializer(obj).data)
+
+        response["ETag"] = etag
+        # per-viewer fields: browsers may keep it, but must revalidate
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ["Authorization"])
+        return response
+
     def get_object(self):
         obj = super().get_object()
         # Increment view count if it's a GET request and not the owner
@@ -102,9 +177,9 @@ class PropertyDetailView(generics.RetrieveUpdateDestroyAPIView):
             raise PermissionDenied("Property is not published yet")
     
 
+        # 👁 buffered — folded into views_count by flush_view_counts()
         if self.request.method == 'GET' and self.request.user != obj.owner:
-            obj.views_count += 1
-            obj.save(update_fields=['views_count'])
+            record_view(obj, self.request)
         return obj
     
     def perform_update(self, serializer):
@@ -127,7 +202,9 @@ class MyPropertiesView(generics.ListAPIView):
     ordering = ['-created_at']
     
     def get_queryset(self):
-        return Property.objects.filter(owner=self.request.user)
+        return Property.objects.filter(owner=self.request.user).prefetch_related(
+            *PropertyListSerializer.media_prefetches()
+        )
 
 class PropertyImageUploadView(generics.CreateAPIView):
     """Upload images for a property"""
@@ -199,6 +276,87 @@ class PropertyVideoUploadView(generics.CreateAPIView):
         }, status=201)
 
 
+# =========================================================
+# RESUMABLE VIDEO UPLOADS
+# =========================================================
+#
+# POST   <property_id>/videos/uploads/        {filename, size, content_type}
+# PUT    video-uploads/<id>/?offset=N         raw chunk bytes
+# GET    video-uploads/<id>/                  missing_parts, to resume
+# POST   video-uploads/<id>/complete/         -> PropertyVideo
+# DELETE video-uploads/<id>/                  abort
+
+class VideoUploadStartView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = VideoUploadSessionSerializer
+
+    def post(self, request, property_id):
+        prop = get_object_or_404(Property, id=property_id)
+
+        if prop.owner != request.user:
+            raise PermissionDenied("Only owner can upload video")
+
+        try:
+            session = start_video_upload(
+                prop,
+                request.user,
+                filename=request.data.get("filename"),
+                size=request.data.get("size"),
+                content_type=request.data.get("content_type"),
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        return Response(self.get_serializer(session).data, status=201)
+
+
+class VideoUploadSessionView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = VideoUploadSessionSerializer
+
+    def get_queryset(self):
+        return VideoUploadSession.objects.filter(user=self.request.user)
+
+    def get(self, request, pk):
+        return Response(self.get_serializer(self.get_object()).data)
+
+    def put(self, request, pk):
+        session = self.get_object()
+
+        try:
+            # streamed straight from the request; never request.body
+            session = receive_part(
+                session,
+                offset=request.query_params.get("offset"),
+                length=request.META.get("CONTENT_LENGTH"),
+                stream=request.stream,
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        return Response(self.get_serializer(session).data)
+
+    def delete(self, request, pk):
+        session = abort_video_upload(self.get_object())
+        return Response(self.get_serializer(session).data)
+
+
+class VideoUploadCompleteView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = VideoUploadSessionSerializer
+
+    def get_queryset(self):
+        return VideoUploadSession.objects.filter(user=self.request.user)
+
+    def post(self, request, pk):
+        try:
+            session = complete_video_upload(self.get_object())
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        return Response(self.get_serializer(session).data)
+
+
 class PropertyVideoDeleteView(generics.DestroyAPIView):
     queryset = PropertyVideo.objects.all()
     permission_classes = [IsAuthenticated]
@@ -295,23 +453,57 @@ class FavoritePropertiesView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return PropertyFavorite.objects.filter(user=self.request.user)
+        return (
+            PropertyFavorite.objects.filter(user=self.request.user)
+            .select_related("property")
+            .prefetch_related(*PropertyListSerializer.media_prefetches("property__"))
+            .order_by("-created_at")
+        )
 
 @api_view(['GET'])
 def property_stats(request):
-    """Get property statistics"""
-    total_properties = Property.objects.count()
-    available_properties = Property.objects.filter(status='available').count()
-    sold_properties = Property.objects.filter(status='sold').count()
-    
-    property_types = Property.objects.values('property_type').distinct().count()
-    
-    return Response({
-        'total_properties': total_properties,
-        'available_properties': available_properties,
-        'sold_properties': sold_properties,
-        'property_types': property_types,
-    })
+    """Get property statistics (one aggregate, cached)"""
+    return Response(cached_property_stats())
+
+
+class PropertyFacetsView(generics.GenericAPIView):
+    """
+    Facet counts (city, type, listing type, bedrooms, price bucket) for
+    the listing filters in the query string, e.g. ?city=pune&min_price=...
+    """
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    filter_backends = [DjangoFilterBackend, PropertySearchFilter, PropertyGeoFilter]
+    filterset_class = PropertyFilter
+
+    def get_queryset(self):
+        return Property.objects.filter(
+            status="available",
+            is_verified=True
+        )
+
+    def get(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(cached_facet_counts(queryset, request.query_params))
+
+
+class SimilarPropertiesView(generics.ListAPIView):
+    """
+    Precomputed "similar properties" rail, nearest first. One read of
+    SimilarProperty (by its property + rank index) plus listing media;
+    filled by the refresh_similar_properties command.
+    """
+    serializer_class = PropertyListSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = None
+
+    def get_queryset(self):
+        return Property.objects.filter(
+            similar_to_entries__property_id=self.kwargs["property_id"],
+            status="available",
+            is_verified=True,
+        ).order_by("similar_to_entries__rank").prefetch_related(
+            *PropertyListSerializer.media_prefetches()
+        )
 
 
 #new
@@ -657,15 +849,13 @@ class CreateInterestView(generics.GenericAPIView):
 
         # Create invites if group
         if mode == "group":
-            users = User.objects.filter(id__in=invited_user_ids)
+            users = list(User.objects.filter(id__in=invited_user_ids))
             found_ids = set(u.id for u in users)
             missing = [str(x) for x in invited_user_ids if x not in found_ids]
             if missing:
                 return Response({"error": "Some invited_user_ids not found.", "missing": missing}, status=400)
 
-            PlanInvite.objects.bulk_create([
-                PlanInvite(plan=plan, invited_user=u, status="invited") for u in users
-            ])
+            create_plan_invites(plan, users)
 
         # Create interest
         interest = PropertyInterest.objects.create(
@@ -759,14 +949,30 @@ class RespondInterestView(generics.GenericAPIView):
             prop.status = "pending"
             prop.save(update_fields=["status"])
 
-        OwnerNotification.objects.create(
-            user=interest.requester,
+        notify_users(
+            [interest.requester],
             property=prop,
             type="interest",
             title="Request accepted",
             message=f"Owner accepted your request for {prop.title}. You can proceed with payment."
         )
 
+        # invited members can pay their share now — one INSERT
+        invitees = [
+            invite.invited_user
+            for invite in plan.invites.select_related("invited_user")
+        ]
+        notify_users(
+            invitees,
+            property=prop,
+            type="interest",
+            title="Group purchase accepted",
+            message=(
+                f"The owner accepted {interest.requester.username}'s group request "
+                f"for {prop.title}. You can proceed with your share of the payment."
+            )
+        )
+
         return Response({"message": "Accepted.", "interest": PropertyInterestSerializer(interest).data})
 
 
@@ -810,7 +1016,8 @@ class PlanPayView(generics.GenericAPIView):
 
     @db_tx.atomic
     def post(self, request, plan_id):
-        plan = get_object_or_404(PurchasePlan, id=plan_id)
+        # 🔒 concurrent payers serialize here, so only one can be "last"
+        plan = get_object_or_404(PurchasePlan.objects.select_for_update(), id=plan_id)
         prop = plan.property
         user = request.user
 
@@ -877,6 +1084,7 @@ class PlanPayView(generics.GenericAPIView):
 
         contribution.status = "confirmed"
         contribution.save(update_fields=["status"])
+        plan.record_confirmed(amount)
 
         # 🔗 WALLET CREDIT HOOK
         credit_wallet(
@@ -972,15 +1180,62 @@ class MyInterestsView(generics.ListAPIView):
 
 from django.contrib.auth.models import User
 from rest_framework.generics import ListAPIView
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.permissions import IsAuthenticated
 from .serializers import UserMiniSerializer
 
+class UserDirectoryPagination(CursorPagination):
+    # keyset on username: page N costs the same as page 1
+    ordering = ("username",)
+    page_size = 50
+
+
+class UserSearchPagination(BasePagination):
+    """
+    Keyset pages over search_users' (match_rank, similarity, username)
+    order; the view passes the decoded cursor into the search itself.
+    """
+    cursor_query_param = "cursor"
+
+    def position(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            return decode_cursor(cursor)
+        except ValueError:
+            raise NotFound("Invalid cursor")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page = list(queryset)
+        self.next_position = (
+            search_position(page[-1]) if len(page) == USER_SEARCH_LIMIT else None
+        )
+        return page
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            encode_cursor(self.next_position),
+        )
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+
 class UserListView(ListAPIView):
     serializer_class = UserMiniSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = UserDirectoryPagination
 
     def get_queryset(self):
-        return User.objects.all()
+        return User.objects.filter(is_active=True).only(*UserMiniSerializer.Meta.fields)
 
 
 
@@ -1031,20 +1286,17 @@ class CreateGroupPurchaseView(generics.GenericAPIView):
         )
 
         # 2️⃣ AUTO-GENERATE DUMMY INVITES
-        users = User.objects.exclude(
+        users = list(User.objects.exclude(
             id__in=[request.user.id, prop.owner_id]
-        )[: int(group_size) - 1]
+        )[: int(group_size) - 1])
 
-        if users.count() != int(group_size) - 1:
+        if len(users) != int(group_size) - 1:
             return Response(
                 {"error": "Not enough users available"},
                 status=400
             )
 
-        PlanInvite.objects.bulk_create([
-            PlanInvite(plan=plan, invited_user=u)
-            for u in users
-        ])
+        create_plan_invites(plan, users)
 
         # 3️⃣ CREATE INTEREST WITH PLAN (REQUIRED)
         interest = PropertyInterest.objects.create(
@@ -1095,27 +1347,25 @@ class InitiateGroupPaymentView(generics.GenericAPIView):
         if GroupPaymentInvite.objects.filter(plan=plan).exists():
             return Response({"error": "Already initiated"}, status=400)
 
-        invites = PlanInvite.objects.filter(plan=plan)
-
-        for invite in invites:
-            GroupPaymentInvite.objects.create(
-                plan=plan,
-                invited_user=invite.invited_user,
-                amount=plan.per_person_amount(),
-            )
+        members = [
+            invite.invited_user
+            for invite in PlanInvite.objects.filter(plan=plan).select_related("invited_user")
+        ]
 
-            OwnerNotification.objects.create(
-                user=invite.invited_user,
-                property=plan.property,
-                type="group_payment",
-                title="Group payment request",
-                message=(
-                    f"{request.user.username} invited you to pay "
-                    f"₹{plan.per_person_amount()} for {plan.property.title}"
-                )
-            )
+        # ⚡ one INSERT for invites, one for notifications. Tokens stay
+        # with their invitees (each sees it in their own invite list).
+        tokens = send_group_payment_invites(
+            plan,
+            members,
+            sender=request.user,
+            amount=plan.per_person_amount(),
+        )
 
-        return Response({"message": "Group payment initiated"}, status=201)
+        return Response({
+            "message": "Group payment initiated",
+            "invited_user_ids": list(tokens),
+            "invited_count": len(tokens),
+        }, status=201)
 
 
 
@@ -1176,29 +1426,15 @@ class RespondGroupPaymentInviteView(generics.GenericAPIView):
 class UserSearchView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = UserMiniSerializer
+    pagination_class = UserSearchPagination
 
     def get_queryset(self):
-        q = self.request.query_params.get("q")
-        if not q:
-            return User.objects.none()
-        
-    def get_queryset(self):
-        print("SEARCH USER:", self.request.user)
-        print("QUERY:", self.request.query_params.get("q"))
-
-        q = self.request.query_params.get("q")
-        if not q:
-         return User.objects.none()
-
-        return User.objects.filter(username__icontains=q)
-
-        return User.objects.filter(
-            username__icontains=q
-        ).exclude(id=self.request.user.id)
-    
-    
-
-
+        # ranked, USER_SEARCH_LIMIT per page, see services.user_search
+        return search_users(
+            self.request.query_params.get("q"),
+            exclude_ids=[self.request.user.id],
+            after=self.paginator.position(self.request),
+        )
 
 
 class SendGroupPaymentInviteView(generics.GenericAPIView):
@@ -1216,18 +1452,11 @@ class SendGroupPaymentInviteView(generics.GenericAPIView):
         if GroupPaymentInvite.objects.filter(plan=plan, invited_user=user).exists():
             return Response({"error": "Already invited"}, status=400)
 
-        GroupPaymentInvite.objects.create(
-            plan=plan,
-            invited_user=user,
-            is_payer=False
-        )
-
-        OwnerNotification.objects.create(
-            user=user,
-            property=plan.property,
-            type="group_payment",
-            title="Group payment request",
-            message=f"{request.user.username} invited you to join payment for {plan.property.title}"
+        send_group_payment_invites(
+            plan,
+            [user],
+            sender=request.user,
+            is_payer=False,
         )
 
         return Response({"message": "Invite sent"})
@@ -1245,9 +1474,13 @@ class MyGroupPaymentInvitesView(generics.ListAPIView):
     serializer_class = GroupPaymentInviteSerializer
 
     def get_queryset(self):
-        qs = GroupPaymentInvite.objects.all()
-        print("DEBUG INVITES:", qs)  # 👈 TEMP DEBUG
-        return qs
+        # 🔒 only the caller's own invites (each carries its accept token)
+        return (
+            GroupPaymentInvite.objects
+            .filter(invited_user=self.request.user)
+            .select_related("plan__property")
+            .order_by("-created_at")
+        )
 
 
 
@@ -36,6 +36,7 @@ class WalletTransaction(models.Model):
          ("earned", "Earned"),
          ("paid", "Paid"),
         ("committee_investment", "Committee Investment"),
+        ("committee_payout", "Committee Payout"),
         ("property_payment", "Property Payment"),
         ("interest", "Interest"),
         ("admin_adjustment", "Admin Adjustment"),
@@ -74,6 +75,14 @@ class WalletTransaction(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        constraints = [
+            # 🔒 Idempotency backstop: one successful movement per reference
+            models.UniqueConstraint(
+                fields=["wallet", "tx_type", "reference_id"],
+                condition=models.Q(reference_id__isnull=False, status="success"),
+                name="unique_wallet_tx_reference",
+            )
+        ]
 
     def __str__(self):
         return f"{self.tx_type} | {self.amount}"
@@ -150,6 +159,15 @@ class PaymentTransaction(models.Model):
     null=True,
     blank=True
 )
+
+    # 🧾 Scheduled installment (one invoice per plan per due period)
+    user_committee_plan = models.ForeignKey(
+        "committees.UserCommitteePlan",
+        on_delete=models.SET_NULL,
+        related_name="invoices",
+        null=True,
+        blank=True
+    )
     
     admin_message = models.TextField(
         blank=True,
@@ -216,6 +234,14 @@ class PaymentTransaction(models.Model):
         help_text="User uploaded payment proof"
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user_committee_plan", "due_at"],
+                name="unique_plan_period_invoice"
+            )
+        ]
+
 
     def __str__(self):
      committee_name = (
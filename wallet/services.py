@@ -12,11 +12,24 @@ from .models import (
     AdminWallet,
     AdminWalletEntry,
 )
+from committees.services.ledger_service import post_committee_entry
+from committees.services.punctuality_service import payment_event, record_events
 
 # =========================================================
 # CORE WALLET OPERATIONS (SINGLE SOURCE OF TRUTH)
 # =========================================================
 
+def spendable_balance(wallet: Wallet) -> Decimal:
+    """
+    What a debit may take from `wallet`. The one affordability rule for
+    pay-now, auto-debit and debit_wallet: bonus_balance is never debited,
+    so it never counts, and a frozen wallet cannot spend at all.
+    """
+    if wallet.status != "active":
+        return Decimal("0")
+    return wallet.balance
+
+
 @transaction.atomic
 def credit_wallet(
     *,
@@ -33,6 +46,9 @@ def credit_wallet(
     if amount <= 0:
         raise ValueError("Credit amount must be positive")
 
+    # 🔒 Row lock: concurrent movements on this wallet queue up here
+    wallet.refresh_from_db(from_queryset=Wallet.objects.select_for_update())
+
     # 🔒 Idempotency
     if reference_id and WalletTransaction.objects.filter(
         wallet=wallet,
@@ -82,10 +98,13 @@ def debit_wallet(
     if amount <= 0:
         raise ValueError("Debit amount must be positive")
 
+    # 🔒 Row lock, then check the balance as it is now
+    wallet.refresh_from_db(from_queryset=Wallet.objects.select_for_update())
+
     if wallet.status != "active":
         raise ValueError("Wallet is frozen")
 
-    if wallet.balance < amount:
+    if spendable_balance(wallet) < amount:
         raise ValueError("Insufficient balance")
 
     # 🔒 Idempotency
@@ -205,6 +224,10 @@ def apply_payment_transaction_to_wallet(payment_tx: PaymentTransaction):
 
     wallet = payment_tx.wallet or payment_tx.user.wallet
 
+    # approval time: punctuality scores by it, now and on a rebuild
+    if payment_tx.processed_at is None:
+        payment_tx.processed_at = timezone.now()
+
     try:
         with transaction.atomic():
 
@@ -215,7 +238,7 @@ def apply_payment_transaction_to_wallet(payment_tx: PaymentTransaction):
                 payment_tx.transaction_type == "investment"
                 and payment_tx.user_committee
             ):
-                debit_wallet(
+                wallet_tx = debit_wallet(
                     wallet=wallet,
                     amount=Decimal(payment_tx.amount),
                     tx_type="committee_investment",
@@ -224,9 +247,26 @@ def apply_payment_transaction_to_wallet(payment_tx: PaymentTransaction):
                     note="Committee investment",
                 )
 
-                # Sync committee state
-                payment_tx.user_committee.total_invested += payment_tx.amount
-                payment_tx.user_committee.save(update_fields=["total_invested"])
+                # Sync committee sub-ledger
+                post_committee_entry(
+                    user_committee=payment_tx.user_committee,
+                    entry_type="investment",
+                    amount=Decimal(payment_tx.amount),
+                    wallet_transaction=wallet_tx,
+                    reference_id=str(payment_tx.id),
+                    note="Committee investment",
+                )
+
+                # Scheduled installment → punctuality (whether the invoice
+                # was counted overdue before is not known here; refolding
+                # from history is exact either way)
+                if wallet_tx and payment_tx.due_at:
+                    record_events([payment_event(
+                        user_committee=payment_tx.user_committee,
+                        due_at=payment_tx.due_at,
+                        paid_at=payment_tx.processed_at,
+                        replaces_overdue=payment_tx.user_committee_plan_id is not None,
+                    )])
 
             # ==================================================
             # 💰 COMMITTEE WITHDRAWAL (CREDIT)
@@ -236,7 +276,7 @@ def apply_payment_transaction_to_wallet(payment_tx: PaymentTransaction):
                 and payment_tx.user_committee
             ):
     # 💰 CREDIT WALLET (THIS IS THE WITHDRAW ENTRY)
-                credit_wallet(
+                wallet_tx = credit_wallet(
                     wallet=wallet,
                     amount=Decimal(payment_tx.amount),
                     tx_type="withdraw",          # 👈 THIS makes it a withdrawal in wallet
@@ -245,9 +285,15 @@ def apply_payment_transaction_to_wallet(payment_tx: PaymentTransaction):
                     note="Committee withdrawal approved",
                 )
 
-                # 🔻 Reduce committee investment
-                payment_tx.user_committee.total_invested -= payment_tx.amount
-                payment_tx.user_committee.save(update_fields=["total_invested"])
+                # 🔻 Reduce committee investment (sub-ledger)
+                post_committee_entry(
+                    user_committee=payment_tx.user_committee,
+                    entry_type="withdrawal",
+                    amount=Decimal(payment_tx.amount),
+                    wallet_transaction=wallet_tx,
+                    reference_id=str(payment_tx.id),
+                    note="Committee withdrawal approved",
+                )
 
             # ==================================================
             # 🏷️ LEGACY / PLATFORM PAYMENTS (DEFAULT)
@@ -266,7 +312,7 @@ def apply_payment_transaction_to_wallet(payment_tx: PaymentTransaction):
             # ✅ MARK AS SYNCED
             # ==================================================
             payment_tx.wallet_synced = True
-            payment_tx.save(update_fields=["wallet_synced"])
+            payment_tx.save(update_fields=["wallet_synced", "processed_at"])
 
     except Exception as e:
         print("🔥 PAYMENT TX WALLET ERROR:", e)
@@ -764,6 +764,7 @@ from django.utils import timezone
 
 from wallet.models import Wallet, PaymentTransaction, PaymentMethod
 from committees.models import UserCommittee
+from wallet.services import spendable_balance
 
 
 
@@ -858,7 +859,7 @@ def withdraw_request(request):
     # 💳 WALLET WITHDRAWAL (UNCHANGED)
     # ======================================================
     wallet = Wallet.objects.get(user=user)
-    available_balance = wallet.balance + wallet.bonus_balance
+    available_balance = spendable_balance(wallet)
 
     if available_balance < amount:
         return Response(
@@ -6,6 +6,7 @@ Generated by 'django-admin startproject' using Django 5.2.7
 from pathlib import Path
 import os
 import datetime
+import tempfile
 from dotenv import load_dotenv
 from storages.backends.s3boto3 import S3Boto3Storage
 # --------------------------------------------------
@@ -40,6 +41,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # Third-party
     'rest_framework',
@@ -191,6 +193,65 @@ MEDIA_URL = f"https://{AWS_S3_CUSTOM_DOMAIN}/"
 
 
 
+# --------------------------------------------------
+# REDIS (optional — buffers fall back to in-process)
+# --------------------------------------------------
+REDIS_URL = os.getenv("REDIS_URL")
+
+# listing / facet / stats caches and their version counters. Without
+# Redis each process has its own LocMem cache: a version bump only
+# invalidates entries in the process that made the change, and the
+# others serve theirs until they expire.
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# one counted view per viewer per property in this window (0 = count every hit)
+PROPERTY_VIEW_DEDUP_SECONDS = int(os.getenv("PROPERTY_VIEW_DEDUP_SECONDS", "1800"))
+
+# in-process buffer only: flush at most this often, from the request path
+PROPERTY_VIEW_FLUSH_SECONDS = int(os.getenv("PROPERTY_VIEW_FLUSH_SECONDS", "60"))
+
+
+# --------------------------------------------------
+# USER SEARCH (pg_trgm)
+# --------------------------------------------------
+# migrate fails when the trigram index cannot be built; dev may run without it
+USER_SEARCH_REQUIRE_TRIGRAM = os.getenv(
+    "USER_SEARCH_REQUIRE_TRIGRAM", str(not DEBUG)
+).lower() == "true"
+
+
+# --------------------------------------------------
+# IMAGE VARIANTS (thumb / card / full, WebP + JPEG)
+# --------------------------------------------------
+# threads per process resizing uploads after the request commits
+IMAGE_VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", "2"))
+
+
+# --------------------------------------------------
+# RESUMABLE VIDEO UPLOADS
+# --------------------------------------------------
+# bytes per PUT; S3 multipart needs >= 5 MB for every part but the last
+VIDEO_UPLOAD_CHUNK_SIZE = int(os.getenv("VIDEO_UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+VIDEO_UPLOAD_MAX_BYTES = int(os.getenv("VIDEO_UPLOAD_MAX_BYTES", str(2 * 1024 ** 3)))
+
+# non-S3 storage only: where parts wait until the upload completes
+VIDEO_UPLOAD_STAGING_DIR = os.getenv(
+    "VIDEO_UPLOAD_STAGING_DIR", os.path.join(tempfile.gettempdir(), "video_uploads")
+)
+
+
 # --------------------------------------------------
 # DJANGO REST FRAMEWORK
 # --------------------------------------------------